@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 from pathlib import Path
@@ -11,24 +12,142 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 load_dotenv(BASE_DIR / ".env")
 
+
+def project_path(value: str) -> str:
+    """
+    Resuelve una ruta de la configuración: las relativas parten de la raíz del proyecto y no
+    del directorio de trabajo, para que la API y los workers abran los mismos ficheros.
+    """
+    path = Path(value)
+    return str(path if path.is_absolute() else BASE_DIR / path)
+
+
 # Configuración de la aplicación
 APP_ENV = os.getenv("APP_ENV", "development")
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 SECRET_KEY = os.getenv("SECRET_KEY", "clave-secreta-por-defecto")
 
-# Configuración de RabbitMQ
+# Configuración de RabbitMQ (la URL se valida al conectar, no al importar la configuración)
 RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-if not RABBITMQ_URL:
-    logger.error("RABBITMQ_URL no está configurada en las variables de entorno")
-    raise ValueError("RABBITMQ_URL no está configurada en las variables de entorno")
 
 RABBITMQ_CONFIG: dict[str, Any] = {
     "url": RABBITMQ_URL,
     "queue": os.getenv("RABBITMQ_QUEUE", "notifications"),
     "response_queue": os.getenv("RABBITMQ_RESPONSE_QUEUE", "responses"),
-    "heartbeat": 60,
-    "connection_attempts": 5,
-    "retry_delay": 5,
+    # heartbeat, connection_attempts y retry_delay se configuran en core/config/tuning.py
+}
+
+# Configuración de sharding de las colas de operaciones
+RABBITMQ_SHARDING: dict[str, Any] = {
+    "shards": int(os.getenv("RABBITMQ_SHARDS", "1")),
+    "virtual_nodes": int(os.getenv("RABBITMQ_SHARD_VNODES", "64")),
+    # Campo del payload usado como clave de sharding; si no existe se usa el mensaje completo
+    "key_field": os.getenv("RABBITMQ_SHARD_KEY"),
+}
+
+# Carriles de prioridad: carril -> peso (capacidad de consumo del worker para ese carril).
+# El carril "default" usa la cola base; el resto usa colas "<cola>.<carril>".
+RABBITMQ_LANES: dict[str, int] = {
+    "default": int(os.getenv("RABBITMQ_LANE_DEFAULT_WEIGHT", "4")),
+    "bulk": int(os.getenv("RABBITMQ_LANE_BULK_WEIGHT", "1")),
+}
+
+# Límites por cola lógica: {"<cola>": {"rate_limit": msg/s, "burst": n, "max_concurrency": n}}.
+# Se aplican en cada worker: el rate_limit lo comparten todos los shards de la cola que consume el
+# worker (con N workers, el ritmo total es N * rate_limit); max_concurrency se aplica a cada shard.
+RABBITMQ_QUEUE_LIMITS: dict[str, dict[str, Any]] = json.loads(os.getenv("RABBITMQ_QUEUE_LIMITS", "{}"))
+
+# Backend de resultados del modo de jobs asíncronos ("memory" o "sqlite")
+RESULT_BACKEND_CONFIG: dict[str, Any] = {
+    "backend": os.getenv("RESULT_BACKEND", "sqlite"),
+    "path": project_path(os.getenv("RESULT_BACKEND_PATH", "jobs.sqlite3")),
+    "ttl": int(os.getenv("RESULT_BACKEND_TTL", "3600")),
+    "max_entries": int(os.getenv("RESULT_BACKEND_MAX_ENTRIES", "10000")),
+}
+
+# Compresión de cuerpos de mensajes por encima de un umbral (bytes)
+COMPRESSION_CONFIG: dict[str, Any] = {
+    "threshold": int(os.getenv("COMPRESSION_THRESHOLD", "16384")),
+    # Codec preferido: deflate | gzip | zstd | lz4 (estos dos requieren su paquete opcional)
+    "codec": os.getenv("COMPRESSION_CODEC", "deflate"),
+    "level": int(os.getenv("COMPRESSION_LEVEL", "6")),
+}
+
+# Claim check: los cuerpos por encima del umbral se guardan en un almacén compartido
+# (p. ej. un volumen montado en la API y los workers) y el mensaje sólo lleva la referencia
+CLAIM_CHECK_CONFIG: dict[str, Any] = {
+    "enabled": os.getenv("CLAIM_CHECK_ENABLED", "False").lower() in ("true", "1", "t"),
+    "backend": os.getenv("CLAIM_CHECK_BACKEND", "file"),
+    "path": project_path(os.getenv("CLAIM_CHECK_PATH", "claims")),
+    "threshold": int(os.getenv("CLAIM_CHECK_THRESHOLD", str(1024 * 1024))),
+    # Debe cubrir la espera en cola, los reintentos y la estancia en la DLQ
+    "ttl": int(os.getenv("CLAIM_CHECK_TTL", "86400")),
+    "purge_interval": float(os.getenv("CLAIM_CHECK_PURGE_INTERVAL", "60")),
+}
+
+# Reintentos en el servidor: colas de espera con TTL (backoff exponencial) y dead-letter queue
+RETRY_CONFIG: dict[str, Any] = {
+    "max_attempts": int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+    "base_delay_ms": int(os.getenv("RETRY_BASE_DELAY_MS", "1000")),
+    "multiplier": float(os.getenv("RETRY_MULTIPLIER", "2")),
+}
+
+# Publicador masivo de mensajes sin respuesta
+PUBLISHER_CONFIG: dict[str, Any] = {
+    "batch_size": int(os.getenv("PUBLISHER_BATCH_SIZE", "500")),
+    "max_buffer_bytes": int(os.getenv("PUBLISHER_MAX_BUFFER_BYTES", str(8 * 1024 * 1024))),
+    # Confirmar cada lote con una transacción AMQP
+    "confirm": os.getenv("PUBLISHER_CONFIRM", "True").lower() in ("true", "1", "t"),
+}
+
+# Peticiones de cobertura (hedging) del cliente RPC para operaciones idempotentes
+HEDGE_CONFIG: dict[str, Any] = {
+    # Percentil de latencia por cola tras el que se envía el duplicado
+    "percentile": float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+    "min_delay": float(os.getenv("HEDGE_MIN_DELAY", "0.05")),
+    # Fracción máxima de peticiones duplicadas
+    "max_rate": float(os.getenv("HEDGE_MAX_RATE", "0.05")),
+    "window": int(os.getenv("HEDGE_WINDOW", "256")),
+    "min_samples": int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+}
+
+# Arranque de la API: conexión en segundo plano y precalentamiento opcional
+STARTUP_CONFIG: dict[str, Any] = {
+    "warm_up": os.getenv("STARTUP_WARM_UP", "True").lower() in ("true", "1", "t"),
+    # Clientes RPC (colas de callback) abiertos de antemano en el pool
+    "client_pool_size": int(os.getenv("STARTUP_CLIENT_POOL_SIZE", "4")),
+    # Espera máxima (segundos) entre reintentos de conexión del arranque
+    "retry_max_delay": float(os.getenv("STARTUP_RETRY_MAX_DELAY", "30")),
+}
+
+# Perfilado bajo demanda de los handlers (SIGUSR1 en el worker activa/detiene una captura)
+PROFILING_CONFIG: dict[str, Any] = {
+    "dir": project_path(os.getenv("PROFILING_DIR", "profiles")),
+    # La captura termina al cumplirse la primera de las dos condiciones
+    "duration": float(os.getenv("PROFILING_DURATION", "30")),
+    "max_messages": int(os.getenv("PROFILING_MAX_MESSAGES", "1000")),
+}
+
+# Configuración del worker (subconjunto de shards que consume)
+WORKER_CONFIG: dict[str, Any] = {
+    "index": int(os.getenv("WORKER_INDEX", "0")),
+    "count": int(os.getenv("WORKER_COUNT", "1")),
+    # Segundos que se espera a los mensajes en proceso al apagar antes de cerrar la conexión
+    "drain_grace": float(os.getenv("WORKER_DRAIN_GRACE", "30")),
+    # Puerto del endpoint /metrics del worker (0 = deshabilitado)
+    "metrics_port": int(os.getenv("WORKER_METRICS_PORT", "0")),
+}
+
+# Autoescalado de la capacidad del worker según la profundidad de sus colas.
+# Desactivado por defecto: con él los handlers se ejecutan en un pool de hilos, lo que rompe el
+# orden de los mensajes de una misma clave de sharding (y los streams ocupan un hilo hasta terminar)
+AUTOSCALE_CONFIG: dict[str, Any] = {
+    "enabled": os.getenv("AUTOSCALE_ENABLED", "False").lower() in ("true", "1", "t"),
+    "min_concurrency": int(os.getenv("AUTOSCALE_MIN_CONCURRENCY", "1")),
+    "max_concurrency": int(os.getenv("AUTOSCALE_MAX_CONCURRENCY", "8")),
+    "interval": float(os.getenv("AUTOSCALE_INTERVAL", "5")),
+    # Mensajes pendientes por consumidor que justifican un mensaje más en paralelo
+    "target_backlog": int(os.getenv("AUTOSCALE_TARGET_BACKLOG", "10")),
 }
 
 # Configuración de FastAPI
@@ -0,0 +1,168 @@
+"""
+Configuración tipada de los parámetros de rendimiento, recargable en caliente.
+
+Los valores se resuelven por capas: valores por defecto del modelo, variables de entorno
+``TUNING_<CAMPO>`` (``TUNING_QUEUES`` en JSON) y, por último, el fichero JSON de
+``TUNING_FILE`` (por defecto ``tuning.json`` en la raíz del proyecto), que es la capa
+pensada para ajustar en producción. ``reload_tuning`` vuelve a leer las tres capas;
+los componentes consultan ``get_tuning()`` en cada uso, por lo que los cambios se
+aplican sin reiniciar. El prefetch se fija al registrar cada consumidor: el worker
+vuelve a registrar los carriles cuyo prefetch cambia (``RabbitMQServer.refresh_prefetch``).
+
+Ejemplo de ``tuning.json``::
+
+    {"reply_timeout": 20, "queues": {"notifications_mul": {"prefetch": 16, "max_retries": 2}}}
+
+Las claves de ``queues`` son colas lógicas o físicas; una cola lógica se aplica también
+a sus shards y carriles (``<cola>.shard1``, ``<cola>.bulk``...).
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, ValidationError
+
+from core.config.settings import BASE_DIR
+from core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+ENV_PREFIX = "TUNING_"
+
+
+class QueueTuning(BaseModel):
+    """Ajustes de una cola; los campos sin valor usan el valor global."""
+
+    prefetch: Optional[int] = Field(None, ge=1)
+    reply_timeout: Optional[float] = Field(None, gt=0)
+    max_retries: Optional[int] = Field(None, ge=1)
+    retry_sleep: Optional[float] = Field(None, ge=0)
+
+
+class TuningConfig(BaseModel):
+    """Parámetros de rendimiento globales y por cola."""
+
+    # Conexión
+    heartbeat: int = Field(60, ge=0)
+    connection_attempts: int = Field(5, ge=1)
+    retry_delay: float = Field(5, ge=0)
+    # Cliente RPC
+    reply_timeout: float = Field(60, gt=0)
+    max_retries: int = Field(3, ge=1)
+    api_max_retries: int = Field(5, ge=1)
+    retry_sleep: float = Field(2, ge=0)
+    # Circuit breaker del cliente: fallos consecutivos para abrirlo y segundos hasta la prueba
+    breaker_failure_threshold: int = Field(5, ge=1)
+    breaker_reset_timeout: float = Field(30, gt=0)
+    # Servidor: prefetch fijo por consumidor (None = peso del carril * concurrencia)
+    prefetch: Optional[int] = Field(None, ge=1)
+    queues: dict[str, QueueTuning] = Field(default_factory=dict)
+
+    def resolve(self, queue: str, field: str, default: Any = None) -> Any:
+        """
+        Obtiene un ajuste para una cola, aplicando su override si existe.
+
+        Args:
+            queue (str): Cola lógica o física
+            field (str): Campo de ``QueueTuning``
+            default (Any): Valor si la cola no lo sobrescribe; por defecto, el valor global
+
+        Returns:
+            Any: Valor del ajuste
+        """
+        # El override más específico (la clave más larga que coincide) tiene prioridad
+        for key in sorted(self.queues, key=len, reverse=True):
+            if queue == key or queue.startswith(f"{key}."):
+                value = getattr(self.queues[key], field)
+                if value is not None:
+                    return value
+        return default if default is not None else getattr(self, field)
+
+
+def _tuning_file() -> Path:
+    """Obtiene la ruta del fichero de tuning (las rutas relativas parten de la raíz del proyecto)."""
+    path = Path(os.getenv("TUNING_FILE", "tuning.json"))
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def _json_object(value: Any, source: str) -> dict[str, Any]:
+    """
+    Comprueba que un valor de la configuración de tuning sea un objeto JSON.
+
+    Raises:
+        ValueError: Si no es un objeto (p. ej. una lista o un texto)
+    """
+    if not isinstance(value, dict):
+        raise ValueError(f"{source} debe ser un objeto JSON")
+    return value
+
+
+def load_tuning() -> TuningConfig:
+    """
+    Carga la configuración desde el entorno y el fichero de tuning.
+
+    Raises:
+        ValueError: Si algún valor no es válido o el fichero no es un objeto JSON válido
+    """
+    values: dict[str, Any] = {}
+    for name in TuningConfig.model_fields:
+        env_value = os.getenv(f"{ENV_PREFIX}{name.upper()}")
+        if env_value:
+            if name == "queues":
+                values[name] = _json_object(json.loads(env_value), f"{ENV_PREFIX}QUEUES")
+            else:
+                values[name] = env_value
+
+    path = _tuning_file()
+    if path.exists():
+        file_values = _json_object(json.loads(path.read_text()), str(path))
+        file_queues = _json_object(file_values.pop("queues", {}), f"'queues' de {path}")
+        queues = {**values.get("queues", {}), **file_queues}
+        values.update(file_values)
+        if queues:
+            values["queues"] = queues
+
+    try:
+        return TuningConfig(**values)
+    except ValidationError as e:
+        raise ValueError(f"Configuración de tuning no válida: {e}") from e
+
+
+_tuning: Optional[TuningConfig] = None
+_lock = threading.Lock()
+
+
+def get_tuning() -> TuningConfig:
+    """Obtiene la configuración de tuning vigente."""
+    global _tuning
+    if _tuning is None:
+        with _lock:
+            if _tuning is None:
+                _tuning = load_tuning()
+    return _tuning
+
+
+def reload_tuning() -> TuningConfig:
+    """
+    Vuelve a leer ``.env`` y el fichero de tuning y sustituye la configuración vigente.
+
+    Si la nueva configuración no es válida se conserva la anterior.
+
+    Raises:
+        ValueError: Si la nueva configuración no es válida
+    """
+    global _tuning
+    load_dotenv(BASE_DIR / ".env", override=True)
+    try:
+        tuning = load_tuning()
+    except (ValueError, OSError) as e:
+        logger.error(f"No se pudo recargar la configuración de tuning: {str(e)}")
+        raise ValueError(str(e)) from e
+    with _lock:
+        _tuning = tuning
+    logger.info(f"Configuración de tuning recargada: {tuning.model_dump(exclude_defaults=True)}")
+    return tuning
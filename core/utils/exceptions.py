@@ -1,3 +1,6 @@
+import builtins
+
+
 class RabbitMQError(Exception):
     """Excepción base para errores de RabbitMQ"""
 
@@ -26,3 +29,16 @@ class QueueError(RabbitMQError):
     """Error al manejar una cola"""
 
     pass
+
+
+class CircuitOpenError(RabbitMQError, builtins.ConnectionError):
+    """
+    Error al llamar a una cola cuyo circuit breaker está abierto.
+
+    Hereda también del ``ConnectionError`` estándar para que el código que ya trata los
+    fallos de conexión del cliente lo maneje igual.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,100 @@
+"""
+Registro de métricas en memoria con exportación en formato de texto de Prometheus.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Registro thread-safe de contadores, gauges y resúmenes (count/sum)."""
+
+    def __init__(self):
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Incrementa un contador."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Fija el valor de un gauge."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra una observación de un resumen (``<name>_count`` y ``<name>_sum``)."""
+        self.inc(f"{name}_count", 1.0, **labels)
+        self.inc(f"{name}_sum", value, **labels)
+
+    def get(self, name: str, **labels: Any) -> float:
+        """Obtiene el valor actual de un contador o gauge (0 si no existe)."""
+        key = _label_key(labels)
+        with self._lock:
+            for metrics in (self._gauges, self._counters):
+                if name in metrics and key in metrics[name]:
+                    return metrics[name][key]
+        return 0.0
+
+    def render(self) -> str:
+        """Exporta todas las métricas en formato de texto de Prometheus."""
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(metrics):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in metrics[name].items():
+                        labels = ",".join(f'{label}="{label_value}"' for label, label_value in key)
+                        lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Sirve ``GET /metrics`` con el registro global."""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Silenciar el log de acceso por petición
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Expone las métricas en ``http://<host>:<port>/metrics`` desde un hilo en segundo plano.
+
+    Pensado para procesos sin API (como el worker).
+
+    Args:
+        port (int): Puerto de escucha
+        host (str): Interfaz de escucha
+
+    Returns:
+        ThreadingHTTPServer: Servidor HTTP (``shutdown()`` para detenerlo)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,135 @@
+"""
+Módulo que implementa el autoescalado de la capacidad de un worker según la profundidad de sus colas.
+
+Cada ``interval`` segundos se muestrea con ``queue_declare`` pasivo el número de mensajes
+y de consumidores de cada carril consumido. La parte del backlog que corresponde a este
+worker (mensajes / consumidores) determina la capacidad deseada: los mensajes en proceso
+más un hueco por cada ``target_backlog`` mensajes pendientes, entre ``min_concurrency`` y
+``max_concurrency``. La capacidad se aplica como prefetch global del canal, de modo que
+los pools de hilos (dimensionados al máximo) sólo reciben ese número de mensajes a la vez.
+
+Se escala hacia arriba de inmediato y hacia abajo de uno en uno para evitar oscilaciones.
+Las decisiones se exportan como métricas para autoescaladores externos. Las colas con
+límite de ritmo se consumen en su propio canal y no se muestrean: su capacidad la fija
+el ritmo, no el backlog.
+
+Está desactivado por defecto porque, con autoescalado, los handlers se ejecutan en un
+pool de hilos: los mensajes de una misma clave de sharding dejan de procesarse en
+orden, y los handlers de streaming ocupan un hilo del pool hasta enviar su último
+fragmento. Sólo debe activarse para colas cuyos handlers no dependan del orden.
+"""
+
+import math
+from typing import TYPE_CHECKING, Optional
+
+from core.config.settings import AUTOSCALE_CONFIG
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+from features.rabbitmq.lanes import lane_queue_name
+
+if TYPE_CHECKING:
+    from features.rabbitmq.rabbitmq_connection_server import RabbitMQServer
+
+logger = get_logger(__name__)
+
+
+class Autoscaler:
+    """Autoescalador de la capacidad (mensajes en paralelo) de un ``RabbitMQServer``."""
+
+    def __init__(
+        self,
+        server: "RabbitMQServer",
+        min_concurrency: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        interval: Optional[float] = None,
+        target_backlog: Optional[int] = None,
+    ):
+        """
+        Inicializa el autoescalador con la capacidad mínima.
+
+        Args:
+            server (RabbitMQServer): Servidor cuyas colas se muestrean
+            min_concurrency (Optional[int]): Capacidad mínima del worker
+            max_concurrency (Optional[int]): Capacidad máxima del worker
+            interval (Optional[float]): Segundos entre muestreos
+            target_backlog (Optional[int]): Mensajes pendientes que justifican un hueco más
+        """
+        self.server = server
+        self.min_concurrency = min_concurrency or AUTOSCALE_CONFIG["min_concurrency"]
+        self.max_concurrency = max_concurrency or AUTOSCALE_CONFIG["max_concurrency"]
+        self.interval = interval or AUTOSCALE_CONFIG["interval"]
+        self.target_backlog = target_backlog or AUTOSCALE_CONFIG["target_backlog"]
+        if not 1 <= self.min_concurrency <= self.max_concurrency:
+            raise ValueError("Los límites del autoescalado deben cumplir 1 <= min <= max")
+        self.capacity = self.min_concurrency
+        self._timer = None
+
+    def start(self) -> None:
+        """Aplica la capacidad mínima y programa el primer muestreo (desde el hilo de pika)."""
+        self._apply(self.capacity)
+        self._timer = self.server.channel.connection.call_later(self.interval, self._tick)
+
+    def stop(self) -> None:
+        """Cancela el muestreo programado."""
+        if self._timer is not None:
+            self.server.channel.connection.remove_timeout(self._timer)
+            self._timer = None
+
+    def sample(self) -> float:
+        """
+        Muestrea los carriles consumidos y obtiene el backlog que corresponde a este worker.
+
+        Returns:
+            float: Suma de mensajes pendientes por consumidor de cada carril
+        """
+        backlog = 0.0
+        for queue, lanes in list(self.server.lanes.items()):
+            if queue in self.server.throttled:
+                continue
+            for lane in lanes:
+                lane_queue = lane_queue_name(queue, lane)
+                result = self.server.channel.queue_declare(queue=lane_queue, passive=True).method
+                share = result.message_count / max(result.consumer_count, 1)
+                metrics.set_gauge("worker_queue_backlog", share, queue=lane_queue)
+                backlog += share
+        return backlog
+
+    def decide(self, backlog: float, in_flight: int) -> int:
+        """
+        Calcula la nueva capacidad a partir del backlog y de los mensajes en proceso.
+
+        Args:
+            backlog (float): Mensajes pendientes que corresponden a este worker
+            in_flight (int): Mensajes en proceso
+
+        Returns:
+            int: Nueva capacidad
+        """
+        desired = in_flight + math.ceil(backlog / self.target_backlog)
+        desired = max(self.min_concurrency, min(self.max_concurrency, desired))
+        if desired < self.capacity:
+            desired = self.capacity - 1
+        return desired
+
+    def _apply(self, capacity: int) -> None:
+        """Aplica la capacidad como prefetch global del canal y la exporta."""
+        self.server.set_capacity(capacity)
+        self.capacity = capacity
+        metrics.set_gauge("worker_concurrency_target", capacity)
+
+    def _tick(self) -> None:
+        """Muestrea, decide y reprograma el siguiente muestreo."""
+        self._timer = None
+        try:
+            in_flight = self.server.in_flight
+            backlog = self.sample()
+            capacity = self.decide(backlog, in_flight)
+            metrics.set_gauge("worker_utilization", in_flight / self.capacity)
+            if capacity != self.capacity:
+                direction = "up" if capacity > self.capacity else "down"
+                metrics.inc("worker_scaling_decisions_total", direction=direction)
+                logger.info(f"Autoescalado {direction}: {self.capacity} -> {capacity} (backlog {backlog:.0f})")
+                self._apply(capacity)
+        except Exception as e:
+            logger.error(f"Error en el autoescalado: {str(e)}")
+        self._timer = self.server.channel.connection.call_later(self.interval, self._tick)
@@ -0,0 +1,123 @@
+"""
+Módulo que implementa el circuit breaker del cliente RPC, uno por cola de destino.
+
+Tras ``breaker_failure_threshold`` fallos consecutivos (timeouts y errores de conexión)
+el circuito se abre y las llamadas a esa cola fallan inmediatamente con ``CircuitOpenError``.
+Las respuestas de error del worker (cabecera ``x-error``) cuentan como éxito: demuestran
+que la cola responde, y el error puede deberse sólo a la petición de un llamador.
+Pasados ``breaker_reset_timeout`` segundos pasa a semiabierto y deja pasar una única
+petición de prueba: si tiene éxito el circuito se cierra y si falla se vuelve a abrir.
+
+El estado de cada circuito se exporta en la métrica ``rpc_circuit_state``
+(0 = cerrado, 1 = abierto, 2 = semiabierto).
+"""
+
+import threading
+import time
+from typing import Optional
+
+from core.config.tuning import get_tuning
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """Circuit breaker thread-safe de una cola."""
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        """
+        Inicializa el circuito cerrado.
+
+        Args:
+            name (str): Cola protegida
+            failure_threshold (Optional[int]): Fallos consecutivos para abrirlo; por defecto, el de tuning
+            reset_timeout (Optional[float]): Segundos abierto antes de la prueba; por defecto, el de tuning
+        """
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        metrics.set_gauge("rpc_circuit_state", STATE_VALUES[CLOSED], queue=name)
+
+    @property
+    def failure_threshold(self) -> int:
+        """Fallos consecutivos que abren el circuito."""
+        return self._failure_threshold or get_tuning().breaker_failure_threshold
+
+    @property
+    def reset_timeout(self) -> float:
+        """Segundos que el circuito permanece abierto antes de la prueba."""
+        return self._reset_timeout or get_tuning().breaker_reset_timeout
+
+    def _set_state(self, state: str) -> None:
+        """Cambia el estado del circuito y lo exporta (con el lock adquirido)."""
+        if state != self.state:
+            logger.warning(f"Circuit breaker de '{self.name}': {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge("rpc_circuit_state", STATE_VALUES[state], queue=self.name)
+
+    def allow(self) -> bool:
+        """
+        Indica si se puede enviar una petición; en semiabierto sólo se admite una prueba a la vez.
+
+        Returns:
+            bool: True si la petición puede enviarse
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        metrics.inc("rpc_circuit_rejected_total", queue=self.name)
+        return False
+
+    def retry_after(self) -> float:
+        """Segundos que faltan para que el circuito admita una petición de prueba."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        """Registra una petición con respuesta: cierra el circuito."""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """Registra un timeout o error: abre el circuito si falla la prueba o se alcanza el umbral."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_circuit_breaker(queue: str) -> CircuitBreaker:
+    """Obtiene (o crea) el circuit breaker de una cola, compartido por todos los clientes del proceso."""
+    with _lock:
+        if queue not in _breakers:
+            _breakers[queue] = CircuitBreaker(queue)
+        return _breakers[queue]
@@ -0,0 +1,242 @@
+"""
+Módulo que implementa el claim check de cuerpos grandes.
+
+Los cuerpos que superan el umbral no viajan por el broker: se guardan en un almacén
+direccionado por contenido (sha256) y el mensaje sólo lleva la referencia en la
+cabecera ``x-claim-check``. El servidor mapea el fichero en memoria (mmap) y lo entrega
+al handler sin copiarlo; las respuestas grandes vuelven por el mismo camino si el
+emisor anuncia ``x-accept-claim-check``.
+
+Como un mismo contenido puede estar referenciado por varios mensajes (contenido
+idéntico, reintentos o peticiones duplicadas), los ficheros no se borran al leerlos:
+expiran por TTL y se purgan de forma oportunista al escribir, en un hilo aparte para
+no recorrer el almacén en el camino de publicación.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from core.config.settings import CLAIM_CHECK_CONFIG
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+from features.rabbitmq.compression import compress_body, decompress_body
+
+logger = get_logger(__name__)
+
+CLAIM_CHECK_HEADER = "x-claim-check"
+ACCEPT_CLAIM_CHECK_HEADER = "x-accept-claim-check"
+
+Body = Union[bytes, memoryview]
+
+
+class ClaimCheckStore(ABC):
+    """Interfaz de los almacenes de claim check."""
+
+    def __init__(self, ttl: int):
+        """
+        Inicializa el almacén.
+
+        Args:
+            ttl (int): Segundos que se conserva cada cuerpo desde su última escritura
+        """
+        self.ttl = ttl
+
+    @abstractmethod
+    def put(self, body: Body) -> str:
+        """Guarda un cuerpo y devuelve su referencia."""
+
+    @abstractmethod
+    def open(self, ref: str) -> memoryview:
+        """
+        Obtiene el cuerpo de una referencia.
+
+        Raises:
+            KeyError: Si la referencia no existe o expiró
+        """
+
+    @abstractmethod
+    def purge(self) -> int:
+        """Borra los cuerpos expirados y devuelve cuántos se borraron."""
+
+
+class FileClaimCheckStore(ClaimCheckStore):
+    """
+    Almacén sobre un directorio local o un volumen compartido por la API y los workers.
+
+    Cada cuerpo se guarda en ``<dir>/<sha256[:2]>/<sha256>`` y se lee con mmap.
+    """
+
+    def __init__(self, path: str, ttl: int, purge_interval: float = 60):
+        """
+        Inicializa el almacén, creando el directorio si no existe.
+
+        Args:
+            path (str): Directorio del almacén
+            ttl (int): Segundos que se conserva cada cuerpo
+            purge_interval (float): Segundos mínimos entre purgas oportunistas
+        """
+        super().__init__(ttl)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._purge_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _file(self, ref: str) -> Path:
+        """Ruta del fichero de una referencia (validando que sea un sha256)."""
+        if len(ref) != 64 or not all(char in "0123456789abcdef" for char in ref):
+            raise KeyError(f"Referencia de claim check no válida: '{ref}'")
+        return self.path / ref[:2] / ref
+
+    def put(self, body: Body) -> str:
+        ref = hashlib.sha256(body).hexdigest()
+        path = self._file(ref)
+        try:
+            # Contenido ya almacenado: renovar su TTL
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(exist_ok=True)
+            # Escritura atómica: los lectores nunca ven un fichero a medias
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as file:
+                file.write(body)
+            os.replace(tmp, path)
+            metrics.inc("claim_check_bytes_total", len(body))
+        metrics.inc("claim_check_puts_total")
+        self._schedule_purge()
+        return ref
+
+    def _schedule_purge(self) -> None:
+        """Lanza la purga oportunista en segundo plano si toca y no hay otra en curso."""
+        with self._lock:
+            if time.monotonic() - self._last_purge < self.purge_interval:
+                return
+            if self._purge_thread is not None and self._purge_thread.is_alive():
+                return
+            # Se marca ya para que las escrituras concurrentes no lancen otra purga
+            self._last_purge = time.monotonic()
+            self._purge_thread = threading.Thread(target=self._purge_safely, name="claim-check-purge", daemon=True)
+            self._purge_thread.start()
+
+    def _purge_safely(self) -> None:
+        """Ejecuta la purga en segundo plano registrando sus errores."""
+        try:
+            self.purge()
+        except Exception as e:
+            logger.error(f"Error al purgar los claim checks expirados: {str(e)}")
+
+    def open(self, ref: str) -> memoryview:
+        path = self._file(ref)
+        try:
+            with open(path, "rb") as file:
+                # El mapeo sigue siendo válido aunque se cierre el fichero o se purgue después
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as e:
+            raise KeyError(f"Claim check no encontrado: '{ref}'") from e
+        return memoryview(mapped)
+
+    def purge(self) -> int:
+        with self._lock:
+            self._last_purge = time.monotonic()
+        deadline = time.time() - self.ttl
+        removed = 0
+        for path in self.path.glob("*/*"):
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # Purgado a la vez por otro proceso
+                continue
+        if removed:
+            logger.info(f"Claim checks expirados purgados: {removed}")
+        return removed
+
+
+def create_claim_check_store(config: Optional[dict[str, Any]] = None) -> ClaimCheckStore:
+    """
+    Crea el almacén de claim check indicado en la configuración.
+
+    Args:
+        config (Optional[dict[str, Any]]): Configuración; por defecto CLAIM_CHECK_CONFIG
+
+    Returns:
+        ClaimCheckStore: Almacén de claim check
+
+    Raises:
+        ValueError: Si el tipo de almacén no es válido
+    """
+    config = config or CLAIM_CHECK_CONFIG
+    if config["backend"] == "file":
+        return FileClaimCheckStore(config["path"], config["ttl"], config["purge_interval"])
+    raise ValueError(f"Almacén de claim check desconocido: '{config['backend']}'")
+
+
+_store: Optional[ClaimCheckStore] = None
+_store_lock = threading.Lock()
+
+
+def get_claim_check_store() -> ClaimCheckStore:
+    """Obtiene el almacén de claim check de la aplicación, creándolo en el primer uso."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_claim_check_store()
+            logger.info(f"Almacén de claim check: {type(_store).__name__}")
+        return _store
+
+
+def should_claim_check(body: Body) -> bool:
+    """Indica si un cuerpo debe enviarse por claim check (activado y por encima del umbral)."""
+    return CLAIM_CHECK_CONFIG["enabled"] and len(body) >= CLAIM_CHECK_CONFIG["threshold"]
+
+
+def accept_claim_check() -> dict[str, Any]:
+    """Cabeceras con las que un emisor anuncia que acepta respuestas por claim check."""
+    return {ACCEPT_CLAIM_CHECK_HEADER: True} if CLAIM_CHECK_CONFIG["enabled"] else {}
+
+
+def offload_body(body: Body) -> tuple[Body, Optional[str], dict[str, Any]]:
+    """
+    Prepara un cuerpo para publicarlo: por claim check si supera el umbral o, si no, comprimido.
+
+    Args:
+        body (Body): Cuerpo del mensaje
+
+    Returns:
+        tuple[Body, Optional[str], dict[str, Any]]: Cuerpo a publicar, su ``content_encoding``
+            y las cabeceras que hay que añadir al mensaje
+    """
+    if should_claim_check(body):
+        return b"", None, {CLAIM_CHECK_HEADER: get_claim_check_store().put(body)}
+    body, encoding = compress_body(body)
+    return body, encoding, {}
+
+
+def load_body(body: Body, encoding: Optional[str], headers: Optional[dict[str, Any]]) -> Body:
+    """
+    Obtiene el cuerpo real de un mensaje: mapeado desde el almacén si lleva claim check o descomprimido.
+
+    Args:
+        body (Body): Cuerpo recibido
+        encoding (Optional[str]): Propiedad ``content_encoding`` del mensaje
+        headers (Optional[dict[str, Any]]): Cabeceras del mensaje
+
+    Returns:
+        Body: Cuerpo del mensaje (``memoryview`` sobre el fichero mapeado si lleva claim check)
+
+    Raises:
+        KeyError: Si el claim check no existe o expiró
+    """
+    ref = (headers or {}).get(CLAIM_CHECK_HEADER)
+    if ref:
+        return get_claim_check_store().open(ref)
+    return decompress_body(body, encoding)
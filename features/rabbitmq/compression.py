@@ -0,0 +1,126 @@
+"""
+Módulo que implementa la compresión de cuerpos de mensajes.
+
+Los cuerpos que superan el umbral configurado se comprimen y se marcan con la
+propiedad AMQP ``content_encoding``. Quien envía una petición anuncia en la cabecera
+``x-accept-encoding`` los codecs que sabe descomprimir, y el servidor sólo comprime
+la respuesta con uno de ellos (negociación); los clientes antiguos reciben las
+respuestas sin comprimir.
+"""
+
+import gzip
+import time
+import zlib
+from typing import Callable, Optional, Union
+
+from core.config.settings import COMPRESSION_CONFIG
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+ACCEPT_ENCODING_HEADER = "x-accept-encoding"
+
+Body = Union[bytes, memoryview]
+
+CODECS: dict[str, tuple[Callable[[Body, int], bytes], Callable[[Body], bytes]]] = {
+    "deflate": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "gzip": (lambda data, level: gzip.compress(data, level), gzip.decompress),
+}
+
+try:
+    import zstandard
+
+    CODECS["zstd"] = (
+        lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+
+    CODECS["lz4"] = (
+        lambda data, level: lz4.frame.compress(data, compression_level=level),
+        lz4.frame.decompress,
+    )
+except ImportError:
+    pass
+
+
+def accept_encoding() -> str:
+    """Valor de la cabecera ``x-accept-encoding`` con los codecs disponibles en este proceso."""
+    return ",".join(CODECS)
+
+
+def negotiate(accepted: Optional[str]) -> Optional[str]:
+    """
+    Elige el codec para una respuesta a partir de los anunciados por el emisor.
+
+    Args:
+        accepted (Optional[str]): Valor de la cabecera ``x-accept-encoding`` de la petición
+
+    Returns:
+        Optional[str]: Codec elegido (el configurado si se acepta), o None para no comprimir
+    """
+    if not accepted:
+        return None
+    candidates = [codec.strip() for codec in accepted.split(",") if codec.strip() in CODECS]
+    if not candidates:
+        return None
+    return COMPRESSION_CONFIG["codec"] if COMPRESSION_CONFIG["codec"] in candidates else candidates[0]
+
+
+def compress_body(body: Body, codec: Optional[str] = None) -> tuple[Body, Optional[str]]:
+    """
+    Comprime un cuerpo si supera el umbral configurado.
+
+    Args:
+        body (Body): Cuerpo del mensaje
+        codec (Optional[str]): Codec a usar; por defecto el configurado
+
+    Returns:
+        tuple[Body, Optional[str]]: Cuerpo (comprimido o no) y su ``content_encoding``
+    """
+    codec = codec or COMPRESSION_CONFIG["codec"]
+    if len(body) < COMPRESSION_CONFIG["threshold"] or codec not in CODECS:
+        return body, None
+
+    start = time.perf_counter()
+    compressed = CODECS[codec][0](body, COMPRESSION_CONFIG["level"])
+    metrics.observe("compression_seconds", time.perf_counter() - start, codec=codec, direction="compress")
+
+    if len(compressed) >= len(body):
+        # No compensa: se envía el original
+        return body, None
+
+    metrics.inc("compression_bytes_in_total", len(body), codec=codec)
+    metrics.inc("compression_bytes_out_total", len(compressed), codec=codec)
+    metrics.observe("compression_ratio", len(compressed) / len(body), codec=codec)
+    return compressed, codec
+
+
+def decompress_body(body: Body, encoding: Optional[str]) -> Body:
+    """
+    Descomprime un cuerpo según su ``content_encoding``.
+
+    Args:
+        body (Body): Cuerpo recibido
+        encoding (Optional[str]): Propiedad ``content_encoding`` del mensaje
+
+    Returns:
+        Body: Cuerpo descomprimido (el mismo objeto si no estaba comprimido)
+
+    Raises:
+        ValueError: Si el codec no está disponible en este proceso
+    """
+    if not encoding or encoding == "identity":
+        return body
+    if encoding not in CODECS:
+        raise ValueError(f"Codec de compresión no soportado: '{encoding}'")
+
+    start = time.perf_counter()
+    decompressed = CODECS[encoding][1](body)
+    metrics.observe("compression_seconds", time.perf_counter() - start, codec=encoding, direction="decompress")
+    return decompressed
@@ -10,6 +10,7 @@ import pika
 from pika.exceptions import AMQPChannelError, AMQPConnectionError, StreamLostError
 
 from core.config.settings import RABBITMQ_CONFIG
+from core.config.tuning import get_tuning
 from core.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -40,9 +41,14 @@ class RabbitMQConnection:
 
         self._initialized = True
         self.url = RABBITMQ_CONFIG["url"]
-        self.heartbeat = RABBITMQ_CONFIG["heartbeat"]
-        self.connection_attempts = RABBITMQ_CONFIG["connection_attempts"]
-        self.retry_delay = RABBITMQ_CONFIG["retry_delay"]
+        self._load_tuning()
+
+    def _load_tuning(self):
+        """Lee los parámetros de conexión de la configuración de tuning vigente."""
+        tuning = get_tuning()
+        self.heartbeat = tuning.heartbeat
+        self.connection_attempts = tuning.connection_attempts
+        self.retry_delay = tuning.retry_delay
 
     def _create_channel(self) -> bool:
         """
@@ -71,8 +77,14 @@ class RabbitMQConnection:
             logger.warning("Ya existe un intento de conexión en curso")
             return False
 
+        if not self.url:
+            logger.error("RABBITMQ_URL no está configurada en las variables de entorno")
+            raise ValueError("RABBITMQ_URL no está configurada en las variables de entorno")
+
         self._is_connecting = True
         try:
+            # Aplicar los parámetros recargados desde la última conexión
+            self._load_tuning()
             parameters = pika.URLParameters(self.url)
             parameters.heartbeat = self.heartbeat
             parameters.connection_attempts = self.connection_attempts
@@ -154,6 +166,21 @@ class RabbitMQConnection:
 
         return True
 
+    def open_channel(self) -> pika.adapters.blocking_connection.BlockingChannel:
+        """
+        Abre un canal adicional sobre la conexión actual (p. ej. para publicar en modo transaccional
+        sin afectar al canal compartido).
+
+        Returns:
+            pika.adapters.blocking_connection.BlockingChannel: Nuevo canal
+
+        Raises:
+            ConnectionError: Si no hay conexión con RabbitMQ
+        """
+        if not self.ensure_channel():
+            raise ConnectionError("No se pudo establecer el canal")
+        return self._connection.channel()
+
     def process_data_events(self, time_limit: float = 1.0):
         """Procesa eventos de datos de la conexión."""
         if self._connection:
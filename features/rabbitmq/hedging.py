@@ -0,0 +1,117 @@
+"""
+Módulo que implementa la política de peticiones de cobertura (hedged requests) del cliente RPC.
+
+El cliente registra la latencia de cada llamada por cola de destino. En las llamadas
+idempotentes que activan la cobertura, si la respuesta no llega dentro del percentil
+configurado de esa latencia, se publica un duplicado con el mismo correlation_id
+(en otro shard si la cola está particionada) y se usa la primera respuesta; la tardía
+se descarta porque su correlation_id ya no es el esperado.
+
+Las coberturas se limitan con un presupuesto: cada llamada completada suma
+``max_rate`` y cada duplicado consume 1, de modo que como mucho una fracción
+``max_rate`` de las peticiones se duplica aunque todo el clúster vaya lento.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Optional
+
+from core.config.settings import HEDGE_CONFIG
+from features.rabbitmq.lanes import lane_queue_name
+from features.rabbitmq.sharding import get_shard_router, shard_queue_name
+
+# Presupuesto máximo acumulable (ráfaga de coberturas tras un periodo sin ellas)
+MAX_HEDGE_BUDGET = 10.0
+
+
+class HedgePolicy:
+    """Latencias por cola y presupuesto de coberturas, compartidos por todos los clientes del proceso."""
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        min_delay: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        window: Optional[int] = None,
+        min_samples: Optional[int] = None,
+    ):
+        """
+        Inicializa la política sin latencias registradas.
+
+        Args:
+            percentile (Optional[float]): Percentil (0-1) de la latencia tras el que se cubre la petición
+            min_delay (Optional[float]): Espera mínima en segundos antes de cubrir
+            max_rate (Optional[float]): Fracción máxima de peticiones que se duplican
+            window (Optional[int]): Latencias recientes que se conservan por cola
+            min_samples (Optional[int]): Latencias necesarias antes de empezar a cubrir
+        """
+        self.percentile = percentile if percentile is not None else HEDGE_CONFIG["percentile"]
+        self.min_delay = min_delay if min_delay is not None else HEDGE_CONFIG["min_delay"]
+        self.max_rate = max_rate if max_rate is not None else HEDGE_CONFIG["max_rate"]
+        self.window = window or HEDGE_CONFIG["window"]
+        self.min_samples = min_samples if min_samples is not None else HEDGE_CONFIG["min_samples"]
+        self._latencies: dict[str, deque] = {}
+        self._budget = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency: float) -> None:
+        """Registra la latencia de una llamada completada y recarga el presupuesto."""
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+            self._budget = min(MAX_HEDGE_BUDGET, self._budget + self.max_rate)
+
+    def delay(self, key: str) -> Optional[float]:
+        """
+        Obtiene la espera tras la que se cubre una petición a ``key``.
+
+        Returns:
+            Optional[float]: Segundos de espera, o None si aún no hay latencias suficientes
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < max(self.min_samples, 1):
+            return None
+        index = min(len(samples) - 1, math.ceil(self.percentile * len(samples)) - 1)
+        return max(self.min_delay, samples[max(index, 0)])
+
+    def allow(self) -> bool:
+        """Consume una unidad del presupuesto si hay suficiente para una cobertura."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+
+def hedge_routing_key(routing_key: str, shard_key, lane: str) -> str:
+    """
+    Obtiene la cola a la que se envía el duplicado de una petición.
+
+    Si la cola lógica está particionada se usa el shard siguiente al de la clave, que
+    consume otro worker; si no, la misma cola, donde lo recogerá otro consumidor.
+
+    Args:
+        routing_key (str): Cola lógica
+        shard_key: Clave de sharding de la petición (o None)
+        lane (str): Carril de prioridad
+
+    Returns:
+        str: Cola física del duplicado
+    """
+    router = get_shard_router()
+    if router.shards == 1:
+        return lane_queue_name(routing_key, lane)
+    shard = router.shard_for(shard_key) if shard_key is not None else 0
+    return lane_queue_name(shard_queue_name(routing_key, (shard + 1) % router.shards), lane)
+
+
+_policy: Optional[HedgePolicy] = None
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """Obtiene la política de coberturas del proceso."""
+    global _policy
+    if _policy is None:
+        _policy = HedgePolicy()
+    return _policy
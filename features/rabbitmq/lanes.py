@@ -0,0 +1,38 @@
+"""
+Módulo que define los carriles de prioridad de las colas de operaciones.
+
+Cada carril es una cola física independiente; el worker reparte su capacidad de
+consumo entre carriles según su peso, de modo que las peticiones interactivas
+(carril "default") no quedan detrás de los lotes masivos (carril "bulk").
+"""
+
+from typing import Optional
+
+from core.config.settings import RABBITMQ_LANES
+
+DEFAULT_LANE = "default"
+BULK_LANE = "bulk"
+
+
+def lane_queue_name(queue: str, lane: str = DEFAULT_LANE) -> str:
+    """
+    Obtiene el nombre de la cola física de un carril.
+
+    Args:
+        queue (str): Nombre de la cola (lógica o de un shard)
+        lane (str): Nombre del carril
+
+    Returns:
+        str: Nombre de la cola física del carril
+
+    Raises:
+        ValueError: Si el carril no está configurado
+    """
+    if lane not in RABBITMQ_LANES:
+        raise ValueError(f"Carril desconocido: '{lane}'")
+    return queue if lane == DEFAULT_LANE else f"{queue}.{lane}"
+
+
+def lane_weights(lanes: Optional[dict[str, int]] = None) -> dict[str, int]:
+    """Obtiene los pesos de los carriles, usando la configuración por defecto si no se indican."""
+    return dict(RABBITMQ_LANES if lanes is None else lanes)
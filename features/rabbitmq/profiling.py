@@ -0,0 +1,229 @@
+"""
+Módulo que implementa el perfilado bajo demanda de los handlers del servidor.
+
+El tiempo de CPU de cada handler se mide siempre (``time.thread_time``, de coste
+despreciable) y se exporta como la métrica ``handler_cpu_seconds``. La captura con
+cProfile y tracemalloc se activa sólo durante N segundos o N mensajes; al terminar se
+vuelca un fichero ``.prof`` por operación (legible con ``pstats``/snakeviz) y un
+resumen de las asignaciones de memoria.
+
+Sólo se perfila la llamada al handler (no la decodificación del mensaje ni la
+publicación de la respuesta), de un handler en cada momento: cProfile no admite el
+mismo perfil activo en varios hilos. Ningún hilo espera por el perfilador: si otro
+handler ocupa la captura, el mensaje se procesa sin perfilar, y al detener la captura
+mientras un handler se está perfilando, el volcado lo hace ese handler al terminar.
+"""
+
+import cProfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from core.config.settings import PROFILING_CONFIG
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+from features.rabbitmq.streaming import is_stream
+
+logger = get_logger(__name__)
+
+# Líneas del resumen de tracemalloc que se vuelcan al terminar la captura
+TRACEMALLOC_TOP = 25
+
+
+class HandlerProfiler:
+    """Perfilador de handlers con captura de cProfile/tracemalloc activable en caliente."""
+
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        duration: Optional[float] = None,
+        max_messages: Optional[int] = None,
+    ):
+        """
+        Inicializa el perfilador (inactivo).
+
+        Args:
+            output_dir (Optional[str]): Directorio donde se vuelcan los perfiles
+            duration (Optional[float]): Duración por defecto de una captura en segundos
+            max_messages (Optional[int]): Mensajes por defecto de una captura
+        """
+        self.output_dir = Path(output_dir or PROFILING_CONFIG["dir"])
+        self.duration = duration if duration is not None else PROFILING_CONFIG["duration"]
+        self.max_messages = max_messages if max_messages is not None else PROFILING_CONFIG["max_messages"]
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._deadline = 0.0
+        self._remaining = 0
+        self._active = False
+        # La captura terminó pero sus perfiles aún no se han volcado
+        self._dump_pending = False
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+        # Lo tiene el handler que se está perfilando; nunca se espera por él
+        self._capture_lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Indica si hay una captura en curso."""
+        return self._active
+
+    def start(self, duration: Optional[float] = None, max_messages: Optional[int] = None) -> bool:
+        """
+        Inicia una captura que termina tras ``duration`` segundos o ``max_messages`` mensajes.
+
+        Returns:
+            bool: False si ya había una captura en curso (o pendiente de volcar)
+        """
+        with self._lock:
+            if self._active or self._dump_pending:
+                return False
+            self._profiles = {}
+            self._deadline = time.monotonic() + (duration if duration is not None else self.duration)
+            self._remaining = max_messages if max_messages is not None else self.max_messages
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start()
+            self._active = True
+        logger.info(f"Captura de perfiles iniciada ({self._remaining} mensajes como máximo)")
+        return True
+
+    def stop(self) -> list[Path]:
+        """
+        Detiene la captura en curso y vuelca los perfiles, sin bloquearse.
+
+        Si hay un handler perfilándose, el volcado lo hace ese handler al terminar.
+
+        Returns:
+            list[Path]: Ficheros generados (vacía si no había captura o se volcará después)
+        """
+        with self._lock:
+            if not self._active:
+                return []
+            self._active = False
+            self._dump_pending = True
+        paths = self._dump_pending_profiles()
+        if self._dump_pending:
+            logger.info("Captura de perfiles finalizada; se volcará al terminar el handler en curso")
+        return paths
+
+    def toggle(self) -> bool:
+        """Inicia una captura si no hay ninguna en curso o detiene la actual. Devuelve si queda activa."""
+        if self._active:
+            self.stop()
+            return False
+        return self.start()
+
+    def run(self, operation: str, handler: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta un handler midiendo (y, durante una captura, perfilando) su tiempo de CPU.
+
+        Si el handler devuelve un generador, se devuelve otro que perfila cada fragmento
+        al generarlo: el stream cuenta como un solo mensaje y su CPU se suma hasta el final.
+
+        Args:
+            operation (str): Nombre de la operación (un perfil por operación)
+            handler (Callable): Handler a ejecutar
+            *args (Any): Argumentos del handler
+
+        Returns:
+            Any: Resultado del handler
+        """
+        cpu_start = time.thread_time()
+        try:
+            with self._capture(operation):
+                result = handler(*args)
+        except Exception:
+            self._finish(operation, time.thread_time() - cpu_start)
+            raise
+        if is_stream(result):
+            return self._stream(operation, result, time.thread_time() - cpu_start)
+        self._finish(operation, time.thread_time() - cpu_start)
+        return result
+
+    def _stream(self, operation: str, chunks: Iterator[Any], cpu: float) -> Iterator[Any]:
+        """Perfila la generación de cada fragmento de un stream (no su publicación)."""
+        end = object()
+        try:
+            while True:
+                cpu_start = time.thread_time()
+                try:
+                    with self._capture(operation):
+                        chunk = next(chunks, end)
+                finally:
+                    cpu += time.thread_time() - cpu_start
+                if chunk is end:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+            self._finish(operation, cpu)
+
+    @contextmanager
+    def _capture(self, operation: str) -> Iterator[None]:
+        """Perfila el bloque si hay una captura en curso y ningún otro handler la ocupa."""
+        if not self._active or not self._capture_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            # La captura pudo terminar mientras se adquiría el turno
+            profile = self._profiles.setdefault(operation, cProfile.Profile()) if self._active else None
+            if profile is None:
+                yield
+                return
+            memory_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                if tracemalloc.is_tracing():
+                    allocated = tracemalloc.get_traced_memory()[0] - memory_start
+                    metrics.observe("handler_alloc_bytes", max(allocated, 0), operation=operation)
+        finally:
+            self._capture_lock.release()
+            # Si la captura terminó mientras se perfilaba, el volcado se hace aquí
+            self._dump_pending_profiles()
+
+    def _finish(self, operation: str, cpu: float) -> None:
+        """Registra el tiempo de CPU de un mensaje y termina la captura al cumplirse sus límites."""
+        metrics.observe("handler_cpu_seconds", cpu, operation=operation)
+        with self._lock:
+            if not self._active:
+                return
+            self._remaining -= 1
+            finished = self._remaining <= 0 or time.monotonic() >= self._deadline
+        if finished:
+            self.stop()
+
+    def _dump_pending_profiles(self) -> list[Path]:
+        """Vuelca los perfiles de una captura terminada si ningún handler se está perfilando."""
+        if not self._dump_pending or not self._capture_lock.acquire(blocking=False):
+            return []
+        try:
+            if not self._dump_pending:
+                return []
+            self._dump_pending = False
+            profiles, self._profiles = self._profiles, {}
+            snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        finally:
+            self._capture_lock.release()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = []
+        for operation, profile in profiles.items():
+            path = self.output_dir / f"{stamp}-{operation}.prof"
+            profile.dump_stats(path)
+            paths.append(path)
+        if snapshot is not None:
+            path = self.output_dir / f"{stamp}-tracemalloc.txt"
+            top = snapshot.statistics("lineno")[:TRACEMALLOC_TOP]
+            path.write_text("\n".join(str(stat) for stat in top) + "\n")
+            paths.append(path)
+        logger.info(f"Captura de perfiles finalizada: {[str(path) for path in paths]}")
+        return paths
@@ -0,0 +1,174 @@
+"""
+Módulo que implementa el publicador masivo de mensajes sin respuesta (fire-and-forget).
+
+Los mensajes se acumulan en un buffer acotado y se publican en ráfagas sobre un canal
+propio, sin esperar una respuesta por mensaje. Con ``confirm=True`` cada ráfaga se
+publica dentro de una transacción AMQP (``tx_select``/``tx_commit``): el broker
+confirma el lote completo con un único viaje de ida y vuelta, en lugar de uno por
+mensaje como ocurre con ``confirm_delivery`` en el adaptador bloqueante de pika.
+
+Como el resto de objetos de pika, un publicador no es thread-safe: se usa uno por hilo.
+"""
+
+from collections.abc import Iterable
+from typing import Any, Callable, Optional, Union
+
+import pika
+
+from core.config.settings import PUBLISHER_CONFIG
+from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+from features.rabbitmq.claim_check import offload_body
+from features.rabbitmq.conexion import RabbitMQConnection
+from features.rabbitmq.lanes import DEFAULT_LANE, lane_queue_name
+from features.rabbitmq.sharding import get_shard_router
+
+logger = get_logger(__name__)
+
+
+class BulkPublisher:
+    """Publicador por lotes de mensajes de una sola vía."""
+
+    def __init__(
+        self,
+        rabbit_conn: RabbitMQConnection,
+        batch_size: Optional[int] = None,
+        max_buffer_bytes: Optional[int] = None,
+        confirm: Optional[bool] = None,
+    ):
+        """
+        Inicializa el publicador y abre su canal.
+
+        Args:
+            rabbit_conn (RabbitMQConnection): Conexión RabbitMQ
+            batch_size (Optional[int]): Mensajes por ráfaga; al alcanzarlo se publica el buffer
+            max_buffer_bytes (Optional[int]): Bytes máximos en el buffer; al superarlos se publica
+            confirm (Optional[bool]): Si es True, cada ráfaga se confirma en una transacción
+        """
+        self.rabbit_conn = rabbit_conn
+        self.batch_size = batch_size or PUBLISHER_CONFIG["batch_size"]
+        self.max_buffer_bytes = max_buffer_bytes or PUBLISHER_CONFIG["max_buffer_bytes"]
+        self.confirm = PUBLISHER_CONFIG["confirm"] if confirm is None else confirm
+        self.channel = None
+        self._buffer: list[tuple[str, bytes, pika.BasicProperties]] = []
+        self._buffer_bytes = 0
+        self._open_channel()
+
+    def _open_channel(self) -> None:
+        """Abre el canal propio del publicador (transaccional si se piden confirmaciones)."""
+        self.channel = self.rabbit_conn.open_channel()
+        if self.confirm:
+            self.channel.tx_select()
+
+    def publish(
+        self,
+        routing_key: str,
+        message: Union[str, bytes],
+        shard_key: Optional[Union[str, bytes]] = None,
+        lane: str = DEFAULT_LANE,
+        headers: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """
+        Añade un mensaje al buffer; el buffer se publica al llenarse.
+
+        Args:
+            routing_key (str): Cola lógica de destino
+            message (Union[str, bytes]): Mensaje a enviar
+            shard_key (Optional[Union[str, bytes]]): Clave de sharding
+            lane (str): Carril de prioridad
+            headers (Optional[dict[str, Any]]): Cabeceras AMQP adicionales
+
+        Raises:
+            ConnectionError: Si no se puede publicar el buffer
+        """
+        if shard_key is not None:
+            routing_key = get_shard_router().queue_for(routing_key, shard_key)
+        routing_key = lane_queue_name(routing_key, lane)
+        body, content_encoding, claim_headers = offload_body(message.encode() if isinstance(message, str) else message)
+        properties = pika.BasicProperties(
+            delivery_mode=2, headers={**(headers or {}), **claim_headers} or None, content_encoding=content_encoding
+        )
+
+        self._buffer.append((routing_key, bytes(body), properties))
+        self._buffer_bytes += len(body)
+        if len(self._buffer) >= self.batch_size or self._buffer_bytes >= self.max_buffer_bytes:
+            self.flush()
+
+    def publish_many(
+        self,
+        routing_key: str,
+        messages: Iterable[Union[str, bytes]],
+        shard_key_fn: Optional[Callable[[Union[str, bytes]], Union[str, bytes]]] = None,
+        lane: str = DEFAULT_LANE,
+        headers: Optional[dict[str, Any]] = None,
+    ) -> int:
+        """
+        Publica un iterable de mensajes en ráfagas y vacía el buffer al terminar.
+
+        Args:
+            routing_key (str): Cola lógica de destino
+            messages (Iterable[Union[str, bytes]]): Mensajes a enviar
+            shard_key_fn (Optional[Callable]): Función que obtiene la clave de sharding de cada mensaje (opcional)
+            lane (str): Carril de prioridad
+            headers (Optional[dict[str, Any]]): Cabeceras AMQP adicionales
+
+        Returns:
+            int: Número de mensajes publicados
+
+        Raises:
+            ConnectionError: Si no se puede publicar algún lote
+        """
+        count = 0
+        for message in messages:
+            key = shard_key_fn(message) if shard_key_fn else None
+            self.publish(routing_key, message, shard_key=key, lane=lane, headers=headers)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self) -> int:
+        """
+        Publica todos los mensajes del buffer en una ráfaga.
+
+        Returns:
+            int: Número de mensajes publicados
+
+        Raises:
+            ConnectionError: Si la conexión se pierde; los mensajes del lote fallido se descartan
+                (con ``confirm=True`` el broker tampoco los habrá encolado)
+        """
+        if not self._buffer:
+            return 0
+        batch, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        try:
+            if not self.channel or not self.channel.is_open:
+                self._open_channel()
+            for routing_key, body, properties in batch:
+                self.channel.basic_publish(exchange="", routing_key=routing_key, properties=properties, body=body)
+            if self.confirm:
+                self.channel.tx_commit()
+        except pika.exceptions.AMQPError as e:
+            logger.error(f"Error al publicar un lote de {len(batch)} mensajes: {str(e)}")
+            metrics.inc("publisher_failed_total", len(batch))
+            raise ConnectionError(f"No se pudo publicar el lote: {str(e)}") from e
+
+        metrics.inc("publisher_messages_total", len(batch))
+        metrics.inc("publisher_batches_total")
+        return len(batch)
+
+    def close(self) -> None:
+        """Publica los mensajes pendientes y cierra el canal del publicador."""
+        try:
+            self.flush()
+        finally:
+            if self.channel and self.channel.is_open:
+                self.channel.close()
+            self.channel = None
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit: vacía el buffer y cierra el canal."""
+        self.close()
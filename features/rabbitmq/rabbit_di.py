@@ -1,17 +1,26 @@
-from typing import Optional
+import queue
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional
 
 from core.utils.logging import get_logger
-from features.rabbitmq.rabbitmq_connection_client import RabbitMQClient
-from features.rabbitmq.rabbitmq_connection_server import RabbitMQServer
+from features.rabbitmq.lanes import lane_queue_name, lane_weights
+from features.rabbitmq.sharding import get_shard_router
 
-from .conexion import RabbitMQConnection
+# Los módulos que dependen de pika se importan bajo demanda para acelerar el arranque
+if TYPE_CHECKING:
+    from features.rabbitmq.publisher import BulkPublisher
+    from features.rabbitmq.rabbitmq_connection_client import RabbitMQClient
+    from features.rabbitmq.rabbitmq_connection_server import RabbitMQServer
+
+    from .conexion import RabbitMQConnection
 
 logger = get_logger(__name__)
 
 
 class ContainerRabbitMQ:
     _instance: Optional["ContainerRabbitMQ"] = None
-    _connection: Optional[RabbitMQConnection] = None
+    _connection: Optional["RabbitMQConnection"] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -22,10 +31,13 @@ class ContainerRabbitMQ:
         if not hasattr(self, "initialized"):
             self.initialized = True
             self._connection = None
+            self._clients: queue.SimpleQueue = queue.SimpleQueue()
 
     @property
-    def connection(self) -> RabbitMQConnection:
+    def connection(self) -> "RabbitMQConnection":
         """Obtiene la conexión actual o crea una nueva si no existe."""
+        from .conexion import RabbitMQConnection
+
         if self._connection is None or not self._connection.is_connected():
             self._connection = RabbitMQConnection()
             if not self._connection.connect():
@@ -43,18 +55,69 @@ class ContainerRabbitMQ:
             return self._connection.reconnect()
         return False
 
-    def conexionClient(self):
+    def conexionClient(self) -> "RabbitMQClient":
+        from features.rabbitmq.rabbitmq_connection_client import RabbitMQClient
+
         return RabbitMQClient(self.connection)
 
-    def conexionServer(self):
+    def conexionServer(self) -> "RabbitMQServer":
+        from features.rabbitmq.rabbitmq_connection_server import RabbitMQServer
+
         channel = self.get_channel()
         return RabbitMQServer(channel)
 
+    def publisher(self, confirm: Optional[bool] = None) -> "BulkPublisher":
+        """Crea un publicador masivo con su propio canal sobre la conexión actual."""
+        from features.rabbitmq.publisher import BulkPublisher
+
+        return BulkPublisher(self.connection, confirm=confirm)
+
+    @contextmanager
+    def client(self) -> Iterator["RabbitMQClient"]:
+        """
+        Presta un cliente RPC del pool (o crea uno nuevo si no hay libres).
+
+        Reutilizar clientes evita declarar una cola de callback por petición.
+        """
+        try:
+            client = self._clients.get_nowait()
+            # Descartar clientes cuyo canal se cerró (p. ej. tras una reconexión)
+            if client.channel is None or not client.channel.is_open:
+                client = self.conexionClient()
+        except queue.Empty:
+            client = self.conexionClient()
+        try:
+            yield client
+        finally:
+            self._clients.put(client)
+
+    def warm_up(self, queues: list[str], clients: int = 0) -> None:
+        """
+        Precalienta la conexión: declara la topología de destino y abre clientes RPC.
+
+        Declarar de antemano las colas (todos los shards y carriles) evita que los primeros
+        mensajes se descarten si el worker aún no las ha creado.
+
+        Args:
+            queues (list[str]): Colas lógicas a las que publica este proceso
+            clients (int): Número de clientes RPC que se dejan abiertos en el pool
+        """
+        channel = self.get_channel()
+        router = get_shard_router()
+        for logical_queue in queues:
+            for shard_queue in router.queues(logical_queue):
+                for lane in lane_weights():
+                    channel.queue_declare(queue=lane_queue_name(shard_queue, lane))
+        for _ in range(clients):
+            self._clients.put(self.conexionClient())
+        logger.info(f"Precalentamiento completado ({len(queues)} colas, {clients} clientes)")
+
     def close(self):
         """Cierra la conexión con RabbitMQ."""
         if self._connection:
             self._connection.close()
             self._connection = None
+        self._clients = queue.SimpleQueue()
 
     def __enter__(self):
         """Context manager entry."""
@@ -2,18 +2,35 @@
 Módulo que implementa el cliente RabbitMQ para enviar mensajes y recibir respuestas.
 """
 
+import asyncio
 import logging
 import time
 import uuid
-from typing import Optional
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Optional, Union
 
 import pika
 from pika.exceptions import AMQPChannelError, AMQPConnectionError, StreamLostError
 
+from core.config.tuning import get_tuning
+from core.utils.exceptions import CircuitOpenError, ResponseError
+from core.utils.metrics import metrics
+from features.rabbitmq.circuit_breaker import get_circuit_breaker
+from features.rabbitmq.claim_check import accept_claim_check, load_body, offload_body
+from features.rabbitmq.compression import ACCEPT_ENCODING_HEADER, accept_encoding
 from features.rabbitmq.conexion import RabbitMQConnection
+from features.rabbitmq.hedging import get_hedge_policy, hedge_routing_key
+from features.rabbitmq.lanes import DEFAULT_LANE, lane_queue_name
+from features.rabbitmq.result_backend import JOB_ID_HEADER, JOB_PENDING, get_result_backend
+from features.rabbitmq.retry import ERROR_HEADER
+from features.rabbitmq.sharding import get_shard_router
+from features.rabbitmq.streaming import STREAM_END_HEADER, STREAM_ERROR_HEADER, STREAM_SEQ_HEADER
 
 logger = logging.getLogger(__name__)
 
+# Segundos entre consultas a la conexión de los streams iterados desde asyncio
+STREAM_POLL_INTERVAL = 0.02
+
 
 class RabbitMQClient:
     """
@@ -32,7 +49,9 @@ class RabbitMQClient:
         self.connection = None
         self.callback_queue = None
         self.response = None
+        self.response_headers: dict = {}
         self.corr_id = None
+        self.stream_chunks: dict[int, tuple[bytes, dict]] = {}
         self._setup_connection()
 
     def _setup_connection(self):
@@ -51,7 +70,14 @@ class RabbitMQClient:
     def on_response(self, ch, method, props, body):
         """Callback que procesa la respuesta recibida"""
         if self.corr_id == props.correlation_id:
-            self.response = body
+            # Las respuestas por claim check llegan mapeadas: se copian para entregarlas como bytes
+            body = bytes(load_body(body, props.content_encoding, props.headers))
+            headers = props.headers or {}
+            if STREAM_SEQ_HEADER in headers:
+                self.stream_chunks[headers[STREAM_SEQ_HEADER]] = (body, headers)
+            else:
+                self.response = body
+                self.response_headers = headers
 
     def ensure_connection(self):
         """Asegura que la conexión esté activa, reconectando si es necesario"""
@@ -66,82 +92,192 @@ class RabbitMQClient:
                 return False
         return True
 
-    def call(self, routing_key: str, message: str, max_retries: int = 3) -> Optional[str]:
+    def _resolve_routing_key(self, routing_key: str, shard_key: Optional[Union[str, bytes]], lane: str) -> str:
+        """Obtiene la cola física (shard y carril) a la que se publica el mensaje"""
+        if shard_key is not None:
+            routing_key = get_shard_router().queue_for(routing_key, shard_key)
+        return lane_queue_name(routing_key, lane)
+
+    def call(
+        self,
+        routing_key: str,
+        message: str,
+        max_retries: Optional[int] = None,
+        shard_key: Optional[str] = None,
+        lane: str = DEFAULT_LANE,
+        hedge: bool = False,
+    ) -> Optional[str]:
         """
         Envía un mensaje y espera la respuesta con reintentos.
 
         Args:
             routing_key (str): Clave de enrutamiento para el mensaje
             message (str): Mensaje a enviar
-            max_retries (int): Número máximo de reintentos
+            max_retries (Optional[int]): Número máximo de intentos si se pierde la conexión; por defecto,
+                el de la configuración de tuning para la cola
+            shard_key (Optional[str]): Clave de sharding; si se indica, el mensaje se enruta
+                al shard de la cola lógica ``routing_key`` que le corresponde
+            lane (str): Carril de prioridad ("default" para peticiones interactivas, "bulk" para lotes)
+            hedge (bool): Si es True, la petición se duplica cuando su respuesta se retrasa más que el
+                percentil de latencia de la cola (sólo para operaciones idempotentes)
 
         Returns:
             Optional[str]: Respuesta recibida o None si falla después de los reintentos
 
         Raises:
             ConnectionError: Si no se puede establecer la conexión después de los reintentos
+            TimeoutError: Si no llega la respuesta dentro del ``reply_timeout``
+        """
+        response = self.call_raw(
+            routing_key, message.encode(), max_retries=max_retries, shard_key=shard_key, lane=lane, hedge=hedge
+        )
+        return response.decode() if response is not None else None
+
+    def call_raw(
+        self,
+        routing_key: str,
+        body: Union[bytes, memoryview],
+        max_retries: Optional[int] = None,
+        shard_key: Optional[Union[str, bytes]] = None,
+        lane: str = DEFAULT_LANE,
+        headers: Optional[dict[str, Any]] = None,
+        content_type: Optional[str] = None,
+        hedge: bool = False,
+    ) -> Optional[bytes]:
         """
+        Envía un cuerpo binario y devuelve la respuesta sin conversiones intermedias.
+
+        El cuerpo (``bytes`` o ``memoryview``) se publica tal cual y la respuesta se
+        devuelve como los ``bytes`` recibidos del broker, sin pasar por ``str``.
+
+        Args:
+            routing_key (str): Clave de enrutamiento para el mensaje
+            body (Union[bytes, memoryview]): Cuerpo del mensaje
+            max_retries (Optional[int]): Número máximo de intentos si se pierde la conexión; por defecto,
+                el de la configuración de tuning para la cola
+            shard_key (Optional[Union[str, bytes]]): Clave de sharding
+            lane (str): Carril de prioridad
+            headers (Optional[dict[str, Any]]): Cabeceras AMQP adicionales
+            content_type (Optional[str]): Content-type AMQP del cuerpo
+            hedge (bool): Si es True, se envía un duplicado (con el mismo correlation_id) si la
+                respuesta se retrasa; se usa la primera respuesta y la tardía se descarta
+
+        Returns:
+            Optional[bytes]: Respuesta recibida o None si falla después de los reintentos
+
+        Raises:
+            ConnectionError: Si no se puede establecer la conexión después de los reintentos
+            TimeoutError: Si no llega la respuesta dentro del ``reply_timeout`` (la petición no se
+                republica: el worker reintenta los mensajes fallidos y responde con un error al agotarlos)
+            CircuitOpenError: Si el circuit breaker de la cola está abierto (o se abre durante los reintentos)
+        """
+        logical_queue = routing_key
+        routing_key = self._resolve_routing_key(routing_key, shard_key, lane)
+        body, content_encoding, claim_headers = offload_body(body)
+        headers = {
+            **(headers or {}),
+            **claim_headers,
+            ACCEPT_ENCODING_HEADER: accept_encoding(),
+            **accept_claim_check(),
+        }
+        policy = get_hedge_policy()
+        tuning = get_tuning()
+        if max_retries is None:
+            max_retries = tuning.resolve(routing_key, "max_retries")
+        retry_sleep = tuning.resolve(routing_key, "retry_sleep")
+
+        breaker = get_circuit_breaker(routing_key)
+
         retries = 0
         last_error = None
 
         while retries < max_retries:
+            # Fallar rápido mientras la cola no responde, en lugar de agotar reintentos y timeouts
+            if not breaker.allow():
+                raise CircuitOpenError(
+                    f"Circuito abierto para la cola '{routing_key}'", retry_after=breaker.retry_after()
+                )
             try:
                 if not self.ensure_connection():
                     raise ConnectionError("No se pudo establecer conexión con RabbitMQ")
 
                 self.response = None
+                self.response_headers = {}
                 self.corr_id = str(uuid.uuid4())
+                properties = pika.BasicProperties(
+                    reply_to=self.callback_queue,
+                    correlation_id=self.corr_id,
+                    delivery_mode=2,  # Hacer el mensaje persistente
+                    headers=headers,
+                    content_type=content_type,
+                    content_encoding=content_encoding,
+                )
 
                 logger.info(f"Enviando mensaje (intento {retries + 1}/{max_retries})")
-                self.channel.basic_publish(
-                    exchange="",
-                    routing_key=routing_key,
-                    properties=pika.BasicProperties(
-                        reply_to=self.callback_queue,
-                        correlation_id=self.corr_id,
-                        delivery_mode=2,  # Hacer el mensaje persistente
-                    ),
-                    body=message.encode(),
-                )
+                self.channel.basic_publish(exchange="", routing_key=routing_key, properties=properties, body=body)
 
                 # Esperamos la respuesta con timeout
-                timeout = 60  # 60 segundos de timeout
+                timeout = tuning.resolve(routing_key, "reply_timeout")
                 start_time = time.time()
+                hedge_delay = policy.delay(routing_key) if hedge else None
 
                 while self.response is None:
-                    if time.time() - start_time > timeout:
+                    elapsed = time.time() - start_time
+                    if elapsed > timeout:
                         raise TimeoutError("Tiempo de espera agotado para la respuesta")
 
+                    # Cubrir la petición si se retrasa más que el percentil de latencia de la cola
+                    if hedge_delay is not None and elapsed >= hedge_delay:
+                        hedge_delay = None
+                        if policy.allow():
+                            hedge_key = hedge_routing_key(logical_queue, shard_key, lane)
+                            self.channel.basic_publish(
+                                exchange="", routing_key=hedge_key, properties=properties, body=body
+                            )
+                            metrics.inc("rpc_hedged_requests_total", queue=routing_key)
+                            logger.info(f"Petición cubierta tras {elapsed:.3f}s en '{hedge_key}'")
+
                     try:
-                        self.rabbit_conn.process_data_events(time_limit=0.5)
+                        time_limit = 0.5 if hedge_delay is None else min(0.5, hedge_delay - elapsed)
+                        self.rabbit_conn.process_data_events(time_limit=time_limit)
                     except (AMQPConnectionError, AMQPChannelError, StreamLostError) as e:
                         logger.error(f"Error al procesar eventos: {str(e)}")
                         if not self.ensure_connection():
                             raise ConnectionError("No se pudo reconectar después del error") from e
                         break
 
-                if self.response:
-                    return self.response.decode()
+                # Una respuesta vacía (b"") también es una respuesta válida
+                if self.response is not None:
+                    # Una respuesta de error (x-error) también demuestra que la cola responde: no abre el
+                    # circuito, porque un cuerpo no válido de un llamador lo abriría para todos los demás
+                    if ERROR_HEADER not in self.response_headers:
+                        # Su latencia incluye los reintentos del worker: no cuenta para el hedging
+                        policy.record(routing_key, time.time() - start_time)
+                    breaker.record_success()
+                    return self.response
                 else:
+                    breaker.record_failure()
                     retries += 1
                     logger.warning(f"No se recibió respuesta. Reintento {retries}/{max_retries}")
-                    time.sleep(2)  # Espera antes de reintentar
+                    time.sleep(retry_sleep)  # Espera antes de reintentar
 
             except (AMQPConnectionError, AMQPChannelError, StreamLostError) as e:
+                breaker.record_failure()
                 retries += 1
                 last_error = e
                 logger.error(f"Error de conexión: {str(e)}. Reintento {retries}/{max_retries}")
-                time.sleep(2)
+                time.sleep(retry_sleep)
                 if not self.ensure_connection():
                     raise ConnectionError("No se pudo reconectar después del error") from e
 
-            except TimeoutError as e:
-                retries += 1
-                last_error = e
-                logger.error(f"Timeout esperando respuesta: {str(e)}. Reintento {retries}/{max_retries}")
-                time.sleep(2)
+            except TimeoutError:
+                breaker.record_failure()
+                # Sin republicar: la petición sigue en cola o en proceso y duplicarla sólo añadiría carga
+                logger.error(f"Timeout esperando respuesta de '{routing_key}'")
+                raise
 
             except Exception as e:
+                breaker.record_failure()
                 logger.error(f"Error inesperado: {str(e)}")
                 raise
 
@@ -150,3 +286,222 @@ class RabbitMQClient:
                 f"No se pudo completar la operación después de {max_retries} intentos: {str(last_error)}"
             ) from last_error
         return None
+
+    def submit(
+        self,
+        routing_key: str,
+        message: str,
+        shard_key: Optional[str] = None,
+        lane: str = DEFAULT_LANE,
+    ) -> str:
+        """
+        Publica un mensaje como job asíncrono sin esperar la respuesta.
+
+        El job se registra como pendiente en el backend de resultados antes de publicarse;
+        el worker guarda allí el resultado bajo el job_id devuelto.
+
+        Args:
+            routing_key (str): Clave de enrutamiento para el mensaje
+            message (str): Mensaje a enviar
+            shard_key (Optional[str]): Clave de sharding
+            lane (str): Carril de prioridad
+
+        Returns:
+            str: Identificador del job
+
+        Raises:
+            ConnectionError: Si no se puede establecer la conexión
+        """
+        routing_key = self._resolve_routing_key(routing_key, shard_key, lane)
+        if not self.ensure_connection():
+            raise ConnectionError("No se pudo establecer conexión con RabbitMQ")
+
+        job_id = str(uuid.uuid4())
+        body, content_encoding, claim_headers = offload_body(message.encode())
+        get_result_backend().set(job_id, {"status": JOB_PENDING})
+        self.channel.basic_publish(
+            exchange="",
+            routing_key=routing_key,
+            properties=pika.BasicProperties(
+                message_id=job_id,
+                delivery_mode=2,
+                headers={**claim_headers, JOB_ID_HEADER: job_id},
+                content_encoding=content_encoding,
+            ),
+            body=body,
+        )
+        logger.info(f"Job {job_id} enviado a '{routing_key}'")
+        return job_id
+
+    def call_stream(
+        self,
+        routing_key: str,
+        message: str,
+        shard_key: Optional[str] = None,
+        lane: str = DEFAULT_LANE,
+        timeout: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Envía un mensaje y devuelve los fragmentos de la respuesta a medida que llegan.
+
+        El handler del worker debe ser un generador; cada fragmento se entrega en orden
+        de secuencia y nunca se acumula la respuesta completa en memoria. A diferencia
+        de ``call`` no hay reintentos: un stream parcialmente consumido no se puede repetir.
+
+        Args:
+            routing_key (str): Clave de enrutamiento para el mensaje
+            message (str): Mensaje a enviar
+            shard_key (Optional[str]): Clave de sharding
+            lane (str): Carril de prioridad
+            timeout (Optional[float]): Segundos máximos de espera entre fragmentos; por defecto, el
+                ``reply_timeout`` de la configuración de tuning para la cola
+
+        Returns:
+            Iterator[str]: Fragmentos de la respuesta
+
+        Raises:
+            ConnectionError: Si no se puede establecer la conexión
+            TimeoutError: Al iterar, si no llega ningún fragmento dentro del timeout
+            ResponseError: Al iterar, si el handler falló a mitad del stream o el worker respondió con un error
+        """
+        corr_id, timeout = self._send_stream_request(routing_key, message, shard_key, lane, timeout)
+        return self._iter_stream(corr_id, timeout)
+
+    def call_stream_async(
+        self,
+        routing_key: str,
+        message: str,
+        shard_key: Optional[str] = None,
+        lane: str = DEFAULT_LANE,
+        timeout: Optional[float] = None,
+        poll_interval: float = STREAM_POLL_INTERVAL,
+    ) -> AsyncIterator[str]:
+        """
+        Variante de ``call_stream`` para iterar desde un bucle de asyncio.
+
+        Entre fragmentos cede el control al bucle en lugar de bloquearlo, de modo que toda
+        la E/S de pika sigue en el hilo del bucle (la conexión no es thread-safe) sin
+        detener el resto de peticiones mientras dura el stream.
+
+        Args:
+            routing_key (str): Clave de enrutamiento para el mensaje
+            message (str): Mensaje a enviar
+            shard_key (Optional[str]): Clave de sharding
+            lane (str): Carril de prioridad
+            timeout (Optional[float]): Segundos máximos de espera entre fragmentos
+            poll_interval (float): Segundos entre consultas a la conexión mientras no hay fragmentos
+
+        Returns:
+            AsyncIterator[str]: Fragmentos de la respuesta
+
+        Raises:
+            ConnectionError: Si no se puede establecer la conexión
+            TimeoutError: Al iterar, si no llega ningún fragmento dentro del timeout
+            ResponseError: Al iterar, si el handler falló a mitad del stream o el worker respondió con un error
+        """
+        corr_id, timeout = self._send_stream_request(routing_key, message, shard_key, lane, timeout)
+        return self._aiter_stream(corr_id, timeout, poll_interval)
+
+    def _send_stream_request(
+        self, routing_key: str, message: str, shard_key: Optional[str], lane: str, timeout: Optional[float]
+    ) -> tuple[str, float]:
+        """Publica la petición de un stream y devuelve su correlation_id y el timeout entre fragmentos"""
+        routing_key = self._resolve_routing_key(routing_key, shard_key, lane)
+        if timeout is None:
+            timeout = get_tuning().resolve(routing_key, "reply_timeout")
+        if not self.ensure_connection():
+            raise ConnectionError("No se pudo establecer conexión con RabbitMQ")
+
+        self.response = None
+        self.response_headers = {}
+        self.stream_chunks = {}
+        self.corr_id = str(uuid.uuid4())
+        body, content_encoding, claim_headers = offload_body(message.encode())
+
+        self.channel.basic_publish(
+            exchange="",
+            routing_key=routing_key,
+            properties=pika.BasicProperties(
+                reply_to=self.callback_queue,
+                correlation_id=self.corr_id,
+                delivery_mode=2,
+                headers={**claim_headers, ACCEPT_ENCODING_HEADER: accept_encoding(), **accept_claim_check()},
+                content_encoding=content_encoding,
+            ),
+            body=body,
+        )
+        return self.corr_id, timeout
+
+    def _take_chunks(self, next_seq: int) -> tuple[list[str], int, bool, Optional[str]]:
+        """
+        Obtiene los fragmentos ya recibidos que siguen en orden de secuencia.
+
+        Returns:
+            tuple[list[str], int, bool, Optional[str]]: Fragmentos, siguiente secuencia esperada,
+                si el stream terminó y el error del handler (si falló)
+        """
+        chunks = []
+        while next_seq in self.stream_chunks:
+            body, headers = self.stream_chunks.pop(next_seq)
+            next_seq += 1
+            if headers.get(STREAM_END_HEADER):
+                return chunks, next_seq, True, headers.get(STREAM_ERROR_HEADER)
+            chunks.append(body.decode())
+        if self.response is not None:
+            if ERROR_HEADER in self.response_headers:
+                # El worker respondió con un error en lugar del stream
+                return chunks, next_seq, True, self.response_headers[ERROR_HEADER]
+            # El handler no era un generador: respuesta única
+            chunks.append(self.response.decode())
+            return chunks, next_seq, True, None
+        return chunks, next_seq, False, None
+
+    def _end_stream(self, corr_id: str) -> None:
+        """Ignora los fragmentos tardíos si el consumidor abandona el stream"""
+        if self.corr_id == corr_id:
+            self.corr_id = None
+            self.stream_chunks = {}
+
+    def _iter_stream(self, corr_id: str, timeout: float) -> Iterator[str]:
+        """Itera los fragmentos de un stream en orden de secuencia"""
+        next_seq = 0
+        last_chunk_time = time.time()
+        try:
+            while True:
+                chunks, next_seq, done, error = self._take_chunks(next_seq)
+                if chunks or done:
+                    last_chunk_time = time.time()
+                yield from chunks
+                if error:
+                    raise ResponseError(error)
+                if done:
+                    return
+                if time.time() - last_chunk_time > timeout:
+                    raise TimeoutError("Tiempo de espera agotado para el siguiente fragmento")
+                self.rabbit_conn.process_data_events(time_limit=0.5)
+        finally:
+            self._end_stream(corr_id)
+
+    async def _aiter_stream(self, corr_id: str, timeout: float, poll_interval: float) -> AsyncIterator[str]:
+        """Itera los fragmentos de un stream sin bloquear el bucle de asyncio"""
+        next_seq = 0
+        last_chunk_time = time.time()
+        try:
+            while True:
+                chunks, next_seq, done, error = self._take_chunks(next_seq)
+                if chunks or done:
+                    last_chunk_time = time.time()
+                for chunk in chunks:
+                    yield chunk
+                if error:
+                    raise ResponseError(error)
+                if done:
+                    return
+                if time.time() - last_chunk_time > timeout:
+                    raise TimeoutError("Tiempo de espera agotado para el siguiente fragmento")
+                # Procesar sólo los eventos ya disponibles y ceder el bucle hasta la siguiente consulta
+                self.rabbit_conn.process_data_events(time_limit=0)
+                if next_seq not in self.stream_chunks and self.response is None:
+                    await asyncio.sleep(poll_interval)
+        finally:
+            self._end_stream(corr_id)
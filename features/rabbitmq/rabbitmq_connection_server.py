@@ -1,61 +1,544 @@
 import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 import pika
 
+from core.config.settings import RETRY_CONFIG
+from core.config.tuning import get_tuning
+from core.utils.exceptions import MessageError
 from core.utils.logging import get_logger
+from core.utils.metrics import metrics
+from features.rabbitmq.claim_check import (
+    ACCEPT_CLAIM_CHECK_HEADER,
+    CLAIM_CHECK_HEADER,
+    get_claim_check_store,
+    load_body,
+    should_claim_check,
+)
+from features.rabbitmq.compression import ACCEPT_ENCODING_HEADER, compress_body, negotiate
+from features.rabbitmq.lanes import lane_queue_name, lane_weights
+from features.rabbitmq.profiling import HandlerProfiler
+from features.rabbitmq.result_backend import JOB_DONE, JOB_ERROR, JOB_ID_HEADER, get_result_backend
+from features.rabbitmq.retry import (
+    ATTEMPT_HEADER,
+    ERROR_HEADER,
+    attempt_of,
+    dead_letter_queue_name,
+    declare_retry_topology,
+    delay_queue_name,
+    forward_properties,
+    retry_delay_ms,
+)
+from features.rabbitmq.router import OperationRouter
+from features.rabbitmq.streaming import STREAM_END_HEADER, STREAM_ERROR_HEADER, STREAM_SEQ_HEADER, is_stream
+from features.rabbitmq.throttling import TokenBucket
 
 logger = get_logger(__name__)
 
+# Fragmentos de un stream generados en un pool de hilos y aún no enviados por el hilo de pika
+STREAM_WINDOW = 16
+
 
 class RabbitMQServer:
     def __init__(self, channel: pika.adapters.blocking_connection.BlockingChannel):
         self.channel = channel
+        self.consumers: dict[str, str] = {}
+        self.lanes: dict[str, dict[str, int]] = {}
+        # Colas con límite de ritmo: se consumen en un canal propio, fuera de la capacidad compartida
+        self.throttled: set[str] = set()
+        self._throttled_channel: Optional[pika.adapters.blocking_connection.BlockingChannel] = None
+        self._consumer_channels: dict[str, pika.adapters.blocking_connection.BlockingChannel] = {}
+        # Datos con los que se calculó el prefetch de cada carril, para aplicar los cambios de tuning
+        self._prefetch_specs: dict[str, dict] = {}
+        self.executors: dict[str, ThreadPoolExecutor] = {}
+        # Hilo que ejecuta el bucle de pika: las operaciones sobre el canal deben hacerse desde él
+        self._io_thread = threading.get_ident()
+        # Mensajes entregados a un handler y aún sin confirmar (para el drenado al apagar)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        # Tiempo de CPU por handler y captura de perfiles bajo demanda
+        self.profiler = HandlerProfiler()
 
-    def create_server(self, queue, process_payload) -> None:
-        self.channel.queue_declare(queue=queue)
-        try:
+    def create_server(
+        self,
+        queue,
+        process_payload,
+        lanes: Optional[dict[str, int]] = None,
+        raw: bool = False,
+        concurrency: int = 1,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        bucket: Optional[TokenBucket] = None,
+    ) -> None:
+        """
+        Registra un consumidor por carril para la cola indicada.
+
+        Args:
+            queue: Nombre de la cola (lógica o de un shard)
+            process_payload: Función que procesa el payload y devuelve el resultado
+            lanes (Optional[dict[str, int]]): Carril -> peso; el prefetch del consumidor de cada carril
+                es ``peso * concurrency``, lo que reparte la capacidad del worker entre carriles
+            raw (bool): Si es True, el handler recibe ``(memoryview(body), props)`` sin decodificar
+                y devuelve el cuerpo de la respuesta como ``bytes``/``memoryview``, que se publica tal cual
+            concurrency (int): Mensajes de la cola procesados en paralelo; con 1 se procesan en el
+                hilo del consumidor, con más en un pool de hilos propio de la cola
+            rate_limit (Optional[float]): Mensajes por segundo como máximo (token bucket de la cola);
+                los mensajes por encima del ritmo esperan sin confirmar, ocupando el prefetch. La cola
+                se consume en un canal propio, así que sus mensajes no cuentan en ``set_capacity``
+            burst (Optional[int]): Capacidad del token bucket (ráfaga máxima)
+            max_concurrency (Optional[int]): Mensajes sin confirmar como máximo por carril; limita
+                tanto el prefetch como el pool de hilos de la cola
+            bucket (Optional[TokenBucket]): Token bucket ya creado, en lugar de ``rate_limit`` y ``burst``;
+                permite que varias colas (los shards de una cola lógica) compartan el mismo límite
+        """
+        if max_concurrency is not None:
+            concurrency = max(1, min(concurrency, max_concurrency))
+        executor = self._executor(queue, concurrency) if concurrency > 1 else None
+        if bucket is None and rate_limit:
+            bucket = TokenBucket(rate_limit, burst)
+        self._consume(
+            queue, lambda props: (process_payload, executor), lanes, raw, concurrency, bucket, max_concurrency
+        )
+
+    def create_router_server(self, router: OperationRouter, queue: Optional[str] = None, lanes=None) -> None:
+        """
+        Registra un consumidor compartido que despacha cada mensaje a la operación de su
+        cabecera ``x-operation``. Cada operación se ejecuta en su propio pool de hilos,
+        de tamaño igual a su concurrencia.
 
-            def callback(ch, method, props, body):
-                try:
-                    # Procesar el mensaje
-                    payload = json.loads(body)
-                    result = process_payload(payload)
-                    response = json.dumps(result)
+        Args:
+            router (OperationRouter): Registro de operaciones
+            queue (Optional[str]): Cola (o shard) a consumir; por defecto la cola del router
+            lanes (Optional[dict[str, int]]): Carril -> peso, como en ``create_server``
+        """
+        queue = queue or router.queue
 
-                    # Verificar que props.reply_to existe
-                    if props.reply_to:
-                        ch.basic_publish(
-                            exchange="",
-                            routing_key=props.reply_to,
-                            properties=pika.BasicProperties(correlation_id=props.correlation_id),
-                            body=response.encode(),
-                        )
+        def resolve(props):
+            operation = router.resolve(props)
+            return operation, self._executor(f"{queue}:{operation.name}", operation.concurrency)
+
+        self._consume(queue, resolve, lanes, False, router.concurrency)
+
+    def _executor(self, key: str, workers: int) -> ThreadPoolExecutor:
+        """Obtiene (o crea) el pool de hilos identificado por ``key``."""
+        if key not in self.executors:
+            self.executors[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"handler-{key}")
+        return self.executors[key]
+
+    def _consume(
+        self,
+        queue,
+        resolve,
+        lanes: Optional[dict[str, int]],
+        raw: bool,
+        concurrency: int,
+        bucket: Optional[TokenBucket] = None,
+        max_prefetch: Optional[int] = None,
+    ) -> None:
+        """Declara la topología de cada carril de la cola y registra sus consumidores."""
+        lanes = lane_weights(lanes)
+        self.lanes[queue] = lanes
+        channel = self.channel if bucket is None else self._get_throttled_channel()
+        if bucket is not None:
+            self.throttled.add(queue)
+        try:
 
-                    # Confirmar el mensaje
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
+            def make_callback(lane_queue):
+                def callback(ch, method, props, body):
+                    try:
+                        process_payload, executor = resolve(props)
+                    except MessageError as e:
+                        logger.error(f"Error in callback: {str(e)}")
+                        self._retry_or_dead_letter(props, body, lane_queue, None, e)
+                        self._ack(method.delivery_tag, ch)
+                        return
 
-                    logger.info(f"Processed message: {payload}")
+                    def dispatch():
+                        # Se cuenta al despacharlo: un mensaje que espera su token no está en proceso
+                        with self._in_flight_lock:
+                            self._in_flight += 1
+                        if executor is None:
+                            self._on_message(ch, method, props, body, lane_queue, process_payload, raw)
+                        else:
+                            executor.submit(self._on_message, ch, method, props, body, lane_queue, process_payload, raw)
 
-                except Exception as e:
-                    logger.error(f"Error in callback: {str(e)}")
-                    # En caso de error, también confirmamos el mensaje para no bloquearlo
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
+                    # Por encima del ritmo, el mensaje espera su token sin confirmar (ocupa el prefetch)
+                    delay = bucket.reserve() if bucket is not None else 0.0
+                    if delay > 0:
+                        metrics.inc("queue_throttled_total", queue=queue)
+                        self.channel.connection.call_later(delay, dispatch)
+                    else:
+                        dispatch()
 
-            # Configurar el consumo de mensajes
-            self.channel.basic_qos(prefetch_count=1)
-            self.channel.basic_consume(queue=queue, on_message_callback=callback)
+                return callback
 
-            logger.info(f" [*] Waiting for messages in queue '{queue}'. To exit press CTRL+C")
+            # Configurar el consumo de mensajes: el prefetch de cada carril es proporcional a su peso
+            for lane, weight in lanes.items():
+                lane_queue = lane_queue_name(queue, lane)
+                self.channel.queue_declare(queue=lane_queue)
+                declare_retry_topology(self.channel, lane_queue)
+                spec = {
+                    "callback": make_callback(lane_queue),
+                    "weight": weight,
+                    "concurrency": concurrency,
+                    "max_prefetch": max_prefetch,
+                }
+                spec["prefetch"] = self._lane_prefetch(lane_queue, spec)
+                channel.basic_qos(prefetch_count=spec["prefetch"])
+                self.consumers[lane_queue] = channel.basic_consume(
+                    queue=lane_queue, on_message_callback=spec["callback"]
+                )
+                self._consumer_channels[lane_queue] = channel
+                self._prefetch_specs[lane_queue] = spec
+
+            logger.info(f" [*] Waiting for messages in queue '{queue}' (lanes: {lanes}). To exit press CTRL+C")
 
         except pika.exceptions.AMQPConnectionError as e:
             logger.error(f"Error connecting to RabbitMQ: {str(e)}")
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
+            # Un error al declarar la topología (p. ej. PRECONDITION_FAILED) cierra el canal:
+            # se propaga para no dejar el worker en marcha sin consumidores
+            logger.error(f"Error al registrar los consumidores de '{queue}': {str(e)}")
+            raise
+
+    def _lane_prefetch(self, lane_queue: str, spec: dict) -> int:
+        """Calcula el prefetch de un carril con la configuración de tuning vigente."""
+        prefetch = get_tuning().resolve(lane_queue, "prefetch") or max(spec["weight"], 1) * spec["concurrency"]
+        if spec["max_prefetch"] is not None:
+            prefetch = max(1, min(prefetch, spec["max_prefetch"]))
+        return prefetch
+
+    def refresh_prefetch(self) -> list[str]:
+        """
+        Aplica a los consumidores registrados los cambios de prefetch del tuning.
+
+        El prefetch por consumidor sólo se fija al registrarlo, así que los carriles cuyo
+        prefetch cambió se cancelan y se vuelven a consumir con el nuevo valor. Los mensajes
+        en proceso se confirman con normalidad; los recibidos por adelantado vuelven a la cola.
+        Debe llamarse desde el hilo de pika.
+
+        Returns:
+            list[str]: Carriles cuyo prefetch se actualizó
+        """
+        changed = []
+        for lane_queue, spec in self._prefetch_specs.items():
+            prefetch = self._lane_prefetch(lane_queue, spec)
+            if prefetch == spec["prefetch"] or lane_queue not in self.consumers:
+                continue
+            channel = self._consumer_channels[lane_queue]
+            channel.basic_cancel(self.consumers[lane_queue])
+            channel.basic_qos(prefetch_count=prefetch)
+            self.consumers[lane_queue] = channel.basic_consume(queue=lane_queue, on_message_callback=spec["callback"])
+            logger.info(f"Prefetch de '{lane_queue}' actualizado: {spec['prefetch']} -> {prefetch}")
+            spec["prefetch"] = prefetch
+            changed.append(lane_queue)
+        return changed
+
+    def _get_throttled_channel(self) -> pika.adapters.blocking_connection.BlockingChannel:
+        """
+        Obtiene (o abre) el canal de las colas con límite de ritmo.
+
+        Sus mensajes esperan el token sin confirmar: en su propio canal no ocupan el
+        prefetch global con el que ``set_capacity`` limita el resto de colas.
+        """
+        if self._throttled_channel is None:
+            self._throttled_channel = self.channel.connection.channel()
+        return self._throttled_channel
+
+    def _in_io_thread(self, fn: Callable[[], None]) -> None:
+        """Ejecuta ``fn`` en el hilo de pika (inmediatamente si ya se está en él)."""
+        if threading.get_ident() == self._io_thread:
+            fn()
+        else:
+            self.channel.connection.add_callback_threadsafe(fn)
+
+    def _publish(self, on_sent: Optional[Callable[[], None]] = None, **kwargs) -> None:
+        """
+        Publica un mensaje de forma segura desde cualquier hilo.
+
+        Args:
+            on_sent (Optional[Callable[[], None]]): Función que se llama en el hilo de pika tras publicarlo
+        """
+
+        def publish():
+            try:
+                self.channel.basic_publish(**kwargs)
+            finally:
+                if on_sent is not None:
+                    on_sent()
+
+        self._in_io_thread(publish)
+
+    def _ack(self, delivery_tag: int, channel=None) -> None:
+        """Confirma un mensaje de forma segura desde cualquier hilo, en el canal que lo entregó."""
+        channel = channel or self.channel
+        self._in_io_thread(lambda: channel.basic_ack(delivery_tag=delivery_tag))
+
+    def _on_message(self, channel, method, props, body, queue, process_payload, raw: bool) -> None:
+        """Procesa un mensaje recibido, publica la respuesta (o guarda el resultado del job) y lo confirma."""
+        job_id = (props.headers or {}).get(JOB_ID_HEADER)
+        operation = getattr(process_payload, "name", None) or getattr(process_payload, "__name__", queue)
+        try:
+            decoded, args = self._decode(props, body, raw)
+            # Procesar el mensaje (sólo se perfila el handler; en los streams, la generación de cada fragmento)
+            result = self.profiler.run(operation, process_payload, *args)
+
+            if job_id:
+                self._store_job_result(job_id, result, raw)
+            elif is_stream(result):
+                self._publish_stream(props, result, raw)
+            # Verificar que props.reply_to existe
+            elif props.reply_to:
+                response = result if raw else json.dumps(result).encode()
+                self._reply(props, response, content_type=props.content_type if raw else None)
+
+            # Confirmar el mensaje
+            self._ack(method.delivery_tag, channel)
+
+            logger.info(f"Processed message: {len(decoded)} bytes" if raw else f"Processed message: {args[0]}")
+
+        except Exception as e:
+            logger.error(f"Error in callback: {str(e)}")
+            self._retry_or_dead_letter(props, body, queue, job_id, e)
+            # El mensaje ya está en su cola de espera o en la DLQ: se confirma el original
+            self._ack(method.delivery_tag, channel)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+    def _decode(self, props, body, raw: bool) -> tuple:
+        """
+        Obtiene el cuerpo real de un mensaje y los argumentos de su handler.
+
+        Returns:
+            tuple: Cuerpo decodificado y argumentos del handler
+
+        Raises:
+            MessageError: Si el cuerpo no se puede decodificar (JSON no válido, codec no soportado,
+                datos comprimidos corruptos o claim check expirado); reintentarlo nunca funcionaría
+        """
+        try:
+            # Con claim check, el cuerpo es una vista sobre el fichero mapeado (sin copias)
+            decoded = load_body(body, props.content_encoding, props.headers)
+            if raw:
+                return decoded, (memoryview(decoded), props)
+            return decoded, (json.loads(bytes(decoded)),)
+        except (KeyError, ValueError, zlib.error) as e:
+            raise MessageError(f"Mensaje no válido: {str(e)}") from e
+
+    def _retry_or_dead_letter(self, props, body, queue: str, job_id: Optional[str], error: Exception) -> None:
+        """
+        Reprograma un mensaje fallido en su cola de espera o, si agotó sus intentos (o el
+        error no es recuperable, ``MessageError``), lo envía a la DLQ y notifica el error
+        inmediatamente al emisor.
+        """
+        attempt = attempt_of(props)
+        if attempt < RETRY_CONFIG["max_attempts"] and not isinstance(error, MessageError):
+            self._publish(
+                exchange="",
+                routing_key=delay_queue_name(queue, retry_delay_ms(attempt)),
+                properties=forward_properties(props, **{ATTEMPT_HEADER: attempt + 1}),
+                body=body,
+            )
+            logger.warning(f"Message scheduled for retry {attempt + 1}/{RETRY_CONFIG['max_attempts']} on '{queue}'")
+            return
+
+        self._publish(
+            exchange="",
+            routing_key=dead_letter_queue_name(queue),
+            properties=forward_properties(props, **{ERROR_HEADER: str(error)}),
+            body=body,
+        )
+        logger.error(f"Message dead-lettered after {attempt} attempts on '{queue}'")
+        if job_id:
+            get_result_backend().set(job_id, {"status": JOB_ERROR, "error": str(error)})
+        else:
+            # La cabecera de error permite al cliente distinguir la respuesta de error de un resultado
+            self._reply(props, json.dumps({"error": str(error)}).encode(), headers={ERROR_HEADER: str(error)})
+
+    def _reply(
+        self,
+        props,
+        body,
+        headers: Optional[dict] = None,
+        content_type: Optional[str] = None,
+        on_sent: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Publica una respuesta en ``reply_to``: por claim check si es grande y el emisor lo
+        acepta o, si no, comprimida si el emisor acepta algún codec.
+        """
+        if not props.reply_to:
+            if on_sent is not None:
+                on_sent()
+            return
+        encoding = None
+        request_headers = props.headers or {}
+        if request_headers.get(ACCEPT_CLAIM_CHECK_HEADER) and should_claim_check(body):
+            headers = {**(headers or {}), CLAIM_CHECK_HEADER: get_claim_check_store().put(body)}
+            body = b""
+        else:
+            codec = negotiate(request_headers.get(ACCEPT_ENCODING_HEADER))
+            if codec:
+                body, encoding = compress_body(body, codec)
+        self._publish(
+            on_sent=on_sent,
+            exchange="",
+            routing_key=props.reply_to,
+            properties=pika.BasicProperties(
+                correlation_id=props.correlation_id,
+                content_type=content_type,
+                content_encoding=encoding,
+                headers=headers,
+            ),
+            body=body,
+        )
+
+    def _store_job_result(self, job_id: str, result, raw: bool) -> None:
+        """Guarda el resultado de un job asíncrono en el backend de resultados."""
+        if is_stream(result):
+            result = [bytes(chunk).decode() if raw else chunk for chunk in result]
+        elif raw:
+            result = bytes(result).decode()
+
+        if isinstance(result, dict) and "error" in result:
+            record = {"status": JOB_ERROR, "error": result["error"]}
+        else:
+            record = {"status": JOB_DONE, "result": result}
+        get_result_backend().set(job_id, record)
+
+    def _publish_stream(self, props, chunks, raw: bool = False) -> None:
+        """
+        Publica los fragmentos de un handler generador como un stream secuenciado.
+
+        Cada fragmento se serializa y publica en cuanto se genera, de modo que el
+        resultado completo nunca se mantiene en memoria (los handlers ``raw`` generan
+        ``bytes`` que se publican sin serializar). Al final se publica la marca
+        de fin, con la cabecera de error si el generador falló.
+
+        Desde un pool de hilos, el generador no se adelanta más de ``STREAM_WINDOW``
+        fragmentos al hilo de pika, que es quien los envía: si la conexión va más lenta
+        que el handler, éste espera en lugar de acumular el resultado en memoria.
+
+        Raises:
+            TimeoutError: Si el hilo de pika no envía los fragmentos dentro del ``reply_timeout``
+        """
+        seq = 0
+        window = threading.Semaphore(STREAM_WINDOW)
+        timeout = get_tuning().reply_timeout
+
+        def publish(body: bytes, **headers) -> None:
+            if not window.acquire(timeout=timeout):
+                raise TimeoutError("El hilo de pika no envía los fragmentos del stream")
+            self._reply(props, body, headers={STREAM_SEQ_HEADER: seq, **headers}, on_sent=window.release)
+
+        try:
+            for chunk in chunks:
+                publish(chunk if raw else json.dumps(chunk).encode())
+                seq += 1
+        except Exception as e:
+            logger.error(f"Error in stream handler: {str(e)}")
+            publish(b"", **{STREAM_END_HEADER: True, STREAM_ERROR_HEADER: str(e)})
+            return
+        finally:
+            # Termina el generador aunque el envío falle a medias (y, con él, su perfilado)
+            if hasattr(chunks, "close"):
+                chunks.close()
+        publish(b"", **{STREAM_END_HEADER: True})
+
+    def cancel_server(self, queue: str) -> None:
+        """Cancela los consumidores de una cola; los mensajes pendientes vuelven a la cola."""
+        for lane in self.lanes.pop(queue, {}):
+            lane_queue = lane_queue_name(queue, lane)
+            consumer_tag = self.consumers.pop(lane_queue, None)
+            channel = self._consumer_channels.pop(lane_queue, self.channel)
+            self._prefetch_specs.pop(lane_queue, None)
+            if consumer_tag is not None:
+                channel.basic_cancel(consumer_tag)
+        self.throttled.discard(queue)
+        logger.info(f" [x] Stopped consuming queue '{queue}'")
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Limita los mensajes sin confirmar de todo el canal (prefetch global).
+
+        Se suma a los límites por consumidor de cada carril: el broker aplica el más restrictivo.
+        No afecta a las colas con límite de ritmo, que se consumen en su propio canal.
+
+        Args:
+            capacity (int): Mensajes en proceso como máximo en el worker
+        """
+        self.channel.basic_qos(prefetch_count=capacity, global_qos=True)
+
+    def stop_consuming(self) -> None:
+        """
+        Cancela todos los consumidores para que ``start`` retorne.
+
+        Los mensajes recibidos por adelantado (prefetch) que aún no se entregaron a un
+        handler vuelven a la cola; los que están en proceso siguen su curso.
+        """
+        for queue in list(self.lanes):
+            self.cancel_server(queue)
+
+    @property
+    def in_flight(self) -> int:
+        """Número de mensajes que se están procesando y aún no se han confirmado."""
+        with self._in_flight_lock:
+            return self._in_flight
+
+    def drain(self, grace_period: float) -> int:
+        """
+        Espera a que terminen los mensajes en proceso, publicando sus respuestas y confirmaciones.
+
+        Debe llamarse desde el hilo de pika una vez que ``start`` ha retornado (tras
+        ``stop_consuming``), ya que las respuestas y confirmaciones de los pools de hilos se
+        ejecutan al procesar los eventos de la conexión.
+
+        Args:
+            grace_period (float): Tiempo máximo de espera en segundos
+
+        Returns:
+            int: Mensajes que no terminaron a tiempo (se volverán a entregar al cerrar la conexión)
+        """
+        connection = self.channel.connection
+        deadline = time.monotonic() + grace_period
+        while self.in_flight and time.monotonic() < deadline:
+            connection.process_data_events(time_limit=0.1)
+        # Publicar las respuestas y confirmaciones encoladas por el último handler
+        connection.process_data_events(time_limit=0)
+
+        pending = self.in_flight
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.executors.clear()
+        if pending:
+            logger.warning(f"Drain timed out after {grace_period}s with {pending} message(s) in flight")
+        else:
+            logger.info("Drain completed: no messages in flight")
+        return pending
+
+    def message_count(self, queue: str) -> int:
+        """Obtiene el número de mensajes listos en todos los carriles de una cola existente."""
+        return sum(
+            self.channel.queue_declare(queue=lane_queue_name(queue, lane), passive=True).method.message_count
+            for lane in self.lanes.get(queue, lane_weights())
+        )
 
     def start(self) -> None:
         try:
             logger.info("Starting RabbitMQ server")
-            self.channel.start_consuming()
+            if self._throttled_channel is None:
+                self.channel.start_consuming()
+            else:
+                # Un solo bucle atiende los consumidores de ambos canales (los eventos son de la conexión)
+                while self.consumers:
+                    self.channel.connection.process_data_events(time_limit=None)
         except KeyboardInterrupt:
             logger.info("Interrupted by user")
         except Exception as e:
@@ -0,0 +1,153 @@
+"""
+Módulo que implementa los backends de resultados del modo de jobs asíncronos.
+
+El worker escribe el resultado de cada job bajo su job_id y la API lo consulta
+por polling. Todos los registros expiran tras un TTL.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from core.config.settings import RESULT_BACKEND_CONFIG
+from core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_ID_HEADER = "x-job-id"
+
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+
+
+class ResultBackend(ABC):
+    """Interfaz de los backends de resultados."""
+
+    def __init__(self, ttl: int):
+        """
+        Inicializa el backend.
+
+        Args:
+            ttl (int): Segundos que se conserva cada registro
+        """
+        self.ttl = ttl
+
+    @abstractmethod
+    def set(self, job_id: str, record: dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Guarda (o reemplaza) el registro de un job."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Obtiene el registro de un job, o None si no existe o expiró."""
+
+
+class MemoryResultBackend(ResultBackend):
+    """
+    Backend en memoria con desalojo LRU y expiración por TTL.
+
+    Sólo es útil cuando la API y el worker comparten proceso (p. ej. en pruebas).
+    """
+
+    def __init__(self, ttl: int, max_entries: int = 10000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._records: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set(self, job_id: str, record: dict[str, Any], ttl: Optional[int] = None) -> None:
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._records[job_id] = (expires_at, record)
+            self._records.move_to_end(job_id)
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._records.get(job_id)
+            if entry is None:
+                return None
+            expires_at, record = entry
+            if expires_at < time.time():
+                del self._records[job_id]
+                return None
+            self._records.move_to_end(job_id)
+            return record
+
+
+class SQLiteResultBackend(ResultBackend):
+    """
+    Backend sobre un fichero SQLite local (o en un volumen compartido).
+
+    Permite que la API y los workers, en procesos distintos, compartan resultados.
+    """
+
+    def __init__(self, path: str, ttl: int):
+        super().__init__(ttl)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, record TEXT, expires_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión nueva (sqlite3 no comparte conexiones entre hilos)."""
+        return sqlite3.connect(self.path, timeout=5)
+
+    def set(self, job_id: str, record: dict[str, Any], ttl: Optional[int] = None) -> None:
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, record, expires_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(record), expires_at),
+            )
+            # Purga oportunista de registros expirados
+            conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,))
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT record FROM jobs WHERE job_id = ? AND expires_at >= ?", (job_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_result_backend(config: Optional[dict[str, Any]] = None) -> ResultBackend:
+    """
+    Crea el backend de resultados indicado en la configuración.
+
+    Args:
+        config (Optional[dict[str, Any]]): Configuración; por defecto RESULT_BACKEND_CONFIG
+
+    Returns:
+        ResultBackend: Backend de resultados
+
+    Raises:
+        ValueError: Si el tipo de backend no es válido
+    """
+    config = config or RESULT_BACKEND_CONFIG
+    if config["backend"] == "memory":
+        return MemoryResultBackend(config["ttl"], config["max_entries"])
+    if config["backend"] == "sqlite":
+        return SQLiteResultBackend(config["path"], config["ttl"])
+    raise ValueError(f"Backend de resultados desconocido: '{config['backend']}'")
+
+
+_backend: Optional[ResultBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_result_backend() -> ResultBackend:
+    """Obtiene el backend de resultados de la aplicación, creándolo en el primer uso."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_result_backend()
+            logger.info(f"Backend de resultados: {type(_backend).__name__}")
+        return _backend
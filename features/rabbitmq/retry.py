@@ -0,0 +1,89 @@
+"""
+Módulo que define la topología de reintentos diferidos y dead-letter de una cola.
+
+Para cada cola se declaran colas de espera ``<cola>.delay.<ms>`` con ``x-message-ttl``
+creciente (backoff exponencial) cuyo dead-letter vuelve a la cola original, y una
+cola ``<cola>.dlq`` donde acaban los mensajes que agotan sus intentos.
+
+La espera forma parte del nombre de la cola: RabbitMQ no permite volver a declarar una
+cola con otro ``x-message-ttl``, así que al cambiar ``RETRY_BASE_DELAY_MS`` o
+``RETRY_MULTIPLIER`` se declaran colas nuevas en lugar de fallar con PRECONDITION_FAILED.
+Las colas de espera antiguas se vacían solas (su TTL sigue vigente) y pueden borrarse después.
+"""
+
+from typing import Any, Optional
+
+import pika
+
+from core.config.settings import RETRY_CONFIG
+
+ATTEMPT_HEADER = "x-attempt"
+ERROR_HEADER = "x-error"
+
+
+def delay_queue_name(queue: str, delay_ms: int) -> str:
+    """Nombre de la cola de espera de ``delay_ms`` milisegundos de una cola."""
+    return f"{queue}.delay.{delay_ms}"
+
+
+def dead_letter_queue_name(queue: str) -> str:
+    """Nombre de la dead-letter queue de una cola."""
+    return f"{queue}.dlq"
+
+
+def retry_delay_ms(attempt: int, config: Optional[dict[str, Any]] = None) -> int:
+    """
+    Calcula la espera antes del reintento siguiente al intento ``attempt``.
+
+    Args:
+        attempt (int): Intento que acaba de fallar (empieza en 1)
+        config (Optional[dict[str, Any]]): Configuración de reintentos; por defecto RETRY_CONFIG
+
+    Returns:
+        int: Milisegundos de espera
+    """
+    config = config or RETRY_CONFIG
+    return int(config["base_delay_ms"] * config["multiplier"] ** (attempt - 1))
+
+
+def declare_retry_topology(
+    channel: pika.adapters.blocking_connection.BlockingChannel, queue: str, config: Optional[dict[str, Any]] = None
+) -> None:
+    """
+    Declara las colas de espera y la dead-letter queue de una cola.
+
+    Args:
+        channel (BlockingChannel): Canal sobre el que declarar las colas
+        queue (str): Cola física cuyos mensajes se reintentan
+        config (Optional[dict[str, Any]]): Configuración de reintentos; por defecto RETRY_CONFIG
+    """
+    config = config or RETRY_CONFIG
+    for attempt in range(1, config["max_attempts"]):
+        delay_ms = retry_delay_ms(attempt, config)
+        channel.queue_declare(
+            queue=delay_queue_name(queue, delay_ms),
+            arguments={
+                "x-message-ttl": delay_ms,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue,
+            },
+        )
+    channel.queue_declare(queue=dead_letter_queue_name(queue))
+
+
+def attempt_of(props: pika.BasicProperties) -> int:
+    """Obtiene el número de intento de un mensaje (1 si es la primera entrega)."""
+    return int((props.headers or {}).get(ATTEMPT_HEADER, 1))
+
+
+def forward_properties(props: pika.BasicProperties, **headers: Any) -> pika.BasicProperties:
+    """Copia las propiedades de un mensaje añadiendo cabeceras, para republicarlo."""
+    return pika.BasicProperties(
+        content_type=props.content_type,
+        content_encoding=props.content_encoding,
+        headers={**(props.headers or {}), **headers},
+        delivery_mode=props.delivery_mode,
+        correlation_id=props.correlation_id,
+        reply_to=props.reply_to,
+        message_id=props.message_id,
+    )
@@ -0,0 +1,141 @@
+"""
+Módulo que implementa el registro de operaciones multiplexadas sobre una única cola.
+
+Cada mensaje indica su operación en la cabecera ``x-operation``; el servidor la
+resuelve con el router y ejecuta el handler en el pool de hilos de la operación,
+que limita su concurrencia. Las operaciones ``cacheable`` memorizan sus resultados
+por payload en una caché LRU.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from core.utils.exceptions import MessageError
+from core.utils.metrics import metrics
+from features.rabbitmq.streaming import is_stream
+
+if TYPE_CHECKING:
+    import pika
+
+OPERATION_HEADER = "x-operation"
+
+
+class Operation:
+    """Operación registrada en un router."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[dict[str, Any]], Any],
+        concurrency: int = 1,
+        cacheable: bool = False,
+        cache_size: int = 1024,
+    ):
+        """
+        Inicializa la operación.
+
+        Args:
+            name (str): Nombre de la operación (valor de la cabecera ``x-operation``)
+            handler (Callable): Función que procesa el payload
+            concurrency (int): Número máximo de ejecuciones simultáneas de la operación
+            cacheable (bool): Si es True, los resultados se memorizan por payload
+            cache_size (int): Tamaño máximo de la caché LRU de resultados
+        """
+        if concurrency < 1:
+            raise ValueError("La concurrencia de una operación debe ser mayor o igual a 1")
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.cacheable = cacheable
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, payload: dict[str, Any]) -> Any:
+        """Ejecuta la operación, usando la caché de resultados si es ``cacheable``."""
+        if not self.cacheable:
+            return self.handler(payload)
+
+        key = json.dumps(payload, sort_keys=True)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                metrics.inc("operation_cache_hits_total", operation=self.name)
+                return self._cache[key]
+
+        result = self.handler(payload)
+        # Los streams y los errores no se memorizan
+        if not is_stream(result) and not (isinstance(result, dict) and "error" in result):
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+
+class OperationRouter:
+    """
+    Registro de operaciones servidas por un consumidor compartido.
+
+    Uso:
+        router = OperationRouter("notifications_ops")
+
+        @router.operation("multiply", concurrency=4, cacheable=True)
+        def process_multiply(payload): ...
+    """
+
+    def __init__(self, queue: str, cache_size: int = 1024):
+        """
+        Inicializa el router.
+
+        Args:
+            queue (str): Cola lógica compartida por todas las operaciones
+            cache_size (int): Tamaño de la caché de resultados de cada operación cacheable
+        """
+        self.queue = queue
+        self.cache_size = cache_size
+        self.operations: dict[str, Operation] = {}
+
+    def operation(self, name: str, concurrency: int = 1, cacheable: bool = False) -> Callable:
+        """
+        Decorador que registra un handler como operación del router.
+
+        Args:
+            name (str): Nombre de la operación
+            concurrency (int): Número máximo de ejecuciones simultáneas
+            cacheable (bool): Si es True, los resultados se memorizan por payload
+
+        Returns:
+            Callable: Decorador que devuelve el handler sin modificar
+        """
+
+        def decorator(handler: Callable) -> Callable:
+            if name in self.operations:
+                raise ValueError(f"Operación ya registrada: '{name}'")
+            self.operations[name] = Operation(name, handler, concurrency, cacheable, self.cache_size)
+            return handler
+
+        return decorator
+
+    def names(self) -> list[str]:
+        """Obtiene los nombres de las operaciones registradas."""
+        return list(self.operations)
+
+    @property
+    def concurrency(self) -> int:
+        """Suma de la concurrencia de todas las operaciones."""
+        return sum(operation.concurrency for operation in self.operations.values()) or 1
+
+    def resolve(self, props: "pika.BasicProperties") -> Operation:
+        """
+        Obtiene la operación indicada en la cabecera ``x-operation`` de un mensaje.
+
+        Raises:
+            MessageError: Si el mensaje no indica una operación registrada
+        """
+        name: Optional[str] = (props.headers or {}).get(OPERATION_HEADER)
+        if name not in self.operations:
+            raise MessageError(f"Operación desconocida: '{name}'")
+        return self.operations[name]
@@ -0,0 +1,161 @@
+"""
+Módulo que implementa el sharding de colas de operaciones mediante hashing consistente.
+
+Cada cola lógica (por ejemplo ``notifications_mul``) se reparte en N colas físicas.
+El shard 0 conserva el nombre de la cola lógica, de forma que pasar de 1 a N shards
+no deja mensajes huérfanos en la cola original.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+from typing import Any, Optional, Union
+
+from core.config.settings import RABBITMQ_SHARDING
+from core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _hash(value: Union[str, bytes]) -> int:
+    """Calcula un hash estable de 64 bits (independiente de PYTHONHASHSEED)."""
+    if isinstance(value, str):
+        value = value.encode()
+    return int.from_bytes(hashlib.md5(value).digest()[:8], "big")
+
+
+def shard_queue_name(queue: str, shard: int) -> str:
+    """
+    Obtiene el nombre de la cola física de un shard.
+
+    Args:
+        queue (str): Nombre de la cola lógica
+        shard (int): Índice del shard
+
+    Returns:
+        str: Nombre de la cola física
+    """
+    return queue if shard == 0 else f"{queue}.shard{shard}"
+
+
+def shard_key(payload: dict[str, Any], key_field: Optional[str] = None) -> str:
+    """
+    Extrae la clave de sharding de un payload.
+
+    Args:
+        payload (dict[str, Any]): Payload de la petición
+        key_field (Optional[str]): Campo a usar como clave; si no existe se usa el payload completo
+
+    Returns:
+        str: Clave de sharding
+    """
+    if key_field and key_field in payload:
+        return str(payload[key_field])
+    return json.dumps(payload, sort_keys=True)
+
+
+class ShardRouter:
+    """
+    Enrutador de shards basado en un anillo de hashing consistente.
+
+    Al cambiar el número de shards sólo se reasigna ~1/N de las claves,
+    y una misma clave siempre cae en el mismo shard (orden por clave).
+    """
+
+    def __init__(self, shards: int = 1, virtual_nodes: int = 64):
+        """
+        Inicializa el anillo de hashing.
+
+        Args:
+            shards (int): Número de shards por cola lógica
+            virtual_nodes (int): Nodos virtuales por shard en el anillo
+        """
+        if shards < 1:
+            raise ValueError("El número de shards debe ser mayor o igual a 1")
+        self.shards = shards
+        self.virtual_nodes = virtual_nodes
+        nodes = [(shard, node) for shard in range(shards) for node in range(virtual_nodes)]
+        ring = sorted((_hash(f"shard-{shard}-{node}"), shard) for shard, node in nodes)
+        self._points = [point for point, _ in ring]
+        self._owners = [shard for _, shard in ring]
+
+    def shard_for(self, key: Union[str, bytes]) -> int:
+        """Obtiene el índice del shard para una clave."""
+        if self.shards == 1:
+            return 0
+        index = bisect.bisect_right(self._points, _hash(key))
+        return self._owners[index % len(self._points)]
+
+    def queue_for(self, queue: str, key: Union[str, bytes]) -> str:
+        """Obtiene la cola física a la que se enruta una clave."""
+        return shard_queue_name(queue, self.shard_for(key))
+
+    def queues(self, queue: str) -> list[str]:
+        """Obtiene todas las colas físicas de una cola lógica."""
+        return [shard_queue_name(queue, shard) for shard in range(self.shards)]
+
+    def assigned_shards(self, worker_index: int, worker_count: int) -> list[int]:
+        """
+        Obtiene los shards asignados a un worker.
+
+        Args:
+            worker_index (int): Índice del worker (0..worker_count-1)
+            worker_count (int): Número total de workers
+
+        Returns:
+            list[int]: Índices de los shards que consume el worker
+        """
+        if worker_count <= 1:
+            return list(range(self.shards))
+        return [shard for shard in range(self.shards) if shard % worker_count == worker_index % worker_count]
+
+
+_router: Optional[ShardRouter] = None
+
+
+def get_shard_router() -> ShardRouter:
+    """Obtiene el enrutador de shards configurado en la aplicación."""
+    global _router
+    if _router is None:
+        _router = ShardRouter(RABBITMQ_SHARDING["shards"], RABBITMQ_SHARDING["virtual_nodes"])
+    return _router
+
+
+def set_shard_router(router: ShardRouter) -> None:
+    """Reemplaza el enrutador de shards (p. ej. tras un cambio en el número de shards)."""
+    global _router
+    _router = router
+
+
+def configured_shards(default: Optional[int] = None) -> int:
+    """
+    Lee el número de shards vigente del entorno (``RABBITMQ_SHARDS``), que puede haber
+    cambiado desde el arranque si se volvió a cargar ``.env``.
+
+    Args:
+        default (Optional[int]): Valor si la variable no está definida; por defecto, el del arranque
+
+    Returns:
+        int: Número de shards por cola lógica
+    """
+    return int(os.getenv("RABBITMQ_SHARDS") or (default if default is not None else RABBITMQ_SHARDING["shards"]))
+
+
+def reload_shard_router() -> ShardRouter:
+    """
+    Reconstruye el enrutador de shards si cambió el número de shards configurado.
+
+    Los procesos que publican (la API) deben recargarlo a la vez que los workers se
+    rebalancean; si no, siguen publicando en shards retirados que ya nadie consume.
+
+    Returns:
+        ShardRouter: Enrutador vigente
+    """
+    router = get_shard_router()
+    shards = configured_shards(router.shards)
+    if shards != router.shards:
+        logger.info(f"Enrutador de shards recargado: {router.shards} -> {shards} shards")
+        router = ShardRouter(shards, RABBITMQ_SHARDING["virtual_nodes"])
+        set_shard_router(router)
+    return router
@@ -0,0 +1,19 @@
+"""
+Módulo con el protocolo de respuestas en streaming.
+
+Un handler generador publica cada fragmento como un mensaje independiente con la
+misma correlation_id y la cabecera de secuencia; el último mensaje lleva la marca
+de fin (y, si el handler falló a mitad del stream, la cabecera de error).
+"""
+
+import inspect
+from typing import Any
+
+STREAM_SEQ_HEADER = "x-stream-seq"
+STREAM_END_HEADER = "x-stream-end"
+STREAM_ERROR_HEADER = "x-stream-error"
+
+
+def is_stream(result: Any) -> bool:
+    """Indica si el resultado de un handler debe publicarse como stream."""
+    return inspect.isgenerator(result)
@@ -0,0 +1,54 @@
+"""
+Módulo que implementa la limitación de ritmo (token bucket) del consumo de colas.
+
+El servidor reserva un token por mensaje antes de despacharlo; si el bucket está
+vacío el mensaje se despacha más tarde, cuando le corresponde su token. Mientras
+espera sigue sin confirmar y ocupa su hueco del prefetch, de modo que el broker deja
+de entregar mensajes de la cola en lugar de que el worker gire en vacío. Las colas
+limitadas se consumen en un canal propio, así que esos mensajes en espera no restan
+capacidad (prefetch global) al resto de colas del worker.
+
+El límite es por worker y cola lógica: todos los shards de la cola que consume un
+worker reservan del mismo bucket, así que el ritmo no crece con el número de shards.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket thread-safe con reservas (los tokens pueden quedar en negativo)."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Inicializa el bucket lleno.
+
+        Args:
+            rate (float): Tokens repuestos por segundo
+            burst (Optional[int]): Capacidad del bucket; por defecto, un segundo de tokens
+        """
+        if rate <= 0:
+            raise ValueError("El ritmo del token bucket debe ser mayor que 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        Reserva tokens y devuelve cuánto hay que esperar para poder usarlos.
+
+        Args:
+            tokens (int): Tokens a reservar
+
+        Returns:
+            float: Segundos de espera (0 si había tokens disponibles)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
@@ -3,16 +3,33 @@ API principal que expone endpoints para operaciones de multiplicación y suma.
 Utiliza RabbitMQ para procesar las operaciones de forma asíncrona.
 """
 
+import asyncio
 import json
 import logging
-from typing import Any
-
-from fastapi import FastAPI, HTTPException
+import math
+import signal
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import ExitStack
+from typing import Any, Optional, Union
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-from core.config.settings import RABBITMQ_CONFIG
+from core.config.settings import RABBITMQ_CONFIG, RABBITMQ_LANES, RABBITMQ_SHARDING, STARTUP_CONFIG
+from core.config.tuning import get_tuning, reload_tuning
+from core.utils.exceptions import CircuitOpenError
 from core.utils.logging import setup_logging
+from core.utils.metrics import metrics
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
 from features.rabbitmq.rabbit_di import ContainerRabbitMQ
+from features.rabbitmq.result_backend import JOB_PENDING, get_result_backend
+from features.rabbitmq.router import OPERATION_HEADER
+from features.rabbitmq.sharding import get_shard_router, reload_shard_router, shard_key
+from operations import QUEUE_OPERATIONS
+from operations import router as operations_router
 
 # Configurar logging
 setup_logging()
@@ -21,6 +38,24 @@ logger = logging.getLogger(__name__)
 # Configuración de colas
 QUEUE_MULTIPLY = f"{RABBITMQ_CONFIG['queue']}_mul"
 QUEUE_SUM = f"{RABBITMQ_CONFIG['queue']}_sum"
+QUEUE_MULTIPLY_TABLE = f"{RABBITMQ_CONFIG['queue']}_mul_table"
+
+# Colas lógicas a las que publica la API (su topología se declara en el precalentamiento)
+API_QUEUES = [QUEUE_MULTIPLY, QUEUE_SUM, QUEUE_MULTIPLY_TABLE, QUEUE_OPERATIONS]
+
+# Operaciones expuestas por los endpoints genéricos (binario y jobs asíncronos)
+OPERATION_QUEUES = {"multiply": QUEUE_MULTIPLY, "sum": QUEUE_SUM}
+
+SHARD_KEY_DESCRIPTION = (
+    "Clave de sharding: el valor del campo RABBITMQ_SHARD_KEY del payload (por defecto, el cuerpo completo)"
+)
+
+# Espera máxima (segundos) del long-polling de jobs
+JOB_MAX_WAIT = 30
+JOB_POLL_INTERVAL = 0.25
+
+# Detiene los reintentos de conexión del arranque al cerrar la API
+startup_stop = threading.Event()
 
 # Inicializar FastAPI
 app = FastAPI(
@@ -45,22 +80,155 @@ class OperationResponse(BaseModel):
     operation: str
 
 
+class JobResponse(BaseModel):
+    """Modelo para el estado de un job asíncrono."""
+
+    job_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
+class BulkPublishResponse(BaseModel):
+    """Modelo para el resultado de una publicación masiva."""
+
+    published: int
+
+
+def api_max_retries(queue: str) -> int:
+    """Obtiene los reintentos de las llamadas RPC de la API a una cola (configuración de tuning)."""
+    tuning = get_tuning()
+    return tuning.resolve(queue, "max_retries", tuning.api_max_retries)
+
+
+def raw_shard_key(header: Optional[str], body: bytes) -> Union[str, bytes]:
+    """
+    Obtiene la clave de sharding de una petición cuyo cuerpo no se decodifica.
+
+    La cabecera ``X-Shard-Key`` debe llevar el valor del campo ``RABBITMQ_SHARD_KEY`` del
+    payload, de modo que la petición cae en el mismo shard que por ``/multiply/`` o ``/sum/``;
+    sin cabecera se usa el cuerpo completo y no se garantiza el orden por clave entre endpoints.
+    """
+    return header if header is not None else body
+
+
+def circuit_open(error: CircuitOpenError) -> HTTPException:
+    """Convierte un circuit breaker abierto en un 503 que indica cuándo reintentar."""
+    logger.warning(str(error))
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(math.ceil(error.retry_after))})
+
+
+def reply_timeout(error: TimeoutError) -> HTTPException:
+    """Convierte un timeout esperando la respuesta del worker en un 504."""
+    logger.error(str(error))
+    return HTTPException(status_code=504, detail="El worker no respondió a tiempo")
+
+
+def connect_in_background() -> None:
+    """
+    Conecta con RabbitMQ y precalienta la conexión sin bloquear el arranque de la API.
+
+    Reintenta con backoff exponencial (desde ``retry_delay`` del tuning hasta
+    ``STARTUP_RETRY_MAX_DELAY``) hasta conectar o hasta que se cierre la API. Mientras
+    tanto los endpoints que usan RabbitMQ responden 503 (``require_ready``), así que el
+    precalentamiento nunca comparte la conexión con ellos.
+    """
+    delay = get_tuning().retry_delay
+    while not startup_stop.is_set():
+        try:
+            rabbit_manager.get_channel()
+            if STARTUP_CONFIG["warm_up"]:
+                rabbit_manager.warm_up(API_QUEUES, clients=STARTUP_CONFIG["client_pool_size"])
+            app.state.ready = True
+            logger.info("Conexión con RabbitMQ lista")
+            return
+        except Exception as e:
+            logger.error(f"Error al conectar con RabbitMQ en el arranque: {str(e)}. Reintento en {delay:.0f}s")
+            startup_stop.wait(delay)
+            delay = min(max(delay, 1) * 2, STARTUP_CONFIG["retry_max_delay"])
+
+
+def require_ready() -> None:
+    """
+    Dependencia de los endpoints que usan RabbitMQ: responde 503 hasta que la conexión está lista.
+
+    Raises:
+        HTTPException: Si la conexión (o el precalentamiento) aún no ha terminado
+    """
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(
+            status_code=503, detail="Conexión con RabbitMQ no disponible todavía", headers={"Retry-After": "1"}
+        )
+
+
+def reload_config() -> dict[str, Any]:
+    """
+    Recarga la configuración de tuning y el enrutador de shards (``RABBITMQ_SHARDS``).
+
+    Si aumenta el número de shards se declaran sus colas, para que los mensajes enrutados
+    a los shards nuevos no se descarten antes de que los workers se rebalanceen.
+
+    Returns:
+        dict[str, Any]: Configuración de tuning vigente
+
+    Raises:
+        ValueError: Si la nueva configuración de tuning no es válida (se conserva la anterior)
+    """
+    shards = get_shard_router().shards
+    try:
+        return reload_tuning().model_dump()
+    finally:
+        # reload_tuning relee .env (incluido RABBITMQ_SHARDS) aunque el tuning no sea válido
+        if reload_shard_router().shards > shards and getattr(app.state, "ready", False):
+            try:
+                rabbit_manager.warm_up(API_QUEUES)
+            except Exception as e:
+                logger.error(f"Error al declarar los shards nuevos: {str(e)}")
+
+
+def handle_reload() -> None:
+    """Manejador de SIGHUP: recarga la configuración de tuning y el enrutador de shards."""
+    try:
+        reload_config()
+    except ValueError:
+        # El error ya se registró y se conserva la configuración anterior
+        pass
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Evento de inicio de la aplicación."""
-    try:
-        if not rabbit_manager.connection.is_connected():
-            if not rabbit_manager.connection.connect():
-                raise HTTPException(status_code=500, detail="No se pudo establecer conexión con RabbitMQ")
-        logger.info("API iniciada correctamente")
-    except Exception as e:
-        logger.error(f"Error al iniciar la API: {str(e)}")
-        raise
+    """Evento de inicio de la aplicación: la conexión con RabbitMQ se establece en segundo plano."""
+    app.state.ready = False
+    startup_stop.clear()
+    threading.Thread(target=connect_in_background, name="rabbitmq-startup", daemon=True).start()
+    if hasattr(signal, "SIGHUP"):
+        # Desde el bucle de eventos, no con signal.signal: la recarga nunca interrumpe una llamada a pika en curso
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, handle_reload)
+    logger.info("API iniciada correctamente")
+
+
+@app.get("/health")
+async def health() -> dict[str, str]:
+    """Endpoint de liveness: responde en cuanto el proceso está sirviendo."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready() -> dict[str, str]:
+    """
+    Endpoint de readiness: responde 200 sólo cuando la conexión con RabbitMQ está lista.
+
+    Raises:
+        HTTPException: Si la conexión (o el precalentamiento) aún no ha terminado
+    """
+    require_ready()
+    return {"status": "ready"}
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento de cierre de la aplicación."""
+    startup_stop.set()
     try:
         rabbit_manager.close()
         logger.info("API detenida correctamente")
@@ -68,13 +236,16 @@ async def shutdown_event():
         logger.error(f"Error al detener la API: {str(e)}")
 
 
-@app.post("/multiply/", response_model=OperationResponse)
-async def multiply(request: OperationRequest) -> dict[str, Any]:
+@app.post("/multiply/", response_model=OperationResponse, dependencies=[Depends(require_ready)])
+async def multiply(
+    request: OperationRequest, lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)")
+) -> dict[str, Any]:
     """
     Endpoint para realizar multiplicaciones.
 
     Args:
         request (OperationRequest): Petición con los números a multiplicar
+        lane (str): Carril de prioridad de la petición
 
     Returns:
         dict[str, Any]: Resultado de la multiplicación
@@ -82,9 +253,19 @@ async def multiply(request: OperationRequest) -> dict[str, Any]:
     Raises:
         HTTPException: Si hay error en la operación
     """
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
     try:
         payload = {"a": request.a, "b": request.b}
-        response = rabbit_manager.conexionClient().call(QUEUE_MULTIPLY, json.dumps(payload), max_retries=5)
+        with rabbit_manager.client() as client:
+            response = client.call_raw(
+                QUEUE_MULTIPLY,
+                json.dumps(payload).encode(),
+                max_retries=api_max_retries(QUEUE_MULTIPLY),
+                shard_key=shard_key(payload, RABBITMQ_SHARDING["key_field"]),
+                lane=lane,
+                hedge=True,
+            )
 
         if not response:
             raise HTTPException(status_code=500, detail="No se recibió respuesta del worker")
@@ -94,6 +275,10 @@ async def multiply(request: OperationRequest) -> dict[str, Any]:
             raise HTTPException(status_code=500, detail=f"Error en la multiplicación: {result['error']}")
 
         return {"result": result["result"], "operation": "multiply"}
+    except CircuitOpenError as e:
+        raise circuit_open(e) from e
+    except TimeoutError as e:
+        raise reply_timeout(e) from e
     except ConnectionError as e:
         logger.error(f"Error de conexión en multiplicación: {str(e)}")
         raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
@@ -102,13 +287,16 @@ async def multiply(request: OperationRequest) -> dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error en la operación: {str(e)}") from e
 
 
-@app.post("/sum/", response_model=OperationResponse)
-async def sum(request: OperationRequest) -> dict[str, Any]:
+@app.post("/sum/", response_model=OperationResponse, dependencies=[Depends(require_ready)])
+async def sum(
+    request: OperationRequest, lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)")
+) -> dict[str, Any]:
     """
     Endpoint para realizar sumas.
 
     Args:
         request (OperationRequest): Petición con los números a sumar
+        lane (str): Carril de prioridad de la petición
 
     Returns:
         dict[str, Any]: Resultado de la suma
@@ -116,9 +304,19 @@ async def sum(request: OperationRequest) -> dict[str, Any]:
     Raises:
         HTTPException: Si hay error en la operación
     """
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
     try:
         payload = {"a": request.a, "b": request.b}
-        response = rabbit_manager.conexionClient().call(QUEUE_SUM, json.dumps(payload), max_retries=5)
+        with rabbit_manager.client() as client:
+            response = client.call_raw(
+                QUEUE_SUM,
+                json.dumps(payload).encode(),
+                max_retries=api_max_retries(QUEUE_SUM),
+                shard_key=shard_key(payload, RABBITMQ_SHARDING["key_field"]),
+                lane=lane,
+                hedge=True,
+            )
 
         if not response:
             raise HTTPException(status_code=500, detail="No se recibió respuesta del worker")
@@ -128,9 +326,320 @@ async def sum(request: OperationRequest) -> dict[str, Any]:
             raise HTTPException(status_code=500, detail=f"Error en la suma: {result['error']}")
 
         return {"result": result["result"], "operation": "sum"}
+    except CircuitOpenError as e:
+        raise circuit_open(e) from e
+    except TimeoutError as e:
+        raise reply_timeout(e) from e
     except ConnectionError as e:
         logger.error(f"Error de conexión en suma: {str(e)}")
         raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
     except Exception as e:
         logger.error(f"Error inesperado en suma: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error en la operación: {str(e)}") from e
+
+
+@app.post("/multiply/table/", dependencies=[Depends(require_ready)])
+async def multiply_table(
+    request: OperationRequest, lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)")
+) -> StreamingResponse:
+    """
+    Endpoint que devuelve la tabla de multiplicar de ``a`` hasta ``b`` en streaming (NDJSON).
+
+    Cada fila se reenvía al cliente HTTP en cuanto llega del worker, sin acumular la
+    respuesta completa en memoria. El stream se itera en el bucle de eventos, como el
+    resto de endpoints, porque la conexión de pika compartida no es thread-safe.
+
+    Args:
+        request (OperationRequest): Petición con el número ``a`` y el límite ``b``
+        lane (str): Carril de prioridad de la petición
+
+    Returns:
+        StreamingResponse: Filas de la tabla, una por línea
+
+    Raises:
+        HTTPException: Si el carril no existe o no hay conexión con RabbitMQ
+    """
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
+    payload = {"a": request.a, "b": request.b}
+    # El cliente se devuelve al pool cuando termina el stream, no al salir del endpoint
+    stack = ExitStack()
+    try:
+        client = stack.enter_context(rabbit_manager.client())
+        chunks = client.call_stream_async(
+            QUEUE_MULTIPLY_TABLE,
+            json.dumps(payload),
+            shard_key=shard_key(payload, RABBITMQ_SHARDING["key_field"]),
+            lane=lane,
+        )
+    except ConnectionError as e:
+        stack.close()
+        logger.error(f"Error de conexión en tabla de multiplicar: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
+
+    async def ndjson() -> AsyncIterator[str]:
+        with stack:
+            try:
+                async for chunk in chunks:
+                    yield chunk + "\n"
+            except Exception as e:
+                # La cabecera HTTP ya se envió: se informa el error como última línea
+                logger.error(f"Error en el stream de tabla de multiplicar: {str(e)}")
+                yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/raw/{operation}", dependencies=[Depends(require_ready)])
+async def raw_operation(
+    operation: str,
+    request: Request,
+    lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)"),
+    x_shard_key: Optional[str] = Header(None, description=SHARD_KEY_DESCRIPTION),
+) -> Response:
+    """
+    Endpoint binario: reenvía el cuerpo HTTP al worker y devuelve su respuesta tal cual.
+
+    El cuerpo no se valida ni se convierte a ``str``/``dict`` en la API, lo que evita
+    copias intermedias con payloads grandes; por eso la clave de sharding se toma de la
+    cabecera ``X-Shard-Key`` en lugar de extraerla del payload.
+
+    Args:
+        operation (str): Operación a ejecutar (multiply | sum)
+        request (Request): Petición HTTP con el payload JSON en el cuerpo
+        lane (str): Carril de prioridad de la petición
+        x_shard_key (Optional[str]): Clave de sharding (cabecera ``X-Shard-Key``)
+
+    Returns:
+        Response: Respuesta del worker sin modificar
+
+    Raises:
+        HTTPException: Si la operación o el carril no existen o hay error en la operación
+    """
+    if operation not in OPERATION_QUEUES:
+        raise HTTPException(status_code=404, detail=f"Operación desconocida: '{operation}'")
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
+    try:
+        body = await request.body()
+        with rabbit_manager.client() as client:
+            response = client.call_raw(
+                OPERATION_QUEUES[operation],
+                body,
+                max_retries=api_max_retries(OPERATION_QUEUES[operation]),
+                shard_key=raw_shard_key(x_shard_key, body),
+                lane=lane,
+                content_type=request.headers.get("content-type"),
+                hedge=True,
+            )
+        if response is None:
+            raise HTTPException(status_code=500, detail="No se recibió respuesta del worker")
+        return Response(content=response, media_type="application/json")
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise circuit_open(e) from e
+    except TimeoutError as e:
+        raise reply_timeout(e) from e
+    except ConnectionError as e:
+        logger.error(f"Error de conexión en operación binaria: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
+    except Exception as e:
+        logger.error(f"Error inesperado en operación binaria: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error en la operación: {str(e)}") from e
+
+
+@app.post("/ops/{name}", dependencies=[Depends(require_ready)])
+async def run_operation(
+    name: str,
+    request: Request,
+    lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)"),
+    x_shard_key: Optional[str] = Header(None, description=SHARD_KEY_DESCRIPTION),
+) -> Response:
+    """
+    Endpoint genérico para cualquier operación registrada en el router de operaciones.
+
+    El cuerpo JSON se envía tal cual a la cola compartida con la cabecera ``x-operation``;
+    añadir una operación en ``operations.py`` la expone aquí sin más cambios.
+
+    Args:
+        name (str): Nombre de la operación registrada
+        request (Request): Petición HTTP con el payload JSON en el cuerpo
+        lane (str): Carril de prioridad de la petición
+        x_shard_key (Optional[str]): Clave de sharding (cabecera ``X-Shard-Key``)
+
+    Returns:
+        Response: Respuesta JSON del worker
+
+    Raises:
+        HTTPException: Si la operación o el carril no existen o hay error en la operación
+    """
+    if name not in operations_router.operations:
+        raise HTTPException(status_code=404, detail=f"Operación desconocida: '{name}'")
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
+    try:
+        body = await request.body()
+        with rabbit_manager.client() as client:
+            response = client.call_raw(
+                QUEUE_OPERATIONS,
+                body,
+                max_retries=api_max_retries(QUEUE_OPERATIONS),
+                shard_key=raw_shard_key(x_shard_key, body),
+                lane=lane,
+                headers={OPERATION_HEADER: name},
+                # Las operaciones cacheables son puras: se pueden duplicar sin efectos
+                hedge=operations_router.operations[name].cacheable,
+                content_type="application/json",
+            )
+        if response is None:
+            raise HTTPException(status_code=500, detail="No se recibió respuesta del worker")
+        return Response(content=response, media_type="application/json")
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise circuit_open(e) from e
+    except TimeoutError as e:
+        raise reply_timeout(e) from e
+    except ConnectionError as e:
+        logger.error(f"Error de conexión en operación '{name}': {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
+    except Exception as e:
+        logger.error(f"Error inesperado en operación '{name}': {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error en la operación: {str(e)}") from e
+
+
+@app.post("/jobs/{operation}", response_model=JobResponse, status_code=202, dependencies=[Depends(require_ready)])
+async def submit_job(
+    operation: str,
+    request: OperationRequest,
+    lane: str = Query(DEFAULT_LANE, description="Carril de prioridad (default | bulk)"),
+) -> dict[str, Any]:
+    """
+    Endpoint que encola una operación como job asíncrono y devuelve su id inmediatamente.
+
+    Args:
+        operation (str): Operación a ejecutar (multiply | sum)
+        request (OperationRequest): Petición con los números de la operación
+        lane (str): Carril de prioridad de la petición
+
+    Returns:
+        dict[str, Any]: Identificador y estado inicial del job
+
+    Raises:
+        HTTPException: Si la operación o el carril no existen o no hay conexión con RabbitMQ
+    """
+    if operation not in OPERATION_QUEUES:
+        raise HTTPException(status_code=404, detail=f"Operación desconocida: '{operation}'")
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
+    try:
+        payload = {"a": request.a, "b": request.b}
+        with rabbit_manager.client() as client:
+            job_id = client.submit(
+                OPERATION_QUEUES[operation],
+                json.dumps(payload),
+                shard_key=shard_key(payload, RABBITMQ_SHARDING["key_field"]),
+                lane=lane,
+            )
+        return {"job_id": job_id, "status": JOB_PENDING}
+    except ConnectionError as e:
+        logger.error(f"Error de conexión al enviar job: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=JOB_MAX_WAIT, description="Segundos de long-polling mientras esté pendiente"),
+) -> dict[str, Any]:
+    """
+    Endpoint que consulta el estado de un job, opcionalmente esperando a que termine.
+
+    Args:
+        job_id (str): Identificador del job
+        wait (float): Segundos máximos de espera mientras el job siga pendiente
+
+    Returns:
+        dict[str, Any]: Estado del job y, si terminó, su resultado o error
+
+    Raises:
+        HTTPException: Si el job no existe o expiró
+    """
+    backend = get_result_backend()
+    deadline = time.monotonic() + wait
+    record = backend.get(job_id)
+    while record is not None and record["status"] == JOB_PENDING and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        record = backend.get(job_id)
+
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job no encontrado: '{job_id}'")
+    return {"job_id": job_id, **record}
+
+
+@app.post(
+    "/publish/{operation}", response_model=BulkPublishResponse, status_code=202, dependencies=[Depends(require_ready)]
+)
+async def publish_bulk(
+    operation: str,
+    requests: list[OperationRequest],
+    lane: str = Query(BULK_LANE, description="Carril de prioridad (default | bulk)"),
+) -> dict[str, Any]:
+    """
+    Endpoint que publica un lote de operaciones sin esperar sus resultados (fire-and-forget).
+
+    Args:
+        operation (str): Operación a ejecutar (multiply | sum)
+        requests (list[OperationRequest]): Peticiones con los números de cada operación
+        lane (str): Carril de prioridad de las peticiones (por defecto, "bulk")
+
+    Returns:
+        dict[str, Any]: Número de mensajes publicados
+
+    Raises:
+        HTTPException: Si la operación o el carril no existen o no hay conexión con RabbitMQ
+    """
+    if operation not in OPERATION_QUEUES:
+        raise HTTPException(status_code=404, detail=f"Operación desconocida: '{operation}'")
+    if lane not in RABBITMQ_LANES:
+        raise HTTPException(status_code=400, detail=f"Carril desconocido: '{lane}'")
+    try:
+        # El publicador envía en ráfagas y vacía el buffer al cerrarse
+        with rabbit_manager.publisher() as publisher:
+            for request in requests:
+                payload = {"a": request.a, "b": request.b}
+                publisher.publish(
+                    OPERATION_QUEUES[operation],
+                    json.dumps(payload),
+                    shard_key=shard_key(payload, RABBITMQ_SHARDING["key_field"]),
+                    lane=lane,
+                )
+        return {"published": len(requests)}
+    except ConnectionError as e:
+        logger.error(f"Error de conexión en publicación masiva: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error de conexión con RabbitMQ: {str(e)}") from e
+
+
+@app.post("/admin/reload")
+async def admin_reload() -> dict[str, Any]:
+    """
+    Endpoint que recarga la configuración de tuning (``.env`` y fichero de tuning) y el
+    enrutador de shards sin reiniciar.
+
+    Returns:
+        dict[str, Any]: Configuración de tuning vigente
+
+    Raises:
+        HTTPException: Si la nueva configuración no es válida (se conserva la anterior)
+    """
+    try:
+        return reload_config()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """Endpoint que exporta las métricas del proceso en formato de texto de Prometheus."""
+    return metrics.render()
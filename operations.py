@@ -0,0 +1,84 @@
+"""
+Operaciones que procesan los workers.
+
+Las operaciones registradas en ``router`` se sirven desde una única cola compartida
+(``<queue>_ops``) y se exponen en la API mediante ``POST /ops/{name}``; añadir una
+operación sólo requiere decorar su handler. Los handlers también se usan en las
+colas dedicadas históricas de ``worker.py``.
+"""
+
+from collections.abc import Iterator
+from typing import Any
+
+from core.config.settings import RABBITMQ_CONFIG
+from core.utils.logging import get_logger
+from features.rabbitmq.router import OperationRouter
+
+logger = get_logger(__name__)
+
+QUEUE_OPERATIONS = f"{RABBITMQ_CONFIG['queue']}_ops"
+
+router = OperationRouter(QUEUE_OPERATIONS)
+
+
+@router.operation("multiply", concurrency=4, cacheable=True)
+def process_multiply(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Procesa un mensaje para realizar una multiplicación.
+
+    Args:
+        payload (dict[str, Any]): Payload con los números a multiplicar
+
+    Returns:
+        dict[str, Any]: Resultado de la multiplicación o error
+    """
+    try:
+        a = payload.get("a", 0)
+        b = payload.get("b", 0)
+        result = a * b
+        logger.info(f"Multiplicación realizada: {a} * {b} = {result}")
+        return {"result": result, "operation": "multiply"}
+    except Exception as e:
+        logger.error(f"Error en multiplicación: {str(e)}")
+        return {"error": str(e), "operation": "multiply"}
+
+
+@router.operation("sum", concurrency=4, cacheable=True)
+def process_sum(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Procesa un mensaje para realizar una suma.
+
+    Args:
+        payload (dict[str, Any]): Payload con los números a sumar
+
+    Returns:
+        dict[str, Any]: Resultado de la suma o error
+    """
+    try:
+        a = payload.get("a", 0)
+        b = payload.get("b", 0)
+        result = a + b
+        logger.info(f"Suma realizada: {a} + {b} = {result}")
+        return {"result": result, "operation": "sum"}
+    except Exception as e:
+        logger.error(f"Error en suma: {str(e)}")
+        return {"error": str(e), "operation": "sum"}
+
+
+def process_multiply_table(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """
+    Genera la tabla de multiplicar de ``a`` desde 1 hasta ``b``, fila a fila.
+
+    Al ser un generador, el servidor publica cada fila como un fragmento del stream.
+
+    Args:
+        payload (dict[str, Any]): Payload con el número ``a`` y el límite ``b``
+
+    Yields:
+        dict[str, Any]: Fila de la tabla
+    """
+    a = payload.get("a", 0)
+    b = int(payload.get("b", 0))
+    for factor in range(1, b + 1):
+        yield {"factor": factor, "result": a * factor, "operation": "multiply_table"}
+    logger.info(f"Tabla de multiplicar generada: {a} x 1..{b}")
@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from features.rabbitmq.rabbitmq_connection_client import RabbitMQClient
+from features.rabbitmq.rabbitmq_connection_server import RabbitMQServer
+
+
+@pytest.fixture
+def server():
+    """Servidor sobre una conexión simulada."""
+    return RabbitMQServer(MagicMock())
+
+
+@pytest.fixture
+def client():
+    """
+    Cliente sin conexión real.
+
+    Cada espera de eventos responde a la última publicación con ``client.reply`` y
+    ``client.reply_headers``; mientras ``client.reply`` sea None no llega ninguna respuesta.
+    """
+    client = RabbitMQClient.__new__(RabbitMQClient)
+    client.rabbit_conn = MagicMock()
+    client.rabbit_conn.is_connected.return_value = True
+    client.channel = MagicMock()
+    client.callback_queue = "cb"
+    client.response = None
+    client.response_headers = {}
+    client.corr_id = None
+    client.stream_chunks = {}
+    client.reply, client.reply_headers = None, None
+
+    def respond(time_limit):
+        if client.reply is None or not client.channel.basic_publish.called:
+            return
+        corr_id = client.channel.basic_publish.call_args.kwargs["properties"].correlation_id
+        props = pika.BasicProperties(correlation_id=corr_id, headers=client.reply_headers)
+        client.on_response(None, None, props, client.reply)
+
+    client.rabbit_conn.process_data_events.side_effect = respond
+    return client
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from features.rabbitmq.autoscaler import Autoscaler
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
+
+
+@pytest.fixture
+def autoscaler(server):
+    return Autoscaler(server, min_concurrency=1, max_concurrency=8, interval=5, target_backlog=10)
+
+
+def queue_state(message_count, consumer_count):
+    """Resultado de un ``queue_declare`` pasivo."""
+    return MagicMock(method=MagicMock(message_count=message_count, consumer_count=consumer_count))
+
+
+class TestDecide:
+    def test_invalid_bounds(self, server):
+        with pytest.raises(ValueError):
+            Autoscaler(server, min_concurrency=4, max_concurrency=2)
+
+    def test_starts_at_minimum(self, autoscaler):
+        assert autoscaler.capacity == 1
+
+    def test_scales_up_immediately(self, autoscaler):
+        assert autoscaler.decide(backlog=35, in_flight=1) == 5
+
+    def test_never_exceeds_maximum(self, autoscaler):
+        assert autoscaler.decide(backlog=1000, in_flight=8) == 8
+
+    def test_scales_down_one_step_at_a_time(self, autoscaler):
+        autoscaler.capacity = 6
+        assert autoscaler.decide(backlog=0, in_flight=0) == 5
+
+    def test_never_below_minimum(self, autoscaler):
+        assert autoscaler.decide(backlog=0, in_flight=0) == 1
+
+
+class TestSampling:
+    def test_backlog_is_shared_between_consumers(self, server, autoscaler):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 1, BULK_LANE: 1})
+        server.channel.queue_declare.side_effect = lambda queue, passive: {
+            "q": queue_state(20, 2),
+            "q.bulk": queue_state(5, 0),
+        }[queue]
+
+        assert autoscaler.sample() == 15
+
+    def test_throttled_queues_are_not_sampled(self, server, autoscaler):
+        server.create_server("limitada", lambda payload: payload, lanes={DEFAULT_LANE: 1}, rate_limit=5)
+        server.channel.queue_declare.reset_mock()
+
+        assert autoscaler.sample() == 0
+        server.channel.queue_declare.assert_not_called()
+
+    def test_tick_applies_capacity_as_global_prefetch(self, server, autoscaler):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 1})
+        server.channel.queue_declare.side_effect = lambda queue, passive: queue_state(30, 1)
+
+        autoscaler._tick()
+
+        assert autoscaler.capacity == 3
+        assert server.channel.basic_qos.call_args.kwargs == {"prefetch_count": 3, "global_qos": True}
+        server.channel.connection.call_later.assert_called_once_with(5, autoscaler._tick)
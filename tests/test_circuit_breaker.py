@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+import pika
+import pytest
+
+from core.config.tuning import TuningConfig
+from core.utils.exceptions import CircuitOpenError
+from features.rabbitmq.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from features.rabbitmq.retry import ATTEMPT_HEADER, ERROR_HEADER
+
+
+@pytest.fixture
+def clock():
+    """Reloj controlado por la prueba para el circuit breaker."""
+    now = [100.0]
+    with patch("features.rabbitmq.circuit_breaker.time.monotonic", side_effect=lambda: now[0]):
+        yield now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("q", failure_threshold=3, reset_timeout=10)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, breaker):
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after() == 10
+
+    def test_success_resets_the_failure_count(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_single_probe_after_reset_timeout(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock[0] += 10
+
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+    def test_successful_probe_closes_the_circuit(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock[0] += 10
+        breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens_the_circuit(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock[0] += 10
+        breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 10
+
+    def test_thresholds_default_to_tuning(self):
+        tuning = TuningConfig(breaker_failure_threshold=7, breaker_reset_timeout=3)
+        with patch("features.rabbitmq.circuit_breaker.get_tuning", return_value=tuning):
+            breaker = CircuitBreaker("q")
+            assert (breaker.failure_threshold, breaker.reset_timeout) == (7, 3)
+
+
+class TestClientBreaker:
+    @pytest.fixture
+    def breaker(self, clock):
+        breaker = CircuitBreaker("q", failure_threshold=2, reset_timeout=10)
+        with patch("features.rabbitmq.rabbitmq_connection_client.get_circuit_breaker", return_value=breaker):
+            yield breaker
+
+    def test_empty_reply_is_a_success(self, client, breaker):
+        client.reply = b""
+        breaker.record_failure()
+        assert client.call_raw("q", b"{}") == b""
+        assert client.channel.basic_publish.call_count == 1
+        assert breaker._failures == 0
+
+    def test_error_replies_do_not_open_the_circuit(self, client, breaker):
+        client.reply, client.reply_headers = b'{"error": "fallo"}', {ERROR_HEADER: "fallo"}
+
+        # El error se devuelve al llamador: la cola responde, así que el circuito sigue cerrado
+        for _ in range(5):
+            assert client.call_raw("q", b"{}") == b'{"error": "fallo"}'
+        assert breaker.state == CLOSED
+        assert breaker._failures == 0
+
+    def test_error_reply_closes_a_half_open_circuit(self, client, breaker, clock):
+        breaker.record_failure()
+        breaker.record_failure()
+        clock[0] += 10
+        client.reply, client.reply_headers = b"{}", {ERROR_HEADER: "fallo"}
+        client.call_raw("q", b"{}")
+        assert breaker.state == CLOSED
+
+    def test_timeouts_open_the_circuit(self, client, breaker):
+        tuning = TuningConfig(reply_timeout=0.01, retry_sleep=0)
+        with patch("features.rabbitmq.rabbitmq_connection_client.get_tuning", return_value=tuning):
+            for _ in range(2):
+                with pytest.raises(TimeoutError):
+                    client.call_raw("q", b"{}")
+            with pytest.raises(CircuitOpenError):
+                client.call_raw("q", b"{}")
+        assert breaker.state == OPEN
+
+
+class TestServerErrorReply:
+    def test_exhausted_retries_reply_with_the_error_header(self, server):
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr", headers={ATTEMPT_HEADER: 99})
+        server._retry_or_dead_letter(props, b"{}", "q", None, RuntimeError("fallo"))
+
+        reply = server.channel.basic_publish.call_args.kwargs
+        assert reply["routing_key"] == "cb"
+        assert reply["properties"].headers[ERROR_HEADER] == "fallo"
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pika
+import pytest
+
+from core.config.settings import BASE_DIR, project_path
+from features.rabbitmq.claim_check import (
+    ACCEPT_CLAIM_CHECK_HEADER,
+    CLAIM_CHECK_HEADER,
+    FileClaimCheckStore,
+    accept_claim_check,
+    create_claim_check_store,
+    load_body,
+    offload_body,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Almacén temporal sin purgas oportunistas (sólo las que lanza la prueba)."""
+    return FileClaimCheckStore(str(tmp_path), ttl=60, purge_interval=float("inf"))
+
+
+@pytest.fixture
+def enabled(store):
+    """Claim check activado con un umbral pequeño y el almacén temporal como almacén de la aplicación."""
+    config = {"enabled": True, "threshold": 10}
+    with (
+        patch.dict("features.rabbitmq.claim_check.CLAIM_CHECK_CONFIG", config),
+        patch("features.rabbitmq.claim_check._store", store),
+    ):
+        yield store
+
+
+def expire(store, ref):
+    """Envejece el fichero de una referencia más allá del TTL del almacén."""
+    old = time.time() - store.ttl - 1
+    os.utime(store._file(ref), (old, old))
+
+
+class TestFileClaimCheckStore:
+    def test_put_and_open(self, store):
+        ref = store.put(b"cuerpo grande")
+        assert bytes(store.open(ref)) == b"cuerpo grande"
+
+    def test_identical_content_shares_the_reference(self, store):
+        assert store.put(b"igual") == store.put(b"igual")
+        assert store.put(b"igual") != store.put(b"distinto")
+
+    @pytest.mark.parametrize("ref", ["../../etc/passwd", "0" * 64])
+    def test_unknown_or_invalid_reference(self, store, ref):
+        with pytest.raises(KeyError):
+            store.open(ref)
+
+    def test_purge_removes_expired_bodies(self, store):
+        expired = store.put(b"viejo")
+        current = store.put(b"nuevo")
+        expire(store, expired)
+
+        assert store.purge() == 1
+        with pytest.raises(KeyError):
+            store.open(expired)
+        assert bytes(store.open(current)) == b"nuevo"
+
+    def test_put_renews_the_ttl_of_existing_content(self, store):
+        ref = store.put(b"renovado")
+        expire(store, ref)
+        store.put(b"renovado")
+        assert store.purge() == 0
+
+    def test_put_purges_in_the_background(self, tmp_path):
+        store = FileClaimCheckStore(str(tmp_path), ttl=60, purge_interval=0)
+        expired = store.put(b"viejo")
+        store._purge_thread.join(5)
+        expire(store, expired)
+
+        release = threading.Event()
+        purge = store.purge
+        with patch.object(store, "purge", side_effect=lambda: release.wait(5) and purge()):
+            # La escritura no espera a que termine la purga
+            store.put(b"nuevo")
+            assert store._purge_thread.is_alive()
+            release.set()
+            store._purge_thread.join(5)
+
+        with pytest.raises(KeyError):
+            store.open(expired)
+
+    def test_one_background_purge_at_a_time(self, tmp_path):
+        store = FileClaimCheckStore(str(tmp_path), ttl=60, purge_interval=0)
+        release = threading.Event()
+        with patch.object(store, "purge", side_effect=lambda: release.wait(5)) as purge:
+            store.put(b"uno")
+            store.put(b"dos")
+            release.set()
+            store._purge_thread.join(5)
+        purge.assert_called_once()
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_claim_check_store({"backend": "s3", "path": str(tmp_path), "ttl": 60, "purge_interval": 60})
+
+
+class TestOffload:
+    def test_large_bodies_travel_by_reference(self, enabled):
+        body, encoding, headers = offload_body(b"x" * 100)
+
+        assert (body, encoding) == (b"", None)
+        assert bytes(load_body(body, encoding, headers)) == b"x" * 100
+
+    def test_small_bodies_travel_inline(self, enabled):
+        body, encoding, headers = offload_body(b"corto")
+        assert headers == {}
+        assert bytes(load_body(body, encoding, headers)) == b"corto"
+
+    def test_disabled(self):
+        with patch.dict("features.rabbitmq.claim_check.CLAIM_CHECK_CONFIG", {"enabled": False}):
+            assert offload_body(b"x" * 10_000_000)[2] == {}
+            assert accept_claim_check() == {}
+
+    def test_expired_reference(self, enabled):
+        with pytest.raises(KeyError):
+            load_body(b"", None, {CLAIM_CHECK_HEADER: "0" * 64})
+
+
+class TestServerReply:
+    def reply(self, server, headers):
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr", headers=headers)
+        server._reply(props, b"y" * 100)
+        return server.channel.basic_publish.call_args.kwargs
+
+    def test_large_reply_goes_by_claim_check_when_accepted(self, server, enabled):
+        reply = self.reply(server, {ACCEPT_CLAIM_CHECK_HEADER: True})
+
+        assert reply["body"] == b""
+        ref = reply["properties"].headers[CLAIM_CHECK_HEADER]
+        assert bytes(enabled.open(ref)) == b"y" * 100
+
+    def test_large_reply_is_inline_when_not_accepted(self, server, enabled):
+        reply = self.reply(server, None)
+        assert reply["body"] == b"y" * 100
+        assert not reply["properties"].headers
+
+
+class TestClaimCheckPath:
+    def test_relative_path_resolves_against_the_project_root(self):
+        assert project_path("claims") == str(BASE_DIR / "claims")
+
+    def test_absolute_path_is_kept(self, tmp_path):
+        assert project_path(str(tmp_path)) == str(tmp_path)
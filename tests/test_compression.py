@@ -0,0 +1,90 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+from features.rabbitmq.compression import (
+    ACCEPT_ENCODING_HEADER,
+    CODECS,
+    accept_encoding,
+    compress_body,
+    decompress_body,
+    negotiate,
+)
+
+CONFIG = {"threshold": 1024, "codec": "deflate", "level": 6}
+
+LARGE = b'{"values": [' + b", ".join(b"%d" % i for i in range(2000)) + b"]}"
+
+
+@pytest.fixture(autouse=True)
+def config():
+    with patch.dict("features.rabbitmq.compression.COMPRESSION_CONFIG", CONFIG):
+        yield
+
+
+class TestCompressBody:
+    def test_small_bodies_are_not_compressed(self):
+        assert compress_body(b"x" * 100) == (b"x" * 100, None)
+
+    @pytest.mark.parametrize("codec", sorted(CODECS))
+    def test_round_trip(self, codec):
+        compressed, encoding = compress_body(LARGE, codec)
+        assert encoding == codec
+        assert len(compressed) < len(LARGE)
+        assert bytes(decompress_body(compressed, encoding)) == LARGE
+
+    def test_incompressible_bodies_are_sent_as_is(self):
+        body = os.urandom(4096)
+        assert compress_body(body) == (body, None)
+
+    def test_unavailable_codec_is_not_used(self):
+        assert compress_body(LARGE, "brotli") == (LARGE, None)
+
+    def test_identity_is_returned_without_copy(self):
+        body = memoryview(b"abc")
+        assert decompress_body(body, None) is body
+        assert decompress_body(body, "identity") is body
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError):
+            decompress_body(b"abc", "brotli")
+
+
+class TestNegotiation:
+    def test_configured_codec_is_preferred(self):
+        assert negotiate("gzip, deflate") == "deflate"
+
+    def test_first_supported_codec(self):
+        assert negotiate("brotli,gzip") == "gzip"
+
+    def test_old_clients_get_uncompressed_replies(self):
+        assert negotiate(None) is None
+        assert negotiate("brotli") is None
+
+    def test_accept_encoding_lists_available_codecs(self):
+        assert set(accept_encoding().split(",")) == set(CODECS)
+
+
+class TestCompressedReplies:
+    def test_reply_is_compressed_only_if_accepted(self, server):
+        accepting = pika.BasicProperties(reply_to="cb", headers={ACCEPT_ENCODING_HEADER: "deflate"})
+        server._reply(accepting, LARGE)
+        server._reply(pika.BasicProperties(reply_to="cb"), LARGE)
+
+        compressed, plain = (call.kwargs for call in server.channel.basic_publish.call_args_list)
+        assert compressed["properties"].content_encoding == "deflate"
+        assert bytes(decompress_body(compressed["body"], "deflate")) == LARGE
+        assert plain["properties"].content_encoding is None
+        assert plain["body"] == LARGE
+
+    def test_compressed_request_is_decompressed_for_the_handler(self, server):
+        received = []
+        server.create_server("q", received.append)
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+        body, encoding = compress_body(LARGE)
+
+        callback(server.channel, MagicMock(delivery_tag=1), pika.BasicProperties(content_encoding=encoding), body)
+
+        assert received == [{"values": list(range(2000))}]
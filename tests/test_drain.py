@@ -0,0 +1,77 @@
+import threading
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
+
+
+@pytest.fixture
+def server(server):
+    """Servidor cuyo hilo de pika sólo ejecuta los callbacks al procesar eventos."""
+    pending = []
+    connection = server.channel.connection
+    connection.add_callback_threadsafe.side_effect = pending.append
+
+    def process_data_events(time_limit):
+        while pending:
+            pending.pop(0)()
+
+    connection.process_data_events.side_effect = process_data_events
+    return server
+
+
+def deliver(server, queue, tag):
+    """Entrega un mensaje al consumidor registrado más recientemente."""
+    callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+    props = pika.BasicProperties(reply_to="cb", correlation_id=str(tag))
+    callback(server.channel, MagicMock(delivery_tag=tag), props, b"{}")
+
+
+class TestStopConsuming:
+    def test_cancels_every_consumer(self, server):
+        server.create_server("a", lambda payload: payload, lanes={DEFAULT_LANE: 1, BULK_LANE: 1})
+        server.create_server("b", lambda payload: payload, lanes={DEFAULT_LANE: 1})
+
+        server.stop_consuming()
+
+        assert server.channel.basic_cancel.call_count == 3
+        assert server.consumers == {}
+        assert server.lanes == {}
+
+
+class TestDrain:
+    def test_waits_for_pooled_handlers_and_acks_them(self, server):
+        release = threading.Event()
+        server.create_server(
+            "q", lambda payload: release.wait(5) and {"ok": True}, lanes={DEFAULT_LANE: 1}, concurrency=2
+        )
+        deliver(server, "q", 1)
+        deliver(server, "q", 2)
+        assert server.in_flight == 2
+
+        server.stop_consuming()
+        release.set()
+        assert server.drain(grace_period=5) == 0
+
+        assert server.in_flight == 0
+        acked = {call.kwargs["delivery_tag"] for call in server.channel.basic_ack.call_args_list}
+        assert acked == {1, 2}
+        assert server.channel.basic_publish.call_count == 2
+        assert server.executors == {}
+
+    def test_reports_messages_still_in_flight_after_the_grace_period(self, server):
+        release = threading.Event()
+        server.create_server("q", lambda payload: release.wait(5), lanes={DEFAULT_LANE: 1}, concurrency=2)
+        deliver(server, "q", 1)
+
+        try:
+            assert server.drain(grace_period=0.05) == 1
+        finally:
+            release.set()
+        # Sin confirmar: el broker volverá a entregarlo al cerrar la conexión
+        server.channel.basic_ack.assert_not_called()
+
+    def test_nothing_in_flight(self, server):
+        assert server.drain(grace_period=5) == 0
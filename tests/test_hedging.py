@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+from core.config.tuning import TuningConfig
+from features.rabbitmq.hedging import MAX_HEDGE_BUDGET, HedgePolicy, hedge_routing_key
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
+from features.rabbitmq.sharding import ShardRouter
+
+
+@pytest.fixture
+def policy():
+    return HedgePolicy(percentile=0.9, min_delay=0.05, max_rate=0.5, window=10, min_samples=5)
+
+
+class TestHedgeDelay:
+    def test_no_delay_until_enough_samples(self, policy):
+        for _ in range(4):
+            policy.record("q", 0.1)
+        assert policy.delay("q") is None
+        policy.record("q", 0.1)
+        assert policy.delay("q") == 0.1
+
+    def test_percentile_of_recent_latencies(self, policy):
+        for latency in range(1, 11):
+            policy.record("q", latency / 10)
+        assert policy.delay("q") == pytest.approx(0.9)
+
+    def test_only_the_window_is_kept(self, policy):
+        for _ in range(10):
+            policy.record("q", 5.0)
+        for _ in range(10):
+            policy.record("q", 0.2)
+        assert policy.delay("q") == pytest.approx(0.2)
+
+    def test_minimum_delay(self, policy):
+        for _ in range(5):
+            policy.record("q", 0.001)
+        assert policy.delay("q") == 0.05
+
+    def test_latencies_are_per_queue(self, policy):
+        for _ in range(5):
+            policy.record("a", 1.0)
+        assert policy.delay("b") is None
+
+
+class TestHedgeBudget:
+    def test_no_hedges_without_completed_calls(self, policy):
+        assert not policy.allow()
+
+    def test_each_call_earns_a_fraction_of_a_hedge(self, policy):
+        policy.record("q", 0.1)
+        assert not policy.allow()
+        policy.record("q", 0.1)
+        assert policy.allow()
+        assert not policy.allow()
+
+    def test_budget_is_capped(self, policy):
+        for _ in range(1000):
+            policy.record("q", 0.1)
+        assert sum(policy.allow() for _ in range(100)) == MAX_HEDGE_BUDGET
+
+
+class TestHedgeRoutingKey:
+    def test_unsharded_queue_is_hedged_on_the_same_queue(self):
+        with patch("features.rabbitmq.hedging.get_shard_router", return_value=ShardRouter(1)):
+            assert hedge_routing_key("q", "clave", BULK_LANE) == "q.bulk"
+
+    def test_sharded_queue_is_hedged_on_the_next_shard(self):
+        router = ShardRouter(4)
+        shard = router.shard_for("clave")
+        with patch("features.rabbitmq.hedging.get_shard_router", return_value=router):
+            hedged = hedge_routing_key("q", "clave", DEFAULT_LANE)
+        next_shard = (shard + 1) % 4
+        assert hedged == ("q" if next_shard == 0 else f"q.shard{next_shard}")
+
+
+class TestHedgedCall:
+    def test_slow_call_is_duplicated_and_first_reply_wins(self, client):
+        policy = MagicMock()
+        policy.delay.return_value = 0.0
+        policy.allow.return_value = True
+
+        def process_data_events(time_limit):
+            # La respuesta llega después de publicar el duplicado
+            if client.channel.basic_publish.call_count == 2:
+                props = client.channel.basic_publish.call_args.kwargs["properties"]
+                client.on_response(None, None, pika.BasicProperties(correlation_id=props.correlation_id), b"ok")
+
+        client.rabbit_conn.process_data_events.side_effect = process_data_events
+
+        with (
+            patch("features.rabbitmq.rabbitmq_connection_client.get_hedge_policy", return_value=policy),
+            patch("features.rabbitmq.rabbitmq_connection_client.get_tuning", return_value=TuningConfig()),
+            patch("features.rabbitmq.hedging.get_shard_router", return_value=ShardRouter(1)),
+        ):
+            assert client.call_raw("hedge.q", b"{}", hedge=True) == b"ok"
+
+        original, hedged = (call.kwargs for call in client.channel.basic_publish.call_args_list)
+        assert original["properties"].correlation_id == hedged["properties"].correlation_id
+        assert hedged["routing_key"] == "hedge.q"
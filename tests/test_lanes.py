@@ -0,0 +1,42 @@
+
+import pytest
+
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE, lane_queue_name, lane_weights
+
+
+class TestLaneNames:
+    def test_default_lane_keeps_queue_name(self):
+        assert lane_queue_name("q", DEFAULT_LANE) == "q"
+
+    def test_other_lanes_get_suffix(self):
+        assert lane_queue_name("q.shard1", BULK_LANE) == "q.shard1.bulk"
+
+    def test_unknown_lane(self):
+        with pytest.raises(ValueError):
+            lane_queue_name("q", "urgente")
+
+    def test_weights_default_to_configuration(self):
+        weights = lane_weights()
+        assert set(weights) == {DEFAULT_LANE, BULK_LANE}
+        # Se devuelve una copia: modificarla no altera la configuración
+        weights[DEFAULT_LANE] = 100
+        assert lane_weights()[DEFAULT_LANE] != 100
+
+
+class TestLaneConsumers:
+    def test_one_consumer_per_lane_with_weighted_prefetch(self, server):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 4, BULK_LANE: 1}, concurrency=2)
+
+        consumed = [call.kwargs["queue"] for call in server.channel.basic_consume.call_args_list]
+        prefetch = [call.kwargs["prefetch_count"] for call in server.channel.basic_qos.call_args_list]
+        assert consumed == ["q", "q.bulk"]
+        assert prefetch == [8, 2]
+        assert set(server.consumers) == {"q", "q.bulk"}
+
+    def test_cancel_server_cancels_every_lane(self, server):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 1, BULK_LANE: 1})
+        server.cancel_server("q")
+
+        assert server.channel.basic_cancel.call_count == 2
+        assert server.consumers == {}
+        assert "q" not in server.lanes
@@ -0,0 +1,134 @@
+import pstats
+import threading
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from features.rabbitmq.lanes import DEFAULT_LANE
+from features.rabbitmq.profiling import HandlerProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = HandlerProfiler(output_dir=str(tmp_path), duration=60, max_messages=100)
+    yield profiler
+    if profiler.active:
+        profiler.stop()
+
+
+def work(n):
+    return sum(i * i for i in range(n))
+
+
+def profiled_functions(path):
+    return {function for _, _, function in pstats.Stats(str(path)).stats}
+
+
+class TestCapture:
+    def test_handlers_are_measured_without_a_capture(self, profiler, tmp_path):
+        assert profiler.run("op", work, 10) == 285
+        assert not profiler.active
+        assert list(tmp_path.iterdir()) == []
+
+    def test_capture_ends_after_max_messages(self, profiler, tmp_path):
+        assert profiler.start(max_messages=2)
+        assert not profiler.start()
+
+        profiler.run("op", work, 10)
+        profiler.run("op", work, 10)
+
+        assert not profiler.active
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert len(files) == 2
+        assert files[0].endswith("-op.prof")
+        assert files[1].endswith("-tracemalloc.txt")
+        assert "work" in profiled_functions(tmp_path / files[0])
+
+    def test_toggle(self, profiler):
+        assert profiler.toggle()
+        assert not profiler.toggle()
+        assert not profiler.active
+
+    def test_failing_handler_counts_as_a_message(self, profiler):
+        def failing():
+            raise RuntimeError("fallo")
+
+        profiler.start(max_messages=1)
+        with pytest.raises(RuntimeError):
+            profiler.run("op", failing)
+        assert not profiler.active
+
+    def test_stream_is_profiled_as_one_message(self, profiler, tmp_path):
+        def chunks():
+            for n in (10, 20):
+                yield work(n)
+
+        profiler.start(max_messages=1)
+        stream = profiler.run("op", chunks)
+        # La captura sigue activa hasta que termina el stream
+        assert profiler.active
+        assert list(stream) == [285, 2470]
+        assert not profiler.active
+
+        prof = next(path for path in tmp_path.iterdir() if path.suffix == ".prof")
+        assert "work" in profiled_functions(prof)
+
+
+class TestNonBlockingStop:
+    def test_stop_does_not_wait_for_the_profiled_handler(self, profiler, tmp_path):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        profiler.start()
+        handler = threading.Thread(target=profiler.run, args=("op", slow))
+        handler.start()
+        started.wait(5)
+
+        # El hilo de pika detiene la captura sin esperar: el volcado queda pendiente
+        assert profiler.stop() == []
+        assert not profiler.active
+        assert not profiler.start()
+
+        release.set()
+        handler.join(5)
+        # El handler vuelca los perfiles al terminar
+        assert any(path.suffix == ".prof" for path in tmp_path.iterdir())
+        assert profiler.start()
+
+    def test_busy_capture_does_not_serialise_handlers(self, profiler):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        profiler.start()
+        handler = threading.Thread(target=profiler.run, args=("op", slow))
+        handler.start()
+        started.wait(5)
+        try:
+            # Otro handler no espera por la captura: se ejecuta sin perfilar
+            assert profiler.run("op", work, 10) == 285
+        finally:
+            release.set()
+            handler.join(5)
+
+
+class TestServerProfiling:
+    def test_only_the_handler_call_is_profiled(self, server, tmp_path):
+        server.profiler = HandlerProfiler(output_dir=str(tmp_path), max_messages=1)
+        server.create_server("q", lambda payload: work(payload["n"]), lanes={DEFAULT_LANE: 1})
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+
+        server.profiler.start()
+        callback(server.channel, MagicMock(delivery_tag=1), pika.BasicProperties(reply_to="cb"), b'{"n": 10}')
+
+        prof = next(path for path in tmp_path.iterdir() if path.suffix == ".prof")
+        functions = profiled_functions(prof)
+        assert "work" in functions
+        assert "loads" not in functions
+        assert "_reply" not in functions
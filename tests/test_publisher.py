@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from features.rabbitmq.lanes import BULK_LANE
+from features.rabbitmq.publisher import BulkPublisher
+from features.rabbitmq.sharding import ShardRouter
+
+
+@pytest.fixture
+def connection():
+    connection = MagicMock()
+    connection.open_channel.return_value.is_open = True
+    return connection
+
+
+def published(publisher):
+    return [call.kwargs for call in publisher.channel.basic_publish.call_args_list]
+
+
+class TestBulkPublisher:
+    def test_messages_are_buffered_until_the_batch_is_full(self, connection):
+        publisher = BulkPublisher(connection, batch_size=3, max_buffer_bytes=1024, confirm=False)
+
+        publisher.publish("q", "uno")
+        publisher.publish("q", b"dos")
+        assert published(publisher) == []
+
+        publisher.publish("q", "tres")
+        assert [message["body"] for message in published(publisher)] == [b"uno", b"dos", b"tres"]
+        assert published(publisher)[0]["properties"].delivery_mode == 2
+
+    def test_buffer_is_flushed_when_it_exceeds_its_size(self, connection):
+        publisher = BulkPublisher(connection, batch_size=100, max_buffer_bytes=8, confirm=False)
+        publisher.publish("q", "12345")
+        publisher.publish("q", "67890")
+        assert len(published(publisher)) == 2
+
+    def test_confirmed_batches_are_committed_once(self, connection):
+        publisher = BulkPublisher(connection, batch_size=100, confirm=True)
+        publisher.channel.tx_select.assert_called_once()
+
+        assert publisher.publish_many("q", ["a", "b", "c"]) == 3
+        assert len(published(publisher)) == 3
+        publisher.channel.tx_commit.assert_called_once()
+
+    def test_lane_and_shard_routing(self, connection):
+        router = ShardRouter(4)
+        publisher = BulkPublisher(connection, confirm=False)
+        with patch("features.rabbitmq.publisher.get_shard_router", return_value=router):
+            publisher.publish_many("q", ["a", "b"], shard_key_fn=lambda message: message, lane=BULK_LANE)
+
+        expected = [f"{router.queue_for('q', key)}.{BULK_LANE}" for key in ("a", "b")]
+        assert [message["routing_key"] for message in published(publisher)] == expected
+
+    def test_failed_batch_raises_connection_error(self, connection):
+        publisher = BulkPublisher(connection, confirm=True)
+        publisher.channel.tx_commit.side_effect = pika.exceptions.AMQPChannelError("canal cerrado")
+
+        with pytest.raises(ConnectionError):
+            publisher.publish_many("q", ["a"])
+        # El lote fallido no se vuelve a intentar
+        assert publisher.flush() == 0
+
+    def test_closed_channel_is_reopened(self, connection):
+        publisher = BulkPublisher(connection, confirm=False)
+        publisher.channel.is_open = False
+        publisher.publish_many("q", ["a"])
+        assert connection.open_channel.call_count == 2
+
+    def test_close_flushes_pending_messages(self, connection):
+        publisher = BulkPublisher(connection, confirm=False)
+        channel = publisher.channel
+        with publisher:
+            publisher.publish("q", "a")
+        channel.basic_publish.assert_called_once()
+        channel.close.assert_called_once()
+        assert publisher.channel is None
+
+
+class TestPublishEndpoint:
+    def test_messages_are_published_in_a_batch(self):
+        publisher = MagicMock()
+
+        @contextmanager
+        def bulk_publisher():
+            yield publisher
+
+        with patch.object(main.rabbit_manager, "publisher", bulk_publisher):
+            main.app.state.ready = True
+            try:
+                response = TestClient(main.app).post("/publish/sum", json=[{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+            finally:
+                main.app.state.ready = False
+
+        assert response.status_code == 202
+        assert response.json() == {"published": 2}
+        calls = publisher.publish.call_args_list
+        assert [call.args for call in calls] == [
+            (main.QUEUE_SUM, '{"a": 1.0, "b": 2.0}'),
+            (main.QUEUE_SUM, '{"a": 3.0, "b": 4.0}'),
+        ]
+        assert {call.kwargs["lane"] for call in calls} == {BULK_LANE}
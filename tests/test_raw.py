@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from features.rabbitmq.sharding import shard_key
+
+
+class TestRawServer:
+    def test_handler_receives_memoryview_and_reply_is_published_as_is(self, server):
+        received = []
+
+        def handler(body, props):
+            received.append((type(body), bytes(body), props.content_type))
+            return memoryview(b"resultado")
+
+        server.create_server("q", handler, raw=True)
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr", content_type="application/octet-stream")
+        callback(server.channel, MagicMock(delivery_tag=1), props, b"\x00\x01")
+
+        assert received == [(memoryview, b"\x00\x01", "application/octet-stream")]
+        reply = server.channel.basic_publish.call_args.kwargs
+        assert bytes(reply["body"]) == b"resultado"
+        assert reply["properties"].content_type == "application/octet-stream"
+        server.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+
+class TestRawClient:
+    def test_call_raw_publishes_body_and_returns_bytes(self, client):
+        client.reply = b"respuesta"
+        response = client.call_raw("q", memoryview(b'{"a": 1}'), content_type="application/json")
+
+        publish = client.channel.basic_publish.call_args.kwargs
+        assert bytes(publish["body"]) == b'{"a": 1}'
+        assert publish["properties"].content_type == "application/json"
+        assert response == b"respuesta"
+
+
+class TestRawEndpointSharding:
+    @pytest.fixture
+    def api(self):
+        calls = []
+        rpc = MagicMock()
+        rpc.call_raw.side_effect = lambda *args, **kwargs: calls.append(kwargs) or b'{"result": 2.0}'
+
+        @contextmanager
+        def pooled_client():
+            yield rpc
+
+        with patch.object(main.rabbit_manager, "client", pooled_client):
+            main.app.state.ready = True
+            yield TestClient(main.app), calls
+
+    def test_header_is_the_shard_key(self, api):
+        http, calls = api
+        response = http.post("/raw/multiply", content=b'{"a": 1, "b": 2}', headers={"X-Shard-Key": "cliente-7"})
+
+        assert response.status_code == 200
+        assert calls[0]["shard_key"] == "cliente-7"
+        # Coincide con la clave que usa /multiply/ para el mismo valor del campo configurado
+        assert calls[0]["shard_key"] == shard_key({"user": "cliente-7"}, "user")
+
+    def test_body_is_the_fallback_shard_key(self, api):
+        http, calls = api
+        http.post("/raw/sum", content=b'{"a": 1, "b": 2}')
+        assert calls[0]["shard_key"] == b'{"a": 1, "b": 2}'
@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+from core.config.settings import BASE_DIR, project_path
+from features.rabbitmq.result_backend import (
+    JOB_DONE,
+    JOB_ERROR,
+    JOB_ID_HEADER,
+    JOB_PENDING,
+    MemoryResultBackend,
+    SQLiteResultBackend,
+    create_result_backend,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Cada prueba se ejecuta contra los dos backends."""
+    if request.param == "memory":
+        return MemoryResultBackend(ttl=60)
+    return SQLiteResultBackend(str(tmp_path / "jobs.sqlite3"), ttl=60)
+
+
+class TestResultBackends:
+    def test_set_and_get(self, backend):
+        backend.set("job-1", {"status": JOB_PENDING})
+        backend.set("job-1", {"status": JOB_DONE, "result": 6})
+        assert backend.get("job-1") == {"status": JOB_DONE, "result": 6}
+
+    def test_unknown_job(self, backend):
+        assert backend.get("no-existe") is None
+
+    def test_expired_job(self, backend):
+        backend.set("job-1", {"status": JOB_DONE}, ttl=-1)
+        assert backend.get("job-1") is None
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryResultBackend(ttl=60, max_entries=2)
+        backend.set("a", {"status": JOB_DONE})
+        backend.set("b", {"status": JOB_DONE})
+        backend.get("a")
+        backend.set("c", {"status": JOB_DONE})
+        assert backend.get("b") is None
+        assert backend.get("a") is not None
+
+    def test_sqlite_backend_is_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        SQLiteResultBackend(path, ttl=60).set("job-1", {"status": JOB_DONE, "result": 1})
+        assert SQLiteResultBackend(path, ttl=60).get("job-1")["result"] == 1
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_result_backend({"backend": "redis", "ttl": 60})
+
+
+class TestResultBackendPath:
+    def test_relative_paths_resolve_against_project_root(self):
+        assert project_path("jobs.sqlite3") == str(BASE_DIR / "jobs.sqlite3")
+
+    def test_absolute_paths_are_kept(self, tmp_path):
+        assert project_path(str(tmp_path / "jobs.sqlite3")) == str(tmp_path / "jobs.sqlite3")
+
+
+class TestJobResults:
+    def test_worker_stores_job_result_instead_of_replying(self, server):
+        backend = MemoryResultBackend(ttl=60)
+        server.create_server("q", lambda payload: {"result": payload["a"] * 2})
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+
+        with patch("features.rabbitmq.rabbitmq_connection_server.get_result_backend", return_value=backend):
+            props = pika.BasicProperties(headers={JOB_ID_HEADER: "job-1"})
+            callback(server.channel, MagicMock(delivery_tag=1), props, b'{"a": 3}')
+
+        assert backend.get("job-1") == {"status": JOB_DONE, "result": {"result": 6}}
+        server.channel.basic_publish.assert_not_called()
+
+    def test_handler_error_result_marks_job_as_failed(self, server):
+        backend = MemoryResultBackend(ttl=60)
+        with patch("features.rabbitmq.rabbitmq_connection_server.get_result_backend", return_value=backend):
+            server._store_job_result("job-1", {"error": "división por cero"}, raw=False)
+        assert backend.get("job-1") == {"status": JOB_ERROR, "error": "división por cero"}
+
+    def test_pending_record_is_written_before_publishing(self, client):
+        backend = MemoryResultBackend(ttl=60)
+        records = []
+        client.channel.basic_publish.side_effect = lambda **kwargs: records.append(
+            backend.get(kwargs["properties"].headers[JOB_ID_HEADER])
+        )
+
+        with patch("features.rabbitmq.rabbitmq_connection_client.get_result_backend", return_value=backend):
+            job_id = client.submit("q", '{"a": 1}')
+
+        assert records == [{"status": JOB_PENDING}]
+        assert client.channel.basic_publish.call_args.kwargs["properties"].message_id == job_id
@@ -0,0 +1,150 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+from core.config.tuning import TuningConfig
+from core.utils.exceptions import MessageError
+from features.rabbitmq.claim_check import CLAIM_CHECK_HEADER, FileClaimCheckStore
+from features.rabbitmq.lanes import DEFAULT_LANE
+from features.rabbitmq.retry import (
+    ATTEMPT_HEADER,
+    ERROR_HEADER,
+    attempt_of,
+    dead_letter_queue_name,
+    declare_retry_topology,
+    delay_queue_name,
+    forward_properties,
+    retry_delay_ms,
+)
+
+CONFIG = {"max_attempts": 3, "base_delay_ms": 1000, "multiplier": 2}
+
+
+@pytest.fixture(autouse=True)
+def config():
+    with patch.dict("features.rabbitmq.retry.RETRY_CONFIG", CONFIG):
+        with patch.dict("features.rabbitmq.rabbitmq_connection_server.RETRY_CONFIG", CONFIG):
+            yield
+
+
+class TestRetryTopology:
+    def test_exponential_backoff(self):
+        assert [retry_delay_ms(attempt) for attempt in (1, 2, 3)] == [1000, 2000, 4000]
+
+    def test_delay_queue_name_includes_the_delay(self):
+        assert delay_queue_name("q", 1000) == "q.delay.1000"
+        assert dead_letter_queue_name("q") == "q.dlq"
+
+    def test_declares_one_delay_queue_per_retry_and_a_dlq(self):
+        channel = MagicMock()
+        declare_retry_topology(channel, "q")
+
+        declared = [call.kwargs for call in channel.queue_declare.call_args_list]
+        assert [queue["queue"] for queue in declared] == ["q.delay.1000", "q.delay.2000", "q.dlq"]
+        assert declared[0]["arguments"] == {
+            "x-message-ttl": 1000,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": "q",
+        }
+
+    def test_changing_the_delay_declares_new_queues(self):
+        channel = MagicMock()
+        declare_retry_topology(channel, "q", {**CONFIG, "base_delay_ms": 500})
+
+        declared = [call.kwargs["queue"] for call in channel.queue_declare.call_args_list]
+        assert declared == ["q.delay.500", "q.delay.1000", "q.dlq"]
+        # El mismo nombre siempre lleva el mismo TTL, así que volver a declararlo no falla
+        assert channel.queue_declare.call_args_list[1].kwargs["arguments"]["x-message-ttl"] == 1000
+
+    def test_attempt_header(self):
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr", headers={"otra": 1})
+        assert attempt_of(props) == 1
+
+        forwarded = forward_properties(props, **{ATTEMPT_HEADER: 2})
+        assert attempt_of(forwarded) == 2
+        assert forwarded.headers["otra"] == 1
+        assert (forwarded.reply_to, forwarded.correlation_id) == ("cb", "corr")
+
+
+class TestServerRetries:
+    def deliver(self, server, handler, attempt=1, body=b"{}", encoding=None, **headers):
+        """Registra ``handler`` en la cola ``q`` y le entrega un mensaje en su intento ``attempt``."""
+        server.create_server("q", handler, lanes={DEFAULT_LANE: 1})
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+        props = pika.BasicProperties(
+            reply_to="cb",
+            correlation_id="corr",
+            content_encoding=encoding,
+            headers={ATTEMPT_HEADER: attempt, **headers},
+        )
+        callback(server.channel, MagicMock(delivery_tag=1), props, body)
+        return [call.kwargs for call in server.channel.basic_publish.call_args_list]
+
+    def failing(self, error):
+        def handler(payload):
+            raise error
+
+        return handler
+
+    def test_topology_is_declared_with_the_queue(self, server):
+        server.create_server("q", lambda payload: payload)
+        declared = [call.kwargs["queue"] for call in server.channel.queue_declare.call_args_list]
+        assert {"q", "q.delay.1000", "q.delay.2000", "q.dlq"} <= set(declared)
+
+    def test_failure_is_scheduled_in_the_delay_queue(self, server):
+        published = self.deliver(server, self.failing(RuntimeError("fallo")), attempt=2)
+
+        assert len(published) == 1
+        assert published[0]["routing_key"] == "q.delay.2000"
+        assert published[0]["properties"].headers[ATTEMPT_HEADER] == 3
+        server.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_exhausted_message_is_dead_lettered_and_answered(self, server):
+        published = self.deliver(server, self.failing(RuntimeError("fallo")), attempt=3)
+
+        dead_letter, reply = published
+        assert dead_letter["routing_key"] == "q.dlq"
+        assert dead_letter["properties"].headers[ERROR_HEADER] == "fallo"
+        assert reply["routing_key"] == "cb"
+        assert json.loads(reply["body"]) == {"error": "fallo"}
+
+    def test_message_errors_are_not_retried(self, server):
+        published = self.deliver(server, self.failing(MessageError("mensaje no válido")))
+        assert [message["routing_key"] for message in published] == ["q.dlq", "cb"]
+
+    @pytest.mark.parametrize(
+        "body, encoding, headers",
+        [
+            (b"no es json", None, {}),
+            (b"{}", "brotli", {}),
+            (b"{}", "deflate", {}),
+            (b"", None, {CLAIM_CHECK_HEADER: "0" * 64}),
+        ],
+        ids=["json", "codec", "corrupt", "claim-check"],
+    )
+    def test_undecodable_messages_are_not_retried(self, server, tmp_path, body, encoding, headers):
+        handler = MagicMock()
+        with patch("features.rabbitmq.claim_check._store", FileClaimCheckStore(str(tmp_path), ttl=60)):
+            published = self.deliver(server, handler, body=body, encoding=encoding, **headers)
+
+        handler.assert_not_called()
+        assert [message["routing_key"] for message in published] == ["q.dlq", "cb"]
+        server.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_topology_errors_are_propagated(self, server):
+        server.channel.queue_declare.side_effect = RuntimeError("PRECONDITION_FAILED")
+        with pytest.raises(RuntimeError):
+            server.create_server("q", lambda payload: payload)
+
+
+class TestClientTimeout:
+    def test_timeout_does_not_republish(self, client):
+        tuning = TuningConfig(reply_timeout=0.01, retry_sleep=0)
+
+        with patch("features.rabbitmq.rabbitmq_connection_client.get_tuning", return_value=tuning):
+            with pytest.raises(TimeoutError):
+                client.call_raw("retry.timeout", b"{}", max_retries=3)
+
+        assert client.channel.basic_publish.call_count == 1
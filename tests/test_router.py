@@ -0,0 +1,119 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from core.utils.exceptions import MessageError
+from features.rabbitmq.lanes import DEFAULT_LANE
+from features.rabbitmq.router import OPERATION_HEADER, Operation, OperationRouter
+
+
+def operation_props(name, **kwargs):
+    """Propiedades de un mensaje dirigido a la operación ``name``."""
+    return pika.BasicProperties(headers={OPERATION_HEADER: name}, **kwargs)
+
+
+@pytest.fixture
+def router():
+    router = OperationRouter("ops", cache_size=2)
+
+    @router.operation("multiply", concurrency=3, cacheable=True)
+    def multiply(payload):
+        return {"result": payload["a"] * payload["b"]}
+
+    @router.operation("sum")
+    def add(payload):
+        return {"result": payload["a"] + payload["b"]}
+
+    return router
+
+
+class TestOperationRouter:
+    def test_registration(self, router):
+        assert router.names() == ["multiply", "sum"]
+        assert router.concurrency == 4
+
+    def test_empty_router_has_minimum_concurrency(self):
+        assert OperationRouter("ops").concurrency == 1
+
+    def test_duplicate_operation(self, router):
+        with pytest.raises(ValueError):
+            router.operation("sum")(lambda payload: payload)
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            Operation("op", lambda payload: payload, concurrency=0)
+
+    def test_resolve(self, router):
+        assert router.resolve(operation_props("sum")).name == "sum"
+
+    @pytest.mark.parametrize("props", [operation_props("divide"), pika.BasicProperties()])
+    def test_resolve_unknown_operation(self, router, props):
+        with pytest.raises(MessageError):
+            router.resolve(props)
+
+
+class TestOperationCache:
+    def test_results_are_cached_by_payload(self):
+        calls = []
+        operation = Operation("op", lambda payload: calls.append(payload) or {"result": 1}, cacheable=True)
+
+        operation({"a": 1, "b": 2})
+        operation({"b": 2, "a": 1})
+
+        assert len(calls) == 1
+
+    def test_errors_and_streams_are_not_cached(self):
+        calls = []
+
+        def handler(payload):
+            calls.append(payload)
+            return (i for i in [1]) if payload.get("stream") else {"error": "fallo"}
+
+        operation = Operation("op", handler, cacheable=True)
+        for payload in ({}, {}, {"stream": True}, {"stream": True}):
+            operation(payload)
+
+        assert len(calls) == 4
+
+    def test_least_recently_used_result_is_evicted(self):
+        calls = []
+        operation = Operation(
+            "op", lambda payload: calls.append(payload) or {"result": 1}, cacheable=True, cache_size=2
+        )
+
+        for a in (1, 2, 1, 3, 1, 2):
+            operation({"a": a})
+
+        # 2 sale de la caché al entrar 3, 1 se mantiene por usarse recientemente
+        assert [payload["a"] for payload in calls] == [1, 2, 3, 2]
+
+
+class TestRouterServer:
+    def deliver(self, server, router, props):
+        server.create_router_server(router, lanes={DEFAULT_LANE: 1})
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+        callback(server.channel, MagicMock(delivery_tag=1), props, b'{"a": 2, "b": 3}')
+
+    def test_message_is_dispatched_to_its_operation_pool(self, server, router):
+        # Los callbacks hacia el hilo de pika se ejecutan inmediatamente
+        server.channel.connection.add_callback_threadsafe.side_effect = lambda callback: callback()
+        self.deliver(server, router, operation_props("multiply", reply_to="cb", correlation_id="corr"))
+
+        deadline = time.monotonic() + 5
+        while not server.channel.basic_ack.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        reply = server.channel.basic_publish.call_args.kwargs
+        assert json.loads(reply["body"]) == {"result": 6}
+        assert "ops:multiply" in server.executors
+        assert server.executors["ops:multiply"]._max_workers == 3
+
+    def test_unknown_operation_is_dead_lettered(self, server, router):
+        self.deliver(server, router, operation_props("divide", reply_to="cb", correlation_id="corr"))
+
+        routing_keys = [call.kwargs["routing_key"] for call in server.channel.basic_publish.call_args_list]
+        assert routing_keys == ["ops.dlq", "cb"]
+        server.channel.basic_ack.assert_called_once_with(delivery_tag=1)
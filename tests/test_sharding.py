@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+import pytest
+
+from features.rabbitmq import sharding
+from features.rabbitmq.sharding import ShardRouter, shard_key, shard_queue_name
+
+
+@pytest.fixture(autouse=True)
+def restore_router():
+    """Restaura el enrutador global después de cada prueba."""
+    router = sharding._router
+    yield
+    sharding.set_shard_router(router)
+
+
+class TestShardNames:
+    def test_shard_zero_keeps_logical_name(self):
+        assert shard_queue_name("notifications_mul", 0) == "notifications_mul"
+
+    def test_other_shards_get_suffix(self):
+        assert shard_queue_name("notifications_mul", 3) == "notifications_mul.shard3"
+
+    def test_shard_key_uses_field(self):
+        assert shard_key({"user": 7, "a": 1}, "user") == "7"
+
+    def test_shard_key_falls_back_to_canonical_payload(self):
+        # El orden de las claves no cambia la clave de sharding
+        assert shard_key({"a": 1, "b": 2}, "user") == shard_key({"b": 2, "a": 1})
+
+
+class TestShardRouter:
+    def test_rejects_zero_shards(self):
+        with pytest.raises(ValueError):
+            ShardRouter(0)
+
+    def test_single_shard(self):
+        router = ShardRouter(1)
+        assert router.shard_for("cualquier-clave") == 0
+        assert router.queues("q") == ["q"]
+
+    def test_same_key_same_shard(self):
+        router = ShardRouter(8)
+        assert {router.shard_for("cliente-42") for _ in range(10)} == {router.shard_for("cliente-42")}
+        # str y bytes con el mismo contenido caen en el mismo shard
+        assert router.shard_for("cliente-42") == router.shard_for(b"cliente-42")
+
+    def test_keys_spread_over_all_shards(self):
+        router = ShardRouter(4)
+        counts = [0] * 4
+        for i in range(4000):
+            counts[router.shard_for(f"key-{i}")] += 1
+        assert all(count > 500 for count in counts)
+
+    def test_growing_moves_few_keys(self):
+        before, after = ShardRouter(4), ShardRouter(5)
+        keys = [f"key-{i}" for i in range(4000)]
+        moved = sum(before.shard_for(key) != after.shard_for(key) for key in keys)
+        # Hashing consistente: sólo se reasigna ~1/N de las claves (un hash módulo N movería ~80 %)
+        assert moved < len(keys) * 0.35
+        # Las claves que se mueven sólo van al shard nuevo
+        assert all(after.shard_for(key) == 4 for key in keys if before.shard_for(key) != after.shard_for(key))
+
+    def test_queue_for(self):
+        router = ShardRouter(4)
+        shard = router.shard_for("k")
+        assert router.queue_for("q", "k") == shard_queue_name("q", shard)
+
+    def test_assigned_shards_partition(self):
+        router = ShardRouter(5)
+        assigned = [router.assigned_shards(index, 2) for index in range(2)]
+        assert assigned == [[0, 2, 4], [1, 3]]
+        assert router.assigned_shards(0, 1) == [0, 1, 2, 3, 4]
+
+
+class TestReloadShardRouter:
+    def test_rebuilds_when_count_changes(self):
+        sharding.set_shard_router(ShardRouter(4))
+        with patch.dict("os.environ", {"RABBITMQ_SHARDS": "2"}):
+            router = sharding.reload_shard_router()
+        assert router.shards == 2
+        assert sharding.get_shard_router() is router
+
+    def test_keeps_router_when_count_is_unchanged(self):
+        current = ShardRouter(3)
+        sharding.set_shard_router(current)
+        with patch.dict("os.environ", {"RABBITMQ_SHARDS": "3"}):
+            assert sharding.reload_shard_router() is current
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
+from features.rabbitmq.rabbit_di import ContainerRabbitMQ
+from features.rabbitmq.sharding import ShardRouter
+
+
+@pytest.fixture
+def api():
+    """API sin arrancar la conexión en segundo plano (no se ejecuta el evento de inicio)."""
+    main.app.state.ready = False
+    yield TestClient(main.app)
+    main.app.state.ready = False
+
+
+class TestReadiness:
+    def test_liveness_does_not_wait_for_rabbitmq(self, api):
+        assert api.get("/health").status_code == 200
+        assert api.get("/ready").status_code == 503
+
+    @pytest.mark.parametrize("path", ["/multiply/", "/sum/", "/multiply/table/", "/jobs/sum", "/publish/sum"])
+    def test_rabbitmq_endpoints_wait_for_the_connection(self, api, path):
+        with patch.object(main.rabbit_manager, "client") as client:
+            response = api.post(path, json={"a": 1, "b": 2})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        client.assert_not_called()
+
+    def test_ready_after_connecting(self, api):
+        main.app.state.ready = True
+        assert api.get("/ready").json() == {"status": "ready"}
+
+
+class TestConnectInBackground:
+    @pytest.fixture(autouse=True)
+    def stop(self):
+        main.startup_stop.clear()
+        yield main.startup_stop
+        main.startup_stop.clear()
+
+    def test_retries_with_backoff_until_connected(self, stop):
+        waits = []
+        get_channel = MagicMock(side_effect=[ConnectionError("sin broker")] * 3 + [MagicMock()])
+
+        with (
+            patch.object(main.rabbit_manager, "get_channel", get_channel),
+            patch.object(main.rabbit_manager, "warm_up") as warm_up,
+            patch.object(stop, "wait", side_effect=waits.append),
+            patch.dict(main.STARTUP_CONFIG, {"warm_up": True, "retry_max_delay": 6}),
+            patch.object(main, "get_tuning", return_value=MagicMock(retry_delay=2)),
+        ):
+            main.app.state.ready = False
+            main.connect_in_background()
+
+        assert waits == [2, 4, 6]
+        warm_up.assert_called_once()
+        assert main.app.state.ready is True
+
+    def test_stops_when_the_api_shuts_down(self, stop):
+        get_channel = MagicMock(side_effect=ConnectionError("sin broker"))
+
+        with (
+            patch.object(main.rabbit_manager, "get_channel", get_channel),
+            patch.object(stop, "wait", side_effect=lambda delay: stop.set()),
+        ):
+            main.app.state.ready = False
+            main.connect_in_background()
+
+        assert get_channel.call_count == 1
+        assert main.app.state.ready is False
+
+
+class TestWarmUp:
+    def test_declares_every_shard_and_lane(self):
+        container = ContainerRabbitMQ()
+        channel = MagicMock()
+
+        with (
+            patch.object(ContainerRabbitMQ, "get_channel", return_value=channel),
+            patch("features.rabbitmq.rabbit_di.get_shard_router", return_value=ShardRouter(2)),
+        ):
+            container.warm_up(["q"])
+
+        declared = {call.kwargs["queue"] for call in channel.queue_declare.call_args_list}
+        router = ShardRouter(2)
+        lanes = {DEFAULT_LANE: "", BULK_LANE: f".{BULK_LANE}"}
+        assert declared == {f"{queue}{suffix}" for queue in router.queues("q") for suffix in lanes.values()}
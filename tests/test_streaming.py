@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from core.utils.exceptions import ResponseError
+from features.rabbitmq.rabbitmq_connection_server import STREAM_WINDOW
+from features.rabbitmq.retry import ERROR_HEADER
+from features.rabbitmq.streaming import STREAM_END_HEADER, STREAM_ERROR_HEADER, STREAM_SEQ_HEADER, is_stream
+
+
+def chunk(seq, body=b"", **headers):
+    """Crea las propiedades y el cuerpo de un fragmento de stream."""
+    return pika.BasicProperties(correlation_id="corr", headers={STREAM_SEQ_HEADER: seq, **headers}), body
+
+
+@pytest.fixture
+def client(client):
+    """Cliente con un stream en curso."""
+    client.corr_id = "corr"
+    return client
+
+
+def deliver(client, *chunks):
+    """Entrega fragmentos al callback de respuestas del cliente."""
+    for props, body in chunks:
+        client.on_response(None, None, props, body)
+
+
+class TestServerStream:
+    def published(self, server):
+        return [
+            (call.kwargs["properties"].headers, call.kwargs["body"])
+            for call in server.channel.basic_publish.call_args_list
+        ]
+
+    def test_is_stream(self):
+        assert is_stream(x for x in [])
+        assert not is_stream([1, 2])
+
+    def test_chunks_are_sequenced_with_end_marker(self, server):
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr")
+        server._publish_stream(props, iter([{"i": 0}, {"i": 1}]))
+
+        published = self.published(server)
+        assert [headers[STREAM_SEQ_HEADER] for headers, _ in published] == [0, 1, 2]
+        assert [json.loads(body) for _, body in published[:2]] == [{"i": 0}, {"i": 1}]
+        assert published[-1][0][STREAM_END_HEADER] is True
+        assert STREAM_ERROR_HEADER not in published[-1][0]
+
+    def test_failing_generator_ends_with_error(self, server):
+        def failing():
+            yield {"i": 0}
+            raise RuntimeError("fallo")
+
+        server._publish_stream(pika.BasicProperties(reply_to="cb", correlation_id="corr"), failing())
+
+        headers, _ = self.published(server)[-1]
+        assert headers[STREAM_END_HEADER] is True
+        assert headers[STREAM_ERROR_HEADER] == "fallo"
+
+    def test_pooled_generator_waits_for_io_thread(self, server):
+        # El hilo de pika no ejecuta los callbacks hasta que se lo pedimos
+        pending = []
+        server.channel.connection.add_callback_threadsafe.side_effect = pending.append
+        produced = []
+
+        def handler(payload):
+            for i in range(STREAM_WINDOW * 3):
+                produced.append(i)
+                yield i
+
+        server.create_server("q", handler, concurrency=2)
+        callback = server.channel.basic_consume.call_args.kwargs["on_message_callback"]
+        props = pika.BasicProperties(reply_to="cb", correlation_id="corr")
+        callback(server.channel, MagicMock(delivery_tag=1), props, b"{}")
+
+        time.sleep(0.2)
+        assert len(produced) <= STREAM_WINDOW + 1
+
+        deadline = time.monotonic() + 5
+        while not server.channel.basic_ack.called and time.monotonic() < deadline:
+            while pending:
+                pending.pop(0)()
+            time.sleep(0.01)
+        assert len(produced) == STREAM_WINDOW * 3
+        assert server.channel.basic_publish.call_count == STREAM_WINDOW * 3 + 1
+
+
+class TestClientStream:
+    def test_reorders_chunks(self, client):
+        deliver(client, chunk(1, b"b"), chunk(2, **{STREAM_END_HEADER: True}), chunk(0, b"a"))
+        assert list(client._iter_stream("corr", timeout=1)) == ["a", "b"]
+        # Al terminar se ignoran fragmentos tardíos
+        assert client.corr_id is None
+
+    def test_error_after_chunks(self, client):
+        deliver(client, chunk(0, b"a"), chunk(1, **{STREAM_END_HEADER: True, STREAM_ERROR_HEADER: "fallo"}))
+        chunks = client._iter_stream("corr", timeout=1)
+        assert next(chunks) == "a"
+        with pytest.raises(ResponseError):
+            next(chunks)
+
+    def test_single_reply_from_non_generator_handler(self, client):
+        deliver(client, (pika.BasicProperties(correlation_id="corr"), b'{"result": 1}'))
+        assert list(client._iter_stream("corr", timeout=1)) == ['{"result": 1}']
+
+    def test_error_reply_instead_of_a_stream(self, client):
+        props = pika.BasicProperties(correlation_id="corr", headers={ERROR_HEADER: "fallo"})
+        deliver(client, (props, b'{"error": "fallo"}'))
+        with pytest.raises(ResponseError, match="fallo"):
+            list(client._iter_stream("corr", timeout=1))
+
+    def test_timeout_between_chunks(self, client):
+        with pytest.raises(TimeoutError):
+            list(client._iter_stream("corr", timeout=0))
+
+    def test_async_iteration(self, client):
+        # Los fragmentos llegan mientras el stream cede el bucle
+        arrivals = [[chunk(0, b"a")], [chunk(1, **{STREAM_END_HEADER: True})]]
+        client.rabbit_conn.process_data_events.side_effect = lambda time_limit: (
+            arrivals and deliver(client, *arrivals.pop(0))
+        )
+
+        async def collect():
+            return [item async for item in client._aiter_stream("corr", timeout=1, poll_interval=0)]
+
+        assert asyncio.run(collect()) == ["a"]
+        # Nunca se bloquea el bucle esperando eventos
+        assert all(call.kwargs["time_limit"] == 0 for call in client.rabbit_conn.process_data_events.call_args_list)
@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+import worker
+from features.rabbitmq.lanes import DEFAULT_LANE
+from features.rabbitmq.sharding import shard_queue_name
+from features.rabbitmq.throttling import TokenBucket
+
+
+@pytest.fixture
+def clock():
+    """Reloj controlado por la prueba para el token bucket."""
+    now = [100.0]
+    with patch("features.rabbitmq.throttling.time.monotonic", side_effect=lambda: now[0]):
+        yield now
+
+
+class TestTokenBucket:
+    def test_burst_is_served_immediately(self, clock):
+        bucket = TokenBucket(rate=2, burst=3)
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_reservations_above_the_rate_wait_their_turn(self, clock):
+        bucket = TokenBucket(rate=2, burst=1)
+        bucket.reserve()
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_tokens_are_refilled_up_to_the_burst(self, clock):
+        bucket = TokenBucket(rate=2, burst=2)
+        bucket.reserve()
+        bucket.reserve()
+        clock[0] += 60
+        assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+        assert bucket.reserve() == pytest.approx(0.5)
+
+    def test_default_burst_is_one_second_of_tokens(self):
+        assert TokenBucket(rate=10).burst == 10
+        assert TokenBucket(rate=0.5).burst == 1
+
+    @pytest.mark.parametrize("rate", [0, -1])
+    def test_invalid_rate(self, rate):
+        with pytest.raises(ValueError):
+            TokenBucket(rate)
+
+
+class TestThrottledConsumer:
+    def deliver(self, channel, tag):
+        callback = channel.basic_consume.call_args.kwargs["on_message_callback"]
+        callback(channel, MagicMock(delivery_tag=tag), pika.BasicProperties(), b"{}")
+
+    def test_messages_above_the_rate_are_dispatched_later(self, server, clock):
+        processed = []
+        server.create_server("q", processed.append, lanes={DEFAULT_LANE: 1}, rate_limit=1, burst=1)
+        channel = server.channel.connection.channel.return_value
+
+        self.deliver(channel, 1)
+        self.deliver(channel, 2)
+
+        assert len(processed) == 1
+        delay, dispatch = server.channel.connection.call_later.call_args.args
+        assert delay == pytest.approx(1.0)
+        # Mientras espera su token el mensaje sigue sin confirmar y no cuenta como en proceso
+        assert channel.basic_ack.call_count == 1
+        assert server.in_flight == 0
+
+        dispatch()
+        assert len(processed) == 2
+        assert channel.basic_ack.call_count == 2
+
+    def test_throttled_queues_have_their_own_channel(self, server):
+        server.create_server("libre", lambda payload: payload, lanes={DEFAULT_LANE: 1})
+        server.create_server("limitada", lambda payload: payload, lanes={DEFAULT_LANE: 1}, rate_limit=5)
+        server.set_capacity(4)
+        throttled = server.channel.connection.channel.return_value
+
+        assert server.channel.basic_consume.call_args.kwargs["queue"] == "libre"
+        assert throttled.basic_consume.call_args.kwargs["queue"] == "limitada"
+        # La capacidad compartida (prefetch global) sólo se aplica al canal principal
+        throttled.basic_qos.assert_called_once()
+        assert not throttled.basic_qos.call_args.kwargs.get("global_qos")
+        assert server.throttled == {"limitada"}
+
+        server.cancel_server("limitada")
+        throttled.basic_cancel.assert_called_once()
+        assert server.throttled == set()
+
+    def test_max_concurrency_caps_pool_and_prefetch(self, server):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 4}, concurrency=8, max_concurrency=2)
+
+        assert server.executors["q"]._max_workers == 2
+        assert server.channel.basic_qos.call_args.kwargs["prefetch_count"] == 2
+
+    def test_shared_bucket_limits_all_queues_together(self, server, clock):
+        processed = []
+        bucket = TokenBucket(rate=1, burst=1)
+        for queue in ("q", "q.shard1"):
+            server.create_server(queue, processed.append, lanes={DEFAULT_LANE: 1}, bucket=bucket)
+        channel = server.channel.connection.channel.return_value
+        first, second = (call.kwargs["on_message_callback"] for call in channel.basic_consume.call_args_list)
+
+        first(channel, MagicMock(delivery_tag=1), pika.BasicProperties(), b"{}")
+        second(channel, MagicMock(delivery_tag=2), pika.BasicProperties(), b"{}")
+
+        # El segundo shard espera el token que ya gastó el primero
+        assert len(processed) == 1
+        server.channel.connection.call_later.assert_called_once()
+
+
+class TestWorkerLimits:
+    def test_shards_of_a_queue_share_one_bucket(self):
+        limits = {worker.QUEUE_MULTIPLY: {"rate_limit": 5, "burst": 2, "max_concurrency": 1}}
+        with (
+            patch("worker.ContainerRabbitMQ"),
+            patch.dict("worker.RABBITMQ_QUEUE_LIMITS", limits),
+            patch.dict("worker.AUTOSCALE_CONFIG", {"enabled": False}),
+        ):
+            instance = worker.Worker()
+            for shard in range(3):
+                instance._serve(shard_queue_name(worker.QUEUE_MULTIPLY, shard), worker.QUEUE_MULTIPLY)
+            instance._serve(worker.QUEUE_SUM, worker.QUEUE_SUM)
+
+        calls = instance.server.create_server.call_args_list
+        buckets = {id(call.kwargs["bucket"]) for call in calls[:3]}
+        assert len(buckets) == 1
+        assert (calls[0].kwargs["bucket"].rate, calls[0].kwargs["bucket"].burst) == (5, 2)
+        assert calls[0].kwargs["max_concurrency"] == 1
+        # Las colas sin límite no tienen bucket
+        assert calls[3].kwargs["bucket"] is None
@@ -0,0 +1,152 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from core.config import tuning
+from core.config.tuning import QueueTuning, TuningConfig, get_tuning, load_tuning, reload_tuning
+from features.rabbitmq.lanes import BULK_LANE, DEFAULT_LANE
+
+
+@pytest.fixture
+def tuning_file(tmp_path, monkeypatch):
+    """Fichero de tuning temporal, sin variables ``TUNING_*`` del entorno."""
+    for name in TuningConfig.model_fields:
+        monkeypatch.delenv(f"TUNING_{name.upper()}", raising=False)
+    path = tmp_path / "tuning.json"
+    monkeypatch.setenv("TUNING_FILE", str(path))
+    return path
+
+
+@pytest.fixture
+def restore_tuning():
+    """Restaura la configuración vigente después de la prueba."""
+    current = tuning._tuning
+    yield
+    tuning._tuning = current
+
+
+class TestResolve:
+    @pytest.fixture
+    def config(self):
+        return TuningConfig(
+            reply_timeout=60,
+            queues={"q": QueueTuning(reply_timeout=10, prefetch=4), "q.shard1": QueueTuning(reply_timeout=5)},
+        )
+
+    def test_global_value(self, config):
+        assert config.resolve("otra", "reply_timeout") == 60
+
+    def test_queue_override(self, config):
+        assert config.resolve("q", "reply_timeout") == 10
+
+    def test_logical_queue_applies_to_shards_and_lanes(self, config):
+        assert config.resolve("q.bulk", "reply_timeout") == 10
+        assert config.resolve("q.shard2.bulk", "prefetch") == 4
+
+    def test_most_specific_override_wins(self, config):
+        assert config.resolve("q.shard1.bulk", "reply_timeout") == 5
+        # Los campos sin valor en el override más específico caen al siguiente
+        assert config.resolve("q.shard1", "prefetch") == 4
+
+    def test_prefix_must_be_a_whole_name(self, config):
+        assert config.resolve("qq", "reply_timeout") == 60
+
+    def test_explicit_default(self, config):
+        assert config.resolve("otra", "prefetch", default=8) == 8
+
+
+class TestLoad:
+    def test_defaults(self, tuning_file):
+        assert load_tuning() == TuningConfig()
+
+    def test_environment_and_file_layers(self, tuning_file, monkeypatch):
+        monkeypatch.setenv("TUNING_REPLY_TIMEOUT", "30")
+        monkeypatch.setenv("TUNING_MAX_RETRIES", "4")
+        monkeypatch.setenv("TUNING_QUEUES", json.dumps({"a": {"prefetch": 2}}))
+        tuning_file.write_text(json.dumps({"reply_timeout": 20, "queues": {"b": {"prefetch": 3}}}))
+
+        config = load_tuning()
+
+        # El fichero tiene prioridad sobre el entorno; las colas de ambas capas se combinan
+        assert config.reply_timeout == 20
+        assert config.max_retries == 4
+        assert config.resolve("a", "prefetch") == 2
+        assert config.resolve("b", "prefetch") == 3
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            '{"reply_timeout": 0}',
+            '{"queues": {"q": {"prefetch": 0}}}',
+            "no es json",
+            "[]",
+            '"x"',
+            '{"queues": []}',
+            '{"queues": {"q": 1}}',
+        ],
+    )
+    def test_invalid_configuration(self, tuning_file, content):
+        tuning_file.write_text(content)
+        with pytest.raises(ValueError):
+            load_tuning()
+
+    def test_environment_queues_must_be_an_object(self, tuning_file, monkeypatch):
+        monkeypatch.setenv("TUNING_QUEUES", "[]")
+        with pytest.raises(ValueError):
+            load_tuning()
+
+
+class TestReload:
+    def test_reload_replaces_the_configuration(self, tuning_file, restore_tuning):
+        tuning_file.write_text('{"reply_timeout": 12}')
+        with patch("core.config.tuning.load_dotenv"):
+            assert reload_tuning().reply_timeout == 12
+        assert get_tuning().reply_timeout == 12
+
+    def test_invalid_reload_keeps_the_previous_configuration(self, tuning_file, restore_tuning):
+        tuning_file.write_text('{"reply_timeout": 12}')
+        with patch("core.config.tuning.load_dotenv"):
+            reload_tuning()
+            tuning_file.write_text('{"reply_timeout": -1}')
+            with pytest.raises(ValueError):
+                reload_tuning()
+        assert get_tuning().reply_timeout == 12
+
+    @pytest.mark.parametrize("content", ["[]", '"x"', '{"queues": []}'])
+    def test_reload_of_a_non_object_keeps_the_previous_configuration(self, tuning_file, restore_tuning, content):
+        tuning_file.write_text('{"reply_timeout": 12}')
+        with patch("core.config.tuning.load_dotenv"):
+            reload_tuning()
+            tuning_file.write_text(content)
+            with pytest.raises(ValueError):
+                reload_tuning()
+        assert get_tuning().reply_timeout == 12
+
+
+class TestRefreshPrefetch:
+    def test_changed_lanes_are_consumed_again_with_the_new_prefetch(self, server):
+        with patch("features.rabbitmq.rabbitmq_connection_server.get_tuning", return_value=TuningConfig()):
+            server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 2, BULK_LANE: 1}, concurrency=2)
+        old_tag = server.consumers["q"]
+        channel = server.channel
+        channel.reset_mock()
+
+        changed = TuningConfig(queues={"q": QueueTuning(prefetch=16), "q.bulk": QueueTuning(prefetch=2)})
+        with patch("features.rabbitmq.rabbitmq_connection_server.get_tuning", return_value=changed):
+            assert server.refresh_prefetch() == ["q"]
+            # Sin cambios, no se vuelve a registrar nada
+            assert server.refresh_prefetch() == []
+
+        channel.basic_cancel.assert_called_once_with(old_tag)
+        channel.basic_qos.assert_called_once_with(prefetch_count=16)
+        assert channel.basic_consume.call_args.kwargs["queue"] == "q"
+        assert server.consumers["q"] == channel.basic_consume.return_value
+
+    def test_cancelled_queues_are_not_refreshed(self, server):
+        server.create_server("q", lambda payload: payload, lanes={DEFAULT_LANE: 1})
+        server.cancel_server("q")
+
+        changed = TuningConfig(queues={"q": QueueTuning(prefetch=16)})
+        with patch("features.rabbitmq.rabbitmq_connection_server.get_tuning", return_value=changed):
+            assert server.refresh_prefetch() == []
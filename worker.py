@@ -1,15 +1,36 @@
 """
 Worker que procesa mensajes de RabbitMQ para operaciones de multiplicación y suma.
-Implementa dos workers independientes que consumen de colas diferentes.
+Consume las colas dedicadas de cada operación y la cola compartida del router de operaciones.
+Cada worker consume el subconjunto de shards que le asigna WORKER_INDEX/WORKER_COUNT.
 """
 
 import signal
 import sys
-from typing import Any
+from typing import Any, Callable, Union
 
-from core.config.settings import RABBITMQ_CONFIG
+from core.config.settings import (
+    AUTOSCALE_CONFIG,
+    RABBITMQ_CONFIG,
+    RABBITMQ_QUEUE_LIMITS,
+    RABBITMQ_SHARDING,
+    WORKER_CONFIG,
+)
+from core.config.tuning import reload_tuning
 from core.utils.logging import get_logger
+from core.utils.metrics import start_metrics_server
+from features.rabbitmq.autoscaler import Autoscaler
 from features.rabbitmq.rabbit_di import ContainerRabbitMQ
+from features.rabbitmq.router import OperationRouter
+from features.rabbitmq.sharding import (
+    ShardRouter,
+    configured_shards,
+    get_shard_router,
+    set_shard_router,
+    shard_queue_name,
+)
+from features.rabbitmq.throttling import TokenBucket
+from operations import QUEUE_OPERATIONS, process_multiply, process_multiply_table, process_sum
+from operations import router as operations_router
 
 # Configurar logging
 logger = get_logger(__name__)
@@ -17,48 +38,10 @@ logger = get_logger(__name__)
 # Configuración de colas
 QUEUE_MULTIPLY = f"{RABBITMQ_CONFIG['queue']}_mul"
 QUEUE_SUM = f"{RABBITMQ_CONFIG['queue']}_sum"
+QUEUE_MULTIPLY_TABLE = f"{RABBITMQ_CONFIG['queue']}_mul_table"
 
-
-def process_multiply(payload: dict[str, Any]) -> dict[str, Any]:
-    """
-    Procesa un mensaje para realizar una multiplicación.
-
-    Args:
-        payload (dict[str, Any]): Payload con los números a multiplicar
-
-    Returns:
-        dict[str, Any]: Resultado de la multiplicación o error
-    """
-    try:
-        a = payload.get("a", 0)
-        b = payload.get("b", 0)
-        result = a * b
-        logger.info(f"Multiplicación realizada: {a} * {b} = {result}")
-        return {"result": result, "operation": "multiply"}
-    except Exception as e:
-        logger.error(f"Error en multiplicación: {str(e)}")
-        return {"error": str(e), "operation": "multiply"}
-
-
-def process_sum(payload: dict[str, Any]) -> dict[str, Any]:
-    """
-    Procesa un mensaje para realizar una suma.
-
-    Args:
-        payload (dict[str, Any]): Payload con los números a sumar
-
-    Returns:
-        dict[str, Any]: Resultado de la suma o error
-    """
-    try:
-        a = payload.get("a", 0)
-        b = payload.get("b", 0)
-        result = a + b
-        logger.info(f"Suma realizada: {a} + {b} = {result}")
-        return {"result": result, "operation": "sum"}
-    except Exception as e:
-        logger.error(f"Error en suma: {str(e)}")
-        return {"error": str(e), "operation": "sum"}
+# Intervalo (segundos) para comprobar si los shards retirados ya se vaciaron
+RETIRED_SHARD_CHECK_INTERVAL = 5
 
 
 class Worker:
@@ -71,19 +54,110 @@ class Worker:
         """Inicializa el worker con la conexión a RabbitMQ."""
         self.rabbit_conn = ContainerRabbitMQ()
         self.server = self.rabbit_conn.conexionServer()
+        self.router = get_shard_router()
+        self.operations: dict[str, Union[Callable[[dict[str, Any]], Any], OperationRouter]] = {
+            QUEUE_MULTIPLY: process_multiply,
+            QUEUE_SUM: process_sum,
+            QUEUE_MULTIPLY_TABLE: process_multiply_table,
+            QUEUE_OPERATIONS: operations_router,
+        }
+        self._retired_queues: set[str] = set()
+        # Un token bucket por cola lógica, compartido por todos sus shards en este worker
+        self._buckets: dict[str, TokenBucket] = {}
         self._running = True
+        self._profiling_timer = None
+        self.autoscaler = Autoscaler(self.server) if AUTOSCALE_CONFIG["enabled"] else None
+
+    def _assigned_queues(self, router: ShardRouter) -> dict[str, tuple[int, str]]:
+        """Obtiene las colas físicas asignadas a este worker con su shard y su cola lógica."""
+        shards = router.assigned_shards(WORKER_CONFIG["index"], WORKER_CONFIG["count"])
+        return {shard_queue_name(queue, shard): (shard, queue) for queue in self.operations for shard in shards}
+
+    def _serve(self, queue: str, logical_queue: str):
+        """Registra el consumidor de una cola física, con su handler (y límites) o su router de operaciones."""
+        handler = self.operations[logical_queue]
+        if isinstance(handler, OperationRouter):
+            self.server.create_router_server(handler, queue=queue)
+        else:
+            # Con autoescalado, el pool se dimensiona al máximo y la capacidad efectiva la fija el prefetch global
+            concurrency = self.autoscaler.max_concurrency if self.autoscaler else 1
+            limits = dict(RABBITMQ_QUEUE_LIMITS.get(logical_queue, {}))
+            rate_limit, burst = limits.pop("rate_limit", None), limits.pop("burst", None)
+            if rate_limit and logical_queue not in self._buckets:
+                self._buckets[logical_queue] = TokenBucket(rate_limit, burst)
+            self.server.create_server(
+                queue, handler, concurrency=concurrency, bucket=self._buckets.get(logical_queue), **limits
+            )
 
     def setup(self):
-        """Configura los servidores para las colas de multiplicación y suma."""
+        """Configura los servidores para los shards asignados de las colas de operaciones."""
         try:
-            # Configurar servidor de multiplicación
-            self.server.create_server(QUEUE_MULTIPLY, process_multiply)
-            self.server.create_server(QUEUE_SUM, process_sum)
-            logger.info("Workers configurados correctamente")
+            for queue, (_, logical_queue) in self._assigned_queues(self.router).items():
+                self._serve(queue, logical_queue)
+            if self.autoscaler:
+                self.autoscaler.start()
+            logger.info(f"Workers configurados correctamente ({self.router.shards} shards)")
         except Exception as e:
             logger.error(f"Error al configurar workers: {str(e)}")
             raise
 
+    def rebalance(self, shards: int):
+        """
+        Reasigna los shards consumidos tras un cambio en el número de shards.
+
+        Los shards que pasan a otro worker se dejan de consumir; los shards retirados
+        (índice >= shards) se siguen consumiendo hasta vaciarse para no perder mensajes.
+
+        Args:
+            shards (int): Nuevo número de shards por cola lógica
+        """
+        if shards == self.router.shards:
+            return
+
+        new_router = ShardRouter(shards, RABBITMQ_SHARDING["virtual_nodes"])
+        old_queues = self._assigned_queues(self.router)
+        new_queues = self._assigned_queues(new_router)
+
+        for queue, (_, logical_queue) in new_queues.items():
+            self._retired_queues.discard(queue)
+            if queue not in self.server.lanes:
+                self._serve(queue, logical_queue)
+
+        for queue in old_queues.keys() - new_queues.keys():
+            shard, _ = old_queues[queue]
+            if shard >= shards:
+                self._retired_queues.add(queue)
+            else:
+                self.server.cancel_server(queue)
+
+        logger.info(f"Rebalanceo de shards: {self.router.shards} -> {shards}")
+        self.router = new_router
+        set_shard_router(new_router)
+        if self._retired_queues:
+            self.server.channel.connection.call_later(RETIRED_SHARD_CHECK_INTERVAL, self._drain_retired_queues)
+
+    def reload(self, shards: int):
+        """
+        Aplica la configuración recargada: rebalancea los shards y actualiza el prefetch de los consumidores.
+
+        Args:
+            shards (int): Número de shards por cola lógica
+        """
+        self.rebalance(shards)
+        self.server.refresh_prefetch()
+
+    def _drain_retired_queues(self):
+        """Deja de consumir los shards retirados que ya no tienen mensajes."""
+        if not self._running:
+            return
+        for queue in list(self._retired_queues):
+            if self.server.message_count(queue) == 0:
+                self.server.cancel_server(queue)
+                self._retired_queues.discard(queue)
+                logger.info(f"Shard retirado vaciado: {queue}")
+        if self._retired_queues:
+            self.server.channel.connection.call_later(RETIRED_SHARD_CHECK_INTERVAL, self._drain_retired_queues)
+
     def start(self):
         """Inicia los workers en modo asíncrono."""
         try:
@@ -93,29 +167,96 @@ class Worker:
             logger.error(f"Error al iniciar workers: {str(e)}")
             raise
 
+    def toggle_profiling(self):
+        """
+        Activa o detiene la captura de perfiles de los handlers.
+
+        Al activarla se programa su fin tras la duración configurada, para que termine
+        aunque no lleguen mensajes suficientes.
+        """
+        profiler = self.server.profiler
+        connection = self.server.channel.connection
+        if self._profiling_timer is not None:
+            connection.remove_timeout(self._profiling_timer)
+            self._profiling_timer = None
+        if profiler.toggle():
+            self._profiling_timer = connection.call_later(profiler.duration, profiler.stop)
+
+    def request_stop(self):
+        """
+        Solicita el apagado: cancela los consumidores desde el bucle de pika para que
+        ``start`` retorne sin recibir más mensajes.
+        """
+        if not self._running:
+            return
+        self._running = False
+
+        def stop_consuming():
+            if self.autoscaler:
+                self.autoscaler.stop()
+            self.server.stop_consuming()
+
+        self.server.channel.connection.add_callback_threadsafe(stop_consuming)
+
     def stop(self):
-        """Detiene los workers de forma segura."""
+        """Detiene los workers de forma segura, drenando antes los mensajes en proceso."""
         logger.info("Deteniendo workers...")
+        try:
+            self.server.drain(WORKER_CONFIG["drain_grace"])
+        except Exception as e:
+            logger.error(f"Error al drenar mensajes en proceso: {str(e)}")
         self.rabbit_conn.close()
         logger.info("Workers detenidos correctamente")
 
 
 def handle_shutdown(signum, frame):
-    """Manejador de señales para shutdown graceful."""
+    """
+    Manejador de señales para shutdown graceful.
+
+    No cierra la conexión directamente: cancela los consumidores (los mensajes en prefetch
+    vuelven a la cola) y deja que ``start`` retorne para drenar los mensajes en proceso.
+    """
     logger.info("Recibida señal de terminación")
-    worker.stop()
-    sys.exit(0)
+    worker.request_stop()
+
+
+def handle_reload(signum, frame):
+    """Manejador de SIGHUP: recarga el tuning, relee el número de shards y los aplica a los consumidores."""
+    # reload_tuning también relee .env (incluido RABBITMQ_SHARDS), aunque el tuning no sea válido
+    try:
+        reload_tuning()
+    except ValueError:
+        # Se conserva la configuración anterior; el error ya se registró
+        pass
+    shards = configured_shards(worker.router.shards)
+    logger.info(f"Recibida señal de recarga (shards={shards})")
+    # Ejecutar en el bucle de pika, fuera del manejador de señales
+    worker.server.channel.connection.add_callback_threadsafe(lambda: worker.reload(shards))
+
+
+def handle_profile(signum, frame):
+    """Manejador de SIGUSR1: activa o detiene la captura de perfiles de los handlers."""
+    logger.info("Recibida señal de perfilado")
+    worker.server.channel.connection.add_callback_threadsafe(worker.toggle_profiling)
 
 
 if __name__ == "__main__":
     # Registrar manejadores de señales
     signal.signal(signal.SIGINT, handle_shutdown)
     signal.signal(signal.SIGTERM, handle_shutdown)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, handle_reload)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, handle_profile)
+
+    if WORKER_CONFIG["metrics_port"]:
+        start_metrics_server(WORKER_CONFIG["metrics_port"])
 
     try:
         worker = Worker()
         worker.setup()
         worker.start()
+        worker.stop()
     except Exception as e:
         logger.error(f"Error en worker: {str(e)}")
         sys.exit(1)